@@ -0,0 +1,4 @@
+"""Throughput benchmarks for the commit sources, the summarizer and the pipeline.
+
+Run ``python -m benchmarks.run`` from the repository root; see ``run.py``.
+"""
@@ -0,0 +1,262 @@
+"""In-process stand-in for the parts of the GitHub REST API the poller uses.
+
+:class:`FakeGitHub` serves synthetic repositories on ``127.0.0.1`` from a
+threaded HTTP server. It covers the org/user repo listings, the paged commit
+listing (``since``, ``until``, ``sha``, ``page``, ``Link`` with ``rel="last"``) and
+commit details. Every response carries ``ETag`` and ``X-RateLimit-*``
+headers, and ``If-None-Match`` is answered with 304.
+
+Latency and rate limiting are configurable:
+
+* ``latency`` seconds are slept before every response;
+* ``quota`` requests per token are allowed per ``reset_seconds`` window, after
+  which GitHub's 403 "API rate limit exceeded" is returned until the reset;
+* every ``throttle_every``-th request gets a secondary-limit 429 with
+  ``Retry-After: retry_after``.
+
+Point the poller at it by replacing ``github_poller.GITHUB_API`` with
+:attr:`FakeGitHub.url`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from benchmarks.synthetic import EPOCH, make_patch
+
+PER_PAGE_MAX = 100
+
+
+def _iso(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeRepo:
+    """Commits of one synthetic repository, oldest first."""
+
+    def __init__(self, full_name: str, commits: int, files: int = 3, patch_lines: int = 40, seed: int = 0):
+        self.full_name = full_name
+        self.files = files
+        self.patch_lines = patch_lines
+        self.seed = seed
+        self.commits = [
+            {
+                "sha": hashlib.sha1(f"{full_name}:{n}".encode()).hexdigest(),
+                "date": _iso(EPOCH + n * 60),
+                "message": f"Change {n} in {full_name}",
+            }
+            for n in range(commits)
+        ]
+        self._by_sha = {c["sha"]: n for n, c in enumerate(self.commits)}
+        self.pushed_at = self.commits[-1]["date"] if self.commits else _iso(EPOCH)
+
+    def listing_entry(self, commit: Dict) -> Dict:
+        return {
+            "sha": commit["sha"],
+            "commit": {
+                "message": commit["message"],
+                "author": {"name": "Bench", "email": "bench@example.com", "date": commit["date"]},
+                "committer": {"name": "Bench", "email": "bench@example.com", "date": commit["date"]},
+            },
+            "parents": [{}],
+        }
+
+    def detail(self, sha: str) -> Optional[Dict]:
+        n = self._by_sha.get(sha)
+        if n is None:
+            return None
+        entry = self.listing_entry(self.commits[n])
+        entry["files"] = [
+            {
+                "filename": f"src/module_{i}.py",
+                "status": "modified",
+                "additions": self.patch_lines,
+                "deletions": self.patch_lines,
+                "patch": make_patch(self.seed * 1_000_000 + n * 10 + i, self.patch_lines),
+            }
+            for i in range(self.files)
+        ]
+        return entry
+
+
+class FakeGitHub:
+    """Threaded fake GitHub API server; use as a context manager."""
+
+    def __init__(
+        self,
+        repos: List[FakeRepo],
+        org: str = "bench",
+        latency: float = 0.0,
+        quota: Optional[int] = None,
+        reset_seconds: float = 60.0,
+        throttle_every: Optional[int] = None,
+        retry_after: float = 0.1,
+    ):
+        self.repos = {r.full_name: r for r in repos}
+        self.org = org
+        self.latency = latency
+        self.quota = quota
+        self.reset_seconds = reset_seconds
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.bytes_sent = 0
+        self.statuses: Counter = Counter()
+        self.endpoints: Counter = Counter()
+        self._used: Counter = Counter()
+        self._window_start = time.time()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "bytes": self.bytes_sent,
+            "statuses": dict(self.statuses),
+            "endpoints": dict(self.endpoints),
+        }
+
+    # Request handling.
+
+    def _limits(self, token: str):
+        """Count a request against ``token``; return (status or None, headers)."""
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.reset_seconds:
+                self._window_start = now
+                self._used.clear()
+            self.requests += 1
+            self._used[token] += 1
+            used = self._used[token]
+            n = self.requests
+            reset = self._window_start + self.reset_seconds
+        limit = self.quota or 5000
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(max(limit - used, 0)),
+            "X-RateLimit-Reset": str(int(reset) + 1),
+            "X-RateLimit-Resource": "core",
+        }
+        if self.quota is not None and used > self.quota:
+            return 403, headers
+        if self.throttle_every and n % self.throttle_every == 0:
+            headers["Retry-After"] = str(self.retry_after)
+            return 429, headers
+        return None, headers
+
+    def _route(self, path: str, query: Dict[str, str]):
+        """Return ``(endpoint name, status, payload, extra headers)``."""
+        parts = [p for p in path.split("/") if p]
+        if len(parts) == 3 and parts[0] in ("orgs", "users") and parts[2] == "repos":
+            if parts[1] != self.org:
+                return "repos", 404, {"message": "Not Found"}, {}
+            page = int(query.get("page", 1))
+            per_page = min(int(query.get("per_page", 30)), PER_PAGE_MAX)
+            names = sorted(self.repos)[(page - 1) * per_page : page * per_page]
+            payload = [
+                {"full_name": n, "pushed_at": self.repos[n].pushed_at, "archived": False, "fork": False}
+                for n in names
+            ]
+            return "repos", 200, payload, {}
+        if len(parts) >= 4 and parts[0] == "repos" and parts[3] == "commits":
+            repo = self.repos.get(f"{parts[1]}/{parts[2]}")
+            if repo is None:
+                return "commits", 404, {"message": "Not Found"}, {}
+            if len(parts) == 5:
+                detail = repo.detail(parts[4])
+                if detail is None:
+                    return "detail", 404, {"message": "No commit found"}, {}
+                return "detail", 200, detail, {}
+            return ("commits",) + self._commit_page(repo, path, query)
+        return "other", 404, {"message": "Not Found"}, {}
+
+    def _commit_page(self, repo: FakeRepo, path: str, query: Dict[str, str]):
+        since, until = query.get("since"), query.get("until")
+        # ``sha`` starts the listing at that commit instead of the branch tip.
+        tip = repo._by_sha.get(query.get("sha"), len(repo.commits) - 1)
+        newest_first = [
+            c
+            for c in reversed(repo.commits[: tip + 1])
+            if (since is None or c["date"] >= since) and (until is None or c["date"] <= until)
+        ]
+        per_page = min(int(query.get("per_page", 30)), PER_PAGE_MAX)
+        page = int(query.get("page", 1))
+        last = max(1, -(-len(newest_first) // per_page))
+        payload = [repo.listing_entry(c) for c in newest_first[(page - 1) * per_page : page * per_page]]
+        headers = {}
+        if last > 1:
+            links = []
+            if page < last:
+                links.append(f'<{self.url}{path}?{urlencode(dict(query, page=page + 1))}>; rel="next"')
+            links.append(f'<{self.url}{path}?{urlencode(dict(query, page=last))}>; rel="last"')
+            headers["Link"] = ", ".join(links)
+        return 200, payload, headers
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment; otherwise Nagle's
+            # algorithm and delayed ACKs add ~40ms to every keep-alive request.
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                url = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                status, headers = fake._limits(self.headers.get("Authorization", ""))
+                if status is not None:
+                    message = "API rate limit exceeded" if status == 403 else "secondary rate limit"
+                    endpoint, payload, extra = "limited", {"message": message}, {}
+                else:
+                    endpoint, status, payload, extra = fake._route(url.path, query)
+                headers.update(extra)
+                body = json.dumps(payload).encode()
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    status, body = 304, b""
+                with fake._lock:
+                    fake.statuses[status] += 1
+                    fake.endpoints[endpoint] += 1
+                    fake.bytes_sent += len(body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                if status in (200, 304):
+                    self.send_header("ETag", etag)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
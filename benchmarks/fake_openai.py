@@ -0,0 +1,47 @@
+"""Stub of the OpenAI client surface the summarizer calls.
+
+``responses.create`` sleeps for ``latency`` seconds and answers with a short
+fixed summary plus token usage, or a stream of text deltas for
+``stream=True``. Calls and prompt sizes are counted so scenarios can report
+them.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+
+from til_blog.summarizer import estimate_tokens
+
+SUMMARY = "- Tuned module values across the benchmark repositories.\n- Nothing else changed."
+
+
+class _Responses:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def create(self, model, input, max_output_tokens=None, temperature=None, stream=False, timeout=None):
+        owner = self.owner
+        with owner.lock:
+            owner.calls += 1
+            owner.prompt_chars += len(input)
+        if owner.latency:
+            time.sleep(owner.latency)
+        usage = SimpleNamespace(input_tokens=estimate_tokens(input), output_tokens=estimate_tokens(SUMMARY))
+        if not stream:
+            return SimpleNamespace(output_text=SUMMARY, usage=usage)
+        events = [SimpleNamespace(type="response.output_text.delta", delta=word + " ") for word in SUMMARY.split(" ")]
+        events.append(SimpleNamespace(type="response.completed", response=SimpleNamespace(usage=usage)))
+        return iter(events)
+
+
+class FakeOpenAI:
+    """Drop-in for ``Summarizer.client``."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.prompt_chars = 0
+        self.lock = threading.Lock()
+        self.responses = _Responses(self)
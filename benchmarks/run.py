@@ -0,0 +1,178 @@
+"""Run the benchmark scenarios and compare them with stored baselines.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.run                      # every scenario
+    python -m benchmarks.run github_poll --scale 0.5
+    python -m benchmarks.run --update-baseline    # record new baselines
+
+Every scenario runs in a fresh Python process, so its peak resident memory
+(``ru_maxrss``) is its own. The process includes the fake GitHub server and
+the scenario's setup. For each scenario the runner reports:
+
+* wall time of the timed part;
+* peak memory;
+* commit counts;
+* HTTP and OpenAI request counts.
+
+A tracked value that exceeds its baseline by more than ``--tolerance``, or a
+commit count that differs from its baseline at all, counts as a regression,
+and the exit status is 1. Baselines depend on the machine;
+record them where the comparison will run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+RESULT_MARK = "BENCH_RESULT "
+# Lower is better for each of these.
+TRACKED = ("wall_seconds", "peak_rss_mb", "http_requests", "openai_requests", "prompt_chars")
+# These must match the baseline exactly: a scenario that processes fewer
+# commits than it did is measuring a smaller workload, not getting faster.
+EXACT = ("commits",)
+DEFAULT_TOLERANCE = 0.25
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_child(name: str, scale: float):
+    """Set up and time one scenario in this process and print its result line."""
+    from benchmarks.scenarios import SCENARIOS
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as workdir:
+        run = SCENARIOS[name](workdir, scale)
+        gc.collect()
+        start = time.perf_counter()
+        result = run()
+        result["wall_seconds"] = round(time.perf_counter() - start, 3)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    print(RESULT_MARK + json.dumps(result), flush=True)
+
+
+def run_scenario(name: str, scale: float, verbose: bool = False) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--child", name, "--scale", str(scale)],
+        capture_output=True,
+        text=True,
+    )
+    if verbose:
+        sys.stderr.write(proc.stdout)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(RESULT_MARK):
+            return json.loads(line[len(RESULT_MARK):])
+    raise RuntimeError(f"scenario {name} failed (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+
+
+def load_baselines(path: str) -> dict:
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Return ``(metric, value, baseline)`` for every tracked regression."""
+    regressions = []
+    for metric in TRACKED:
+        value, base = result.get(metric), baseline.get(metric)
+        if value is None or base is None:
+            continue
+        if value > base * (1 + tolerance) and value - base > 0.05:
+            regressions.append((metric, value, base))
+    for metric in EXACT:
+        value, base = result.get(metric), baseline.get(metric)
+        if value is not None and base is not None and value != base:
+            regressions.append((metric, value, base))
+    return regressions
+
+
+def _format_row(name: str, result: dict, regressions: list) -> str:
+    flagged = {m for m, _, _ in regressions}
+
+    def cell(metric, fmt):
+        value = result.get(metric)
+        text = fmt.format(value) if value is not None else "-"
+        return text + ("!" if metric in flagged else "")
+
+    return (
+        f"{name:<22} {cell('wall_seconds', '{:.2f}s'):>9} {cell('peak_rss_mb', '{:.0f}MB'):>8} "
+        f"{cell('commits', '{}'):>8} {cell('http_requests', '{}'):>7} {cell('openai_requests', '{}'):>7}"
+    )
+
+
+def main(argv=None):
+    from benchmarks.scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run (default all): {', '.join(SCENARIOS)}")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every scenario's commit counts.")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baselines.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output", help="Also write the results as JSON to this file.")
+    parser.add_argument("--verbose", action="store_true", help="Show the scenarios' own output.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child, args.scale)
+        return 0
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    stored = load_baselines(args.baseline)
+    baselines = stored.get("scenarios", {}) if stored.get("scale") == args.scale else {}
+    if stored and not baselines:
+        print(f"Baselines were recorded at scale {stored.get('scale')}; not comparing.")
+
+    print(f"{'scenario':<22} {'wall':>9} {'peak':>8} {'commits':>8} {'http':>7} {'openai':>7}")
+    results, failed = {}, False
+    for name in names:
+        result = run_scenario(name, args.scale, args.verbose)
+        results[name] = result
+        regressions = compare(result, baselines.get(name, {}), args.tolerance)
+        print(_format_row(name, result, regressions))
+        for metric, value, base in regressions:
+            print(f"  regression: {metric} {value} vs baseline {base}")
+            failed = True
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        merged = dict(baselines)
+        merged.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {"scale": args.scale, "machine": f"{platform.system()} {platform.machine()}, Python {platform.python_version()}",
+                 "scenarios": merged},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+            f.write("\n")
+        print(f"Baselines written to {args.baseline}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
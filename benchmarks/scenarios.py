@@ -0,0 +1,180 @@
+"""Benchmark scenarios.
+
+Each scenario takes a scratch directory and a size ``scale``. Its setup
+(building repos, starting servers) happens before it returns a ``run()``
+callable, so only ``run()`` is timed. ``run()`` drives the real pipeline,
+with a :class:`FakeOpenAI` client standing in for OpenAI. It returns a dict
+of counts to report; the runner adds wall time and peak memory.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Callable, Dict, Iterable
+
+from til_blog import github_poller, metrics
+from til_blog.pipeline import LocalSource, Pipeline
+from til_blog.summarizer import Summarizer
+
+from benchmarks.fake_github import FakeGitHub, FakeRepo
+from benchmarks.fake_openai import FakeOpenAI
+from benchmarks.synthetic import make_commits, make_repo
+
+# Pace GitHub requests only as the fake server's limits require.
+FAST_RATE = {"github_rate_per_sec": 10000, "github_rate_burst": 10000}
+
+
+def _config(workdir: str, **extra) -> Dict:
+    config = {"state_file": os.path.join(workdir, "state.json"), "output_dir": os.path.join(workdir, "posts")}
+    config.update(extra)
+    return config
+
+
+def _pipeline(config: Dict, openai_latency: float = 0.0):
+    client = FakeOpenAI(latency=openai_latency)
+    summarizer = Summarizer(None, config)
+    summarizer.client = client
+    return Pipeline(config, summarizer=summarizer), client
+
+
+def _counts(client: FakeOpenAI) -> Dict:
+    report = metrics.get_metrics().report()
+    counters = report["counters"]
+    return {
+        "commits": int(sum(v for k, v in counters.items() if k.startswith("commits_fetched_total"))),
+        "kept": report["gauges"].get("commits_kept", 0),
+        "openai_requests": client.calls,
+        "prompt_chars": client.prompt_chars,
+        "http_requests": int(sum(v for k, v in counters.items() if k.startswith("http_requests_total"))),
+    }
+
+
+class _ListSource:
+    def __init__(self, commits: Iterable[Dict]):
+        self.commits = commits
+
+    def __iter__(self):
+        return iter(self.commits)
+
+    def finish(self):
+        pass
+
+    def save(self):
+        pass
+
+
+def local_scan(workdir: str, scale: float, repos: int = 1, commits: int = 2000, workers: int = 1) -> Callable:
+    paths = [
+        make_repo(os.path.join(workdir, f"repo-{i}"), max(1, int(commits * scale)), seed=i) for i in range(repos)
+    ]
+    # First scans are capped by default; scan every generated commit.
+    config = _config(workdir, repos=paths, scan_workers=workers, max_scan_commits=max(1, int(commits * scale)))
+
+    def run():
+        pipeline, client = _pipeline(config)
+        pipeline.run(LocalSource(config))
+        return _counts(client)
+
+    return run
+
+
+def local_parallel(workdir: str, scale: float) -> Callable:
+    return local_scan(workdir, scale, repos=4, commits=500, workers=4)
+
+
+def _github(workdir: str, scale: float, repos: int, commits: int, server_options: Dict, config: Dict) -> Callable:
+    fake_repos = [FakeRepo(f"bench/repo-{i}", max(1, int(commits * scale)), seed=i) for i in range(repos)]
+    config = _config(workdir, github_org="bench", **FAST_RATE, **config)
+
+    def run():
+        with FakeGitHub(fake_repos, **server_options) as api:
+            original = github_poller.GITHUB_API
+            github_poller.GITHUB_API = api.url
+            try:
+                pipeline, client = _pipeline(config)
+                pipeline.run(github_poller.GitHubSource(config, ["bench-token"]))
+            finally:
+                github_poller.GITHUB_API = original
+        counts = _counts(client)
+        counts["server_requests"] = api.requests
+        counts["server_bytes"] = api.bytes_sent
+        counts["throttled"] = api.statuses.get(403, 0) + api.statuses.get(429, 0)
+        return counts
+
+    return run
+
+
+def github_poll(workdir: str, scale: float) -> Callable:
+    return _github(workdir, scale, repos=20, commits=120, server_options={"latency": 0.005}, config={})
+
+
+def github_rate_limited(workdir: str, scale: float) -> Callable:
+    return _github(
+        workdir,
+        scale,
+        repos=10,
+        commits=120,
+        server_options={"latency": 0.005, "quota": 400, "reset_seconds": 2.0, "throttle_every": 97, "retry_after": 0.2},
+        config={"github_max_rate_wait": 10},
+    )
+
+
+def github_replay(workdir: str, scale: float) -> Callable:
+    """Replay a recorded poll at its original timing, as ``--replay`` would."""
+    fake_repos = [FakeRepo(f"bench/repo-{i}", max(1, int(120 * scale)), seed=i) for i in range(20)]
+    cassette = os.path.join(workdir, "github.db")
+    record = _config(workdir, github_org="bench", github_cassette=cassette, github_cassette_mode="record", **FAST_RATE)
+    with FakeGitHub(fake_repos, latency=0.005) as api:
+        original = github_poller.GITHUB_API
+        github_poller.GITHUB_API = api.url
+        try:
+            source = github_poller.GitHubSource(record, ["bench-token"])
+            list(source)  # state is not saved, so the replay asks for the same commits
+            source.session.close()
+        finally:
+            github_poller.GITHUB_API = original
+    config = dict(record, github_cassette_mode="replay", github_cassette_speed=1.0)
+    recorded_api = api.url  # requests must match the recorded URLs; the server is gone
+
+    def run():
+        original = github_poller.GITHUB_API
+        github_poller.GITHUB_API = recorded_api
+        try:
+            pipeline, client = _pipeline(config)
+            source = github_poller.GitHubSource(config, ["bench-token"])
+            pipeline.run(source)
+            counts = _counts(client)
+            counts["replayed"] = source.session.cassette.replayed
+            counts["misses"] = source.session.cassette.misses
+        finally:
+            github_poller.GITHUB_API = original
+        return counts
+
+    return run
+
+
+def summarize_map_reduce(workdir: str, scale: float, stream: bool = False) -> Callable:
+    commits = make_commits(max(1, int(600 * scale)))
+    config = _config(workdir, summary_stream=stream)
+
+    def run():
+        pipeline, client = _pipeline(config, openai_latency=0.05)
+        pipeline.run(_ListSource(commits))
+        return dict(_counts(client), commits=len(commits))
+
+    return run
+
+
+def summarize_stream(workdir: str, scale: float) -> Callable:
+    return summarize_map_reduce(workdir, scale, stream=True)
+
+
+SCENARIOS = {
+    "local_scan": local_scan,
+    "local_parallel": local_parallel,
+    "github_poll": github_poll,
+    "github_rate_limited": github_rate_limited,
+    "github_replay": github_replay,
+    "summarize_map_reduce": summarize_map_reduce,
+    "summarize_stream": summarize_stream,
+}
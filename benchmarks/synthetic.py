@@ -0,0 +1,84 @@
+"""Synthetic inputs: git repositories and commit payloads of a chosen size.
+
+Repositories are written with ``git fast-import``, which builds thousands of
+commits in a second or two. Every commit rewrites a band of lines in a few
+files, so each ``git log -p`` entry carries a diff of predictable size.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import subprocess
+from typing import Dict, List
+
+EPOCH = 1_700_000_000
+
+
+def _file_lines(seed: int, count: int) -> List[str]:
+    rng = random.Random(seed)
+    return [f"value_{i} = {rng.randrange(10 ** 8)}  # generated line {i}" for i in range(count)]
+
+
+def _data(payload: bytes) -> bytes:
+    return b"data %d\n%s\n" % (len(payload), payload)
+
+
+def make_repo(path: str, commits: int, files: int = 3, file_lines: int = 200, changed_lines: int = 40, seed: int = 0):
+    """Create a git repository at ``path`` with ``commits`` commits on ``main``.
+
+    Each commit changes ``changed_lines`` consecutive lines in every one of
+    ``files`` Python files.
+    """
+    os.makedirs(path, exist_ok=True)
+    subprocess.run(["git", "init", "-q", "-b", "main", path], check=True)
+    rng = random.Random(seed)
+    contents = {f"src/module_{i}.py": _file_lines(seed * 1000 + i, file_lines) for i in range(files)}
+
+    # Stream commit by commit so large histories are never held in memory.
+    importer = subprocess.Popen(["git", "fast-import", "--quiet"], cwd=path, stdin=subprocess.PIPE)
+    out = importer.stdin
+    for n in range(1, commits + 1):
+        when = EPOCH + n * 60
+        message = f"Change {n}: tune module values\n\nSynthetic commit {n} for benchmarks.\n".encode()
+        out.write(b"commit refs/heads/main\nmark :%d\n" % n)
+        out.write(b"author Bench <bench@example.com> %d +0000\n" % when)
+        out.write(b"committer Bench <bench@example.com> %d +0000\n" % when)
+        out.write(_data(message))
+        if n > 1:
+            out.write(b"from :%d\n" % (n - 1))
+        for name, lines in contents.items():
+            start = rng.randrange(max(1, file_lines - changed_lines))
+            for i in range(start, min(start + changed_lines, file_lines)):
+                lines[i] = f"value_{i} = {rng.randrange(10 ** 8)}  # revised in commit {n}"
+            out.write(b"M 100644 inline %s\n" % name.encode())
+            out.write(_data(("\n".join(lines) + "\n").encode()))
+    out.close()
+    if importer.wait() != 0:
+        raise RuntimeError(f"git fast-import failed for {path}")
+    subprocess.run(["git", "checkout", "-q", "main"], cwd=path, check=True)
+    return path
+
+
+def make_patch(seed: int, lines: int) -> str:
+    rng = random.Random(seed)
+    body = []
+    for i in range(lines):
+        body.append(f"-value_{i} = {rng.randrange(10 ** 8)}")
+        body.append(f"+value_{i} = {rng.randrange(10 ** 8)}")
+    return "@@ -1,%d +1,%d @@ def tune():\n%s" % (lines, lines, "\n".join(body))
+
+
+def make_commits(count: int, repos: int = 4, files: int = 3, patch_lines: int = 60) -> List[Dict]:
+    """Commit dicts (as the sources produce them) spread over ``repos`` repositories."""
+    return [
+        {
+            "sha": f"{n:040x}",
+            "message": f"Change {n}: tune module values",
+            "repo": f"bench/repo-{n % repos}",
+            "files": [
+                {"filename": f"src/module_{i}.py", "patch": make_patch(n * 10 + i, patch_lines)} for i in range(files)
+            ],
+        }
+        for n in range(count)
+    ]
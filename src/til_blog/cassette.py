@@ -0,0 +1,205 @@
+"""Record and replay the poller's GitHub traffic.
+
+In record mode every response the session receives is stored in a SQLite
+archive with its request method and URL, status, headers, zlib-compressed
+body and timing:
+
+* ``elapsed``: how long the response took;
+* ``offset``: when the request started, relative to the first request.
+
+Each row is committed as it is written, so a recording that dies part-way
+keeps everything up to that point. Request credentials are never stored.
+
+In replay mode the session sends nothing over the network. Each request is
+answered with the next recorded response for the same method, URL and
+request body. Repeats, such as retries after a 429, get the responses that
+followed in the recording, and the last one is reused once they run out.
+Rate-limit headers come back exactly as recorded, so the limiter reacts as
+it did during the real run.
+
+Every replayed response waits ``elapsed * speed`` in the calling thread, so
+concurrent fetches overlap as they did originally. ``speed`` 1.0 keeps the
+original timing and 0 replays as fast as possible. Replaying a request that
+was never recorded raises :class:`CassetteMiss`.
+
+Conditional requests are matched on the URL alone, so replay with the same
+``http_cache_dir`` contents the recording started with.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    elapsed REAL NOT NULL,
+    offset REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_key ON responses (key, id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Transport and per-connection headers say nothing about the recorded body.
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+
+class CassetteMiss(LookupError):
+    """A replayed request has no recorded response."""
+
+
+def request_url(method: str, url: str, params: Optional[dict] = None) -> str:
+    """The URL ``requests`` would send, with ``params`` encoded into it."""
+    return requests.Request(method.upper(), url, params=params).prepare().url
+
+
+def request_key(method: str, url: str, params: Optional[dict] = None, body: Any = None) -> str:
+    material = [method.upper(), request_url(method, url, params)]
+    if body is not None:
+        material.append(json.dumps(body, sort_keys=True, default=str))
+    return hashlib.sha256(json.dumps(material).encode()).hexdigest()
+
+
+class Cassette:
+    """SQLite archive of recorded responses; ``mode`` is ``record`` or ``replay``."""
+
+    def __init__(self, path: str, mode: str = "replay", speed: float = 1.0, clock=time.monotonic, sleep=time.sleep):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown cassette mode: {mode}")
+        if mode == "replay" and not os.path.exists(path):
+            raise FileNotFoundError(f"No cassette at {path}")
+        self.path = path
+        self.mode = mode
+        self.speed = float(speed)
+        self.clock = clock
+        self.sleep = sleep
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        if mode == "record":
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.executescript(SCHEMA)
+        self._index: Dict[str, List[int]] = {}
+        self._cursor: Dict[str, int] = {}
+        if mode == "record":
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('recorded_at', ?)",
+                (time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),),
+            )
+        else:
+            for key, row_id in self._conn.execute("SELECT key, id FROM responses ORDER BY id"):
+                self._index.setdefault(key, []).append(row_id)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _now(self) -> float:
+        with self._lock:
+            now = self.clock()
+            if self._started is None:
+                self._started = now
+            return now - self._started
+
+    def start(self) -> float:
+        """Mark the start of a request; pass the result to :meth:`record`."""
+        return self._now()
+
+    def record(self, method: str, url: str, params, body, response, started: float):
+        """Store ``response`` to the request described by the other arguments."""
+        headers = getattr(response, "headers", None) or {}
+        row = (
+            request_key(method, url, params, body),
+            method.upper(),
+            request_url(method, url, params),
+            getattr(response, "status_code", 200),
+            json.dumps({k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS}),
+            zlib.compress(getattr(response, "content", None) or b""),
+            max(self._now() - started, 0.0),
+            started,
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO responses (key, method, url, status, headers, body, elapsed, offset)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            self.recorded += 1
+
+    def replay(self, method: str, url: str, params=None, body=None) -> requests.Response:
+        """Return the next recorded response for this request, after its recorded delay."""
+        key = request_key(method, url, params, body)
+        with self._lock:
+            ids = self._index.get(key)
+            if not ids:
+                self.misses += 1
+                raise CassetteMiss(f"{method.upper()} {request_url(method, url, params)} is not in {self.path}")
+            position = self._cursor.get(key, 0)
+            self._cursor[key] = position + 1
+            row = self._conn.execute(
+                "SELECT url, status, headers, body, elapsed FROM responses WHERE id = ?",
+                (ids[min(position, len(ids) - 1)],),
+            ).fetchone()
+            self.replayed += 1
+        recorded_url, status, headers, data, elapsed = row
+        if self.speed > 0 and elapsed > 0:
+            self.sleep(elapsed * self.speed)
+        response = requests.Response()
+        response.status_code = status
+        response._content = zlib.decompress(data)
+        response.encoding = "utf-8"
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response.url = recorded_url
+        try:
+            response.reason = HTTPStatus(status).phrase
+        except ValueError:
+            response.reason = ""
+        response.from_cassette = True
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "recorded": self.recorded, "replayed": self.replayed, "misses": self.misses}
+
+    def close(self):
+        self._conn.close()
+
+
+def from_config(config) -> Optional[Cassette]:
+    """Return the cassette named by ``github_cassette`` in config, or None."""
+    path = config.get("github_cassette")
+    if not path:
+        return None
+    return Cassette(
+        os.path.expanduser(str(path)),
+        mode=config.get("github_cassette_mode", "replay"),
+        speed=float(config.get("github_cassette_speed", 1.0)),
+    )
@@ -0,0 +1,162 @@
+"""Drop commits that add nothing to a TIL post before they are summarised.
+
+Bot commits (``chore: daily TIL posts [skip ci]``), merge commits and the
+same change landing twice (duplicate SHAs from overlapping sources, or a
+cherry-pick onto another branch) inflate prompts without telling the reader
+anything. :class:`CommitFilter` removes them and counts what it dropped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_EXCLUDE_MESSAGES = [r"\[skip ci\]", r"^chore: (add )?daily TIL posts"]
+DEFAULT_BOT_AUTHORS = [r"\[bot\]", r"^dependabot\b", r"^renovate\b"]
+
+_MERGE_MESSAGE = re.compile(r"^Merge (pull request #\d+|branch |remote-tracking branch |tag )")
+_CHERRY_PICK = re.compile(r"\(cherry picked from commit ([0-9a-f]{7,40})\)")
+_HUNK_HEADER = re.compile(r"^@@ [^@]* @@", re.MULTILINE)
+
+
+def _compile(patterns: Iterable[str]) -> List[re.Pattern]:
+    return [re.compile(p, re.MULTILINE) for p in patterns or []]
+
+
+def commit_bytes(commit: Dict[str, Any]) -> int:
+    """Approximate prompt size of a commit: its message plus every patch."""
+    size = len(commit.get("message") or "")
+    for f in commit.get("files") or []:
+        size += len(f.get("patch") or "")
+    return size
+
+
+def patch_fingerprint(commit: Dict[str, Any]) -> Optional[str]:
+    """Hash of a commit's diff with line numbers removed, like ``git patch-id``.
+
+    A cherry-picked commit has a new SHA and usually shifted hunk offsets, but
+    the same files and changed lines. Returns None when there are no patches
+    to compare.
+    """
+    parts = []
+    for f in sorted(commit.get("files") or [], key=lambda f: str(f.get("filename"))):
+        patch = f.get("patch")
+        if not patch:
+            continue
+        parts.append(str(f.get("filename")))
+        parts.append(_HUNK_HEADER.sub("@@", patch))
+    if not parts:
+        return None
+    return hashlib.sha1("\0".join(parts).encode("utf-8", errors="replace")).hexdigest()
+
+
+class CommitFilter:
+    """Configurable noise filter applied between commit sources and the summarizer."""
+
+    def __init__(
+        self,
+        exclude_messages: Optional[List[str]] = None,
+        exclude_authors: Optional[List[str]] = None,
+        bot_authors: Optional[List[str]] = None,
+        skip_merges: bool = True,
+        skip_bots: bool = True,
+        dedupe: bool = True,
+    ):
+        self.exclude_messages = _compile(DEFAULT_EXCLUDE_MESSAGES if exclude_messages is None else exclude_messages)
+        self.exclude_authors = _compile(exclude_authors)
+        self.bot_authors = _compile(DEFAULT_BOT_AUTHORS if bot_authors is None else bot_authors)
+        self.skip_merges = skip_merges
+        self.skip_bots = skip_bots
+        self.dedupe = dedupe
+        self.kept = 0
+        self.dropped: Counter = Counter()
+        self.bytes_dropped = 0
+
+    def _is_merge(self, commit: Dict[str, Any]) -> bool:
+        parents = commit.get("parents")
+        if parents is not None:
+            return parents > 1
+        # Sources without parent information: fall back to git's default
+        # merge messages.
+        return bool(_MERGE_MESSAGE.match(commit.get("message") or ""))
+
+    def reason(self, commit: Dict[str, Any]) -> Optional[str]:
+        """Return why ``commit`` should be dropped on its own merits, or None."""
+        message = commit.get("message") or ""
+        author = commit.get("author") or ""
+        if self.skip_merges and self._is_merge(commit):
+            return "merge"
+        if self.skip_bots and author and any(p.search(author) for p in self.bot_authors):
+            return "bot"
+        if any(p.search(message) for p in self.exclude_messages):
+            return "message"
+        if author and any(p.search(author) for p in self.exclude_authors):
+            return "author"
+        return None
+
+    def apply(self, commits: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return the commits worth summarising, in their original order."""
+        return list(self.filter(commits))
+
+    def filter(self, commits: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the commits worth summarising as they arrive.
+
+        The first occurrence of a duplicated SHA or diff is kept; later ones
+        (including cherry-picks that name an already-seen commit) are dropped.
+        Only SHAs and patch hashes are remembered between commits.
+        """
+        seen_shas = set()
+        seen_patches = set()
+        for commit in commits:
+            sha = commit.get("sha") or ""
+            why = self.reason(commit)
+            fingerprint = None
+            if why is None and self.dedupe:
+                picked = _CHERRY_PICK.search(commit.get("message") or "")
+                fingerprint = patch_fingerprint(commit)
+                if sha in seen_shas:
+                    why = "duplicate"
+                elif picked and any(s.startswith(picked.group(1)) for s in seen_shas):
+                    why = "cherry-pick"
+                elif fingerprint is not None and fingerprint in seen_patches:
+                    why = "cherry-pick"
+            if why is not None:
+                self.dropped[why] += 1
+                self.bytes_dropped += commit_bytes(commit)
+                continue
+            seen_shas.add(sha)
+            if fingerprint is not None:
+                seen_patches.add(fingerprint)
+            self.kept += 1
+            yield commit
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kept": self.kept,
+            "dropped": sum(self.dropped.values()),
+            "bytes_dropped": self.bytes_dropped,
+            "reasons": dict(self.dropped),
+        }
+
+    def report(self) -> str:
+        stats = self.stats()
+        reasons = ", ".join(f"{n} {why}" for why, n in sorted(stats["reasons"].items())) or "none"
+        return (
+            f"Commit filter: kept {stats['kept']}, dropped {stats['dropped']} "
+            f"({stats['bytes_dropped']} bytes; {reasons})"
+        )
+
+
+def from_config(config) -> CommitFilter:
+    """Build the filter from the ``commit_filter`` section of config."""
+    section = config.get("commit_filter") or {}
+    return CommitFilter(
+        exclude_messages=section.get("exclude_messages"),
+        exclude_authors=section.get("exclude_authors"),
+        bot_authors=section.get("bot_authors"),
+        skip_merges=bool(section.get("skip_merges", True)),
+        skip_bots=bool(section.get("skip_bots", True)),
+        dedupe=bool(section.get("dedupe", True)),
+    )
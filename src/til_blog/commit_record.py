@@ -0,0 +1,208 @@
+"""Compact commit records with patch bodies spilled to disk.
+
+Every commit source used to produce plain dicts holding whole patch strings,
+and each later stage copied them again. :class:`CommitRecord` and
+:class:`FileChange` use ``__slots__``. Patches longer than
+``SPILL_MIN_CHARS`` are appended to a process-wide temporary spool file, and
+only an ``(offset, length)`` reference stays in memory. The text is read back
+when a stage asks for ``patch``.
+
+Both classes are read-only mappings (``record["sha"]``, ``record.get(...)``,
+``dict(record)``), so code and tests that treat commits as dicts keep working.
+Unset fields are left out of ``dict(record)``, as they would be from a dict.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from collections.abc import Mapping
+from typing import Any, Iterator, List, Optional
+
+SPILL_MIN_CHARS = 256
+
+
+class PatchSpool:
+    """Append-only temporary file of UTF-8 patch bodies."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._fd = self._file.fileno()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, text: str) -> "_SpooledPatch":
+        data = text.encode("utf-8", errors="surrogatepass")
+        with self._lock:
+            offset = self._size
+            os.pwrite(self._fd, data, offset)
+            self._size += len(data)
+        return _SpooledPatch(self, offset, len(data))
+
+    def read(self, offset: int, length: int) -> str:
+        return os.pread(self._fd, length, offset).decode("utf-8", errors="surrogatepass")
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def close(self):
+        self._file.close()
+
+
+class _SpooledPatch:
+    __slots__ = ("spool", "offset", "length")
+
+    def __init__(self, spool: PatchSpool, offset: int, length: int):
+        self.spool = spool
+        self.offset = offset
+        self.length = length
+
+    def load(self) -> str:
+        return self.spool.read(self.offset, self.length)
+
+
+_spool: Optional[PatchSpool] = None
+_spool_lock = threading.Lock()
+
+
+def _reset_spool_in_child():
+    # A forked scan worker shares the parent's spool file descriptor but has
+    # its own copy of ``_size``; appending to it would overwrite the parent's
+    # (and sibling workers') patches. Records inherited from the parent still
+    # read from the parent's file; new ones go to a spool of the child's own.
+    global _spool, _spool_lock
+    _spool = None
+    _spool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_spool_in_child)
+
+
+def get_spool() -> PatchSpool:
+    """Return this process's spool, creating it on first use."""
+    global _spool
+    with _spool_lock:
+        if _spool is None:
+            _spool = PatchSpool()
+        return _spool
+
+
+class _Record(Mapping):
+    """Mapping view over ``__slots__`` fields.
+
+    Unset (None) fields are left out of iteration, ``in`` and ``dict()``,
+    and ``get`` falls back to its default for them as a dict would, but
+    indexing a known field always works and may return None.
+    """
+
+    __slots__ = ()
+    _fields: tuple = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._fields and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        if key not in self._fields:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __iter__(self) -> Iterator[str]:
+        return (k for k in self._fields if getattr(self, k) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def replace(self, **changes):
+        """Return a copy with ``changes`` applied."""
+        values = {k: getattr(self, k) for k in self._fields}
+        values.update(changes)
+        return type(self)(**values)
+
+
+class FileChange(_Record):
+    """One changed file of a commit."""
+
+    __slots__ = ("filename", "status", "additions", "deletions", "_patch", "kind", "weight")
+    _fields = ("filename", "status", "additions", "deletions", "patch", "kind", "weight")
+
+    def __init__(self, filename, status=None, additions=None, deletions=None, patch=None, kind=None, weight=None):
+        self.filename = filename
+        self.status = status
+        self.additions = additions
+        self.deletions = deletions
+        self.kind = kind
+        self.weight = weight
+        self.patch = patch
+
+    @property
+    def patch(self) -> Optional[str]:
+        value = self._patch
+        return value.load() if isinstance(value, _SpooledPatch) else value
+
+    @patch.setter
+    def patch(self, text: Optional[str]):
+        if text is not None and len(text) >= SPILL_MIN_CHARS:
+            self._patch = get_spool().put(text)
+        else:
+            self._patch = text
+
+    def replace(self, **changes):
+        if "patch" not in changes and isinstance(self._patch, _SpooledPatch):
+            # Share the spooled body instead of writing it again.
+            copy = super().replace(patch=None, **changes)
+            copy._patch = self._patch
+            return copy
+        return super().replace(**changes)
+
+    def __reduce__(self):
+        # Spool offsets mean nothing in another process; send the text.
+        return (FileChange, tuple(getattr(self, k) for k in self._fields))
+
+    @classmethod
+    def from_mapping(cls, f) -> "FileChange":
+        if isinstance(f, FileChange):
+            return f
+        return cls(**{k: f.get(k) for k in cls._fields})
+
+
+class CommitRecord(_Record):
+    """A commit as it travels from a source to the summarizer."""
+
+    __slots__ = ("sha", "message", "files", "repo", "date", "author", "parents")
+    _fields = __slots__
+
+    def __init__(self, sha, message="", files=None, repo=None, date=None, author=None, parents=None):
+        self.sha = sha
+        self.message = message
+        self.files: List[FileChange] = [FileChange.from_mapping(f) for f in files or []]
+        self.repo = repo
+        self.date = date
+        self.author = author
+        self.parents = parents
+
+    def __reduce__(self):
+        return (CommitRecord, tuple(getattr(self, k) for k in self._fields))
+
+    def to_dict(self) -> dict:
+        """Plain, JSON-serialisable form (patch text included)."""
+        out = dict(self)
+        out["files"] = [dict(f) for f in self.files]
+        return out
+
+    @classmethod
+    def from_mapping(cls, commit) -> "CommitRecord":
+        if isinstance(commit, CommitRecord):
+            return commit
+        return cls(**{k: commit.get(k) for k in cls._fields})
@@ -0,0 +1,132 @@
+"""Content-addressed store for commit payloads.
+
+A commit SHA names its content, so once a commit's files and patches have
+been seen they never need to be fetched again. Payloads are zlib-compressed
+JSON stored under ``<root>/<sha[:2]>/<sha[2:]>``; the least recently used
+entries are evicted when the store grows past its byte budget.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+# Fields kept from each entry of a GitHub commit's ``files`` list.
+FILE_FIELDS = ("filename", "status", "additions", "deletions", "patch")
+
+
+def slim_files(files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep only the per-file fields worth storing."""
+    return [{k: f.get(k) for k in FILE_FIELDS if f.get(k) is not None} for f in files or []]
+
+
+class CommitStore:
+    """Immutable on-disk cache of ``{"sha", "message", "files"}`` payloads."""
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        entries = []
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if len(shard) != 2 or not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.endswith(".tmp"):
+                    continue
+                st = os.stat(os.path.join(shard_dir, name))
+                entries.append((st.st_mtime, shard + name, st.st_size))
+        for _, sha, size in sorted(entries):
+            self._sizes[sha] = size
+            self._total += size
+
+    def _path(self, sha: str) -> str:
+        return os.path.join(self.root, sha[:2], sha[2:])
+
+    def __contains__(self, sha: str) -> bool:
+        return sha in self._sizes
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def get(self, sha: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if sha not in self._sizes:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(sha), "rb") as f:
+                    payload = json.loads(zlib.decompress(f.read()))
+            except (OSError, ValueError, zlib.error):
+                self._discard(sha)
+                self.misses += 1
+                return None
+            self._sizes.move_to_end(sha)
+            try:
+                os.utime(self._path(sha))
+            except OSError:
+                pass
+            self.hits += 1
+            return payload
+
+    def put(self, sha: str, payload: Dict[str, Any]):
+        """Store ``payload`` for ``sha``; existing entries are left untouched."""
+        if not sha or sha in self._sizes:
+            return
+        data = zlib.compress(json.dumps(payload).encode("utf-8"))
+        path = self._path(sha)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            self._sizes[sha] = len(data)
+            self._total += len(data)
+            self._evict()
+
+    def _discard(self, sha: str):
+        self._total -= self._sizes.pop(sha, 0)
+        try:
+            os.remove(self._path(sha))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._sizes) > 1:
+            self._discard(next(iter(self._sizes)))
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._sizes),
+            "bytes": self._total,
+        }
+
+
+def from_config(config) -> Optional[CommitStore]:
+    """Return a store for ``commit_store_dir`` in config, or None if unset."""
+    root = config.get("commit_store_dir")
+    if not root:
+        return None
+    max_mb = config.get("commit_store_max_mb")
+    max_bytes = int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES
+    return CommitStore(os.path.expanduser(str(root)), max_bytes=max_bytes)
@@ -0,0 +1,220 @@
+"""Shrink commit diffs to the parts worth showing the summarizer.
+
+Lockfiles, vendored trees, generated code and binaries say nothing a reader
+of a TIL post cares about beyond "this changed", so they are collapsed to
+their line counts. The remaining patches lose context lines and hunks that
+only change whitespace, and each file gets a relevance weight that
+``summarizer.pack_prompt`` uses to share the patch budget.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from til_blog.commit_record import CommitRecord, FileChange
+
+LOCKFILES = {
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "bun.lockb",
+    "poetry.lock",
+    "Pipfile.lock",
+    "uv.lock",
+    "pdm.lock",
+    "Cargo.lock",
+    "go.sum",
+    "composer.lock",
+    "Gemfile.lock",
+    "mix.lock",
+    "pubspec.lock",
+    "Podfile.lock",
+    "flake.lock",
+}
+VENDOR_DIRS = {"vendor", "vendored", "node_modules", "third_party", "third-party", "external", "bower_components"}
+GENERATED_DIRS = {"dist", "build", "out", "__generated__", "generated"}
+GENERATED_SUFFIXES = (
+    ".min.js",
+    ".min.css",
+    ".map",
+    "_pb2.py",
+    "_pb2_grpc.py",
+    ".pb.go",
+    ".pb.cc",
+    ".pb.h",
+    ".g.dart",
+    ".designer.cs",
+    ".snap",
+)
+BINARY_SUFFIXES = (
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".bmp", ".pdf", ".zip", ".gz", ".tgz", ".bz2",
+    ".xz", ".7z", ".jar", ".whl", ".so", ".dylib", ".dll", ".exe", ".bin", ".woff", ".woff2", ".ttf",
+    ".otf", ".eot", ".mp3", ".mp4", ".mov", ".wav", ".sqlite", ".db", ".pyc",
+)
+DOC_SUFFIXES = (".md", ".rst", ".txt", ".adoc")
+CONFIG_SUFFIXES = (".yml", ".yaml", ".toml", ".ini", ".cfg", ".json", ".xml")
+GENERATED_MARKERS = ("@generated", "DO NOT EDIT", "Code generated by", "auto-generated", "autogenerated")
+
+# Files of these kinds are listed with their stats only.
+COLLAPSED_KINDS = ("lockfile", "vendored", "generated", "binary")
+# Relative share of the patch budget, and of the per-file cap.
+RELEVANCE = {"code": 1.0, "test": 0.6, "config": 0.4, "docs": 0.4}
+
+# Bundled web assets are often committed minified without a telltale name.
+MINIFIABLE_SUFFIXES = (".js", ".mjs", ".cjs", ".css", ".svg", ".html", ".json")
+MINIFIED_LINE_CHARS = 500
+TRUNCATED_MARKER = "...[truncated]"
+_HUNK_HEADER = re.compile(r"^@@ [^@]* @@ ?(.*)$")
+
+
+def _is_test(parts: List[str]) -> bool:
+    base = parts[-1]
+    return (
+        any(p in ("test", "tests", "spec", "specs", "__tests__") for p in parts[:-1])
+        or base.startswith("test_")
+        or re.search(r"[._-](test|spec)\.[^.]+$", base) is not None
+        or base.endswith("_test.go")
+    )
+
+
+def classify_file(filename: str, patch: Optional[str] = None) -> str:
+    """Return the kind of a changed file.
+
+    One of ``lockfile``, ``vendored``, ``generated``, ``binary``, ``test``,
+    ``docs``, ``config`` or ``code``.
+    """
+    path = (filename or "").replace("\\", "/")
+    parts = [p for p in path.split("/") if p] or [""]
+    base = parts[-1]
+    lower = base.lower()
+    if base in LOCKFILES:
+        return "lockfile"
+    if any(p in VENDOR_DIRS for p in parts[:-1]):
+        return "vendored"
+    if lower.endswith(BINARY_SUFFIXES):
+        return "binary"
+    if lower.endswith(GENERATED_SUFFIXES) or any(p in GENERATED_DIRS for p in parts[:-1]):
+        return "generated"
+    if patch:
+        head = patch[:1000]
+        if any(marker in head for marker in GENERATED_MARKERS):
+            return "generated"
+        if lower.endswith(MINIFIABLE_SUFFIXES) and any(len(line) > MINIFIED_LINE_CHARS for line in patch.split("\n")):
+            return "generated"
+    if _is_test(parts):
+        return "test"
+    if lower.endswith(DOC_SUFFIXES):
+        return "docs"
+    if lower.endswith(CONFIG_SUFFIXES):
+        return "config"
+    return "code"
+
+
+def _whitespace_only(removed: List[str], added: List[str]) -> bool:
+    def norm(lines):
+        return Counter("".join(line[1:].split()) for line in lines)
+
+    return bool(removed or added) and norm(removed) == norm(added)
+
+
+def compact_patch(patch: str) -> str:
+    """Drop context lines and whitespace-only hunks from a unified diff.
+
+    Hunk headers keep only their section heading (usually the enclosing
+    function), which tells the model more than line numbers do.
+    """
+    out: List[str] = []
+    header: Optional[str] = None
+    removed: List[str] = []
+    added: List[str] = []
+    body: List[str] = []
+
+    def flush():
+        if header is None:
+            return
+        if body and not _whitespace_only(removed, added):
+            out.append(header)
+            out.extend(body)
+
+    for line in patch.split("\n"):
+        match = _HUNK_HEADER.match(line)
+        if match:
+            flush()
+            header = f"@@ {match.group(1)}".rstrip()
+            removed, added, body = [], [], []
+            continue
+        if header is None:
+            out.append(line)
+            continue
+        if line.startswith("+"):
+            added.append(line)
+        elif line.startswith("-"):
+            removed.append(line)
+        elif line.startswith(" ") or line.startswith("\\") or not line:
+            continue  # context, "\ No newline at end of file"
+        body.append(line)
+    flush()
+    return "\n".join(out)
+
+
+def _line_stats(patch: str):
+    added = deleted = 0
+    for line in patch.split("\n"):
+        if line.startswith("+"):
+            added += 1
+        elif line.startswith("-"):
+            deleted += 1
+    return added, deleted
+
+
+def trim_patch(patch: str, max_chars: int) -> str:
+    """Cut ``patch`` on a line boundary so it is at most ``max_chars`` long, marker included."""
+    if len(patch) <= max_chars:
+        return patch
+    room = max(max_chars - len(TRUNCATED_MARKER) - 1, 0)
+    cut = patch.rfind("\n", 0, room + 1)
+    return patch[: cut if cut > 0 else room] + "\n" + TRUNCATED_MARKER
+
+
+def compact_file(f, max_chars: Optional[int] = None) -> FileChange:
+    """Return a copy of a file entry with ``kind``, ``weight`` and a compacted patch.
+
+    With ``max_chars``, the compacted patch is also trimmed to that many
+    characters scaled by the file's weight, so callers that hold many
+    commits keep only what a prompt could use. Entries that already have a
+    ``kind`` are returned unchanged.
+    """
+    f = FileChange.from_mapping(f)
+    if f.kind is not None:
+        return f
+    patch = f.patch or ""
+    kind = classify_file(str(f.filename or ""), patch)
+    changes: Dict[str, Any] = {"kind": kind}
+    if patch and (f.additions is None or f.deletions is None):
+        changes["additions"], changes["deletions"] = _line_stats(patch)
+    if kind in COLLAPSED_KINDS:
+        return f.replace(patch=None, weight=0.0, **changes)
+    changes["weight"] = RELEVANCE.get(kind, 1.0)
+    if patch:
+        patch = compact_patch(patch)
+        if max_chars is not None:
+            patch = trim_patch(patch, int(max_chars * changes["weight"]))
+        changes["patch"] = patch or None
+    return f.replace(**changes)
+
+
+def compact_commit(commit, max_chars: Optional[int] = None) -> CommitRecord:
+    """Return ``commit`` with every file run through :func:`compact_file`."""
+    commit = CommitRecord.from_mapping(commit)
+    return commit.replace(files=[compact_file(f, max_chars) for f in commit.files])
+
+
+def describe_collapsed(f: Dict[str, Any]) -> str:
+    """One-line stand-in for a file whose diff was dropped."""
+    stats = ""
+    if f.get("additions") is not None and f.get("deletions") is not None:
+        stats = f", +{f['additions']} -{f['deletions']}"
+    return f"({f.get('kind')}{stats}; diff omitted)"
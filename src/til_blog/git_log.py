@@ -0,0 +1,240 @@
+"""Stream commits with numstat and patches from a single ``git log -p``.
+
+Running one ``git log`` per repository and parsing its output as it arrives
+avoids a diff subprocess per commit, and memory stays bounded because each
+file's patch is truncated while it is read rather than after.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, Optional
+
+from git.exc import GitCommandError
+
+from til_blog.commit_record import CommitRecord, FileChange
+
+DEFAULT_PATCH_MAX_CHARS = 4000
+TRUNCATED_MARKER = "...[truncated]"
+
+_COMMIT_START = "\x1e"
+_FIELD_SEP = "\x1f"
+_MESSAGE_END = "\x1d"
+LOG_FORMAT = "%x1e%H%x1f%cI%x1f%an <%ae>%x1f%P%x1f%B%x1d"
+
+
+class _FileDiff:
+    __slots__ = ("filename", "status", "lines", "size", "truncated", "in_hunks")
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.status = "modified"
+        self.lines: List[str] = []
+        self.size = 0
+        self.truncated = False
+        self.in_hunks = False
+
+    def add_patch_line(self, line: str, max_chars: int):
+        if self.truncated:
+            return
+        if self.size + len(line) + 1 > max_chars:
+            self.lines.append(TRUNCATED_MARKER)
+            self.truncated = True
+            return
+        self.lines.append(line)
+        self.size += len(line) + 1
+
+
+_C_ESCAPES = {"a": 7, "b": 8, "f": 12, "n": 10, "r": 13, "t": 9, "v": 11, '"': 34, "\\": 92}
+
+
+def _unquote(name: str) -> str:
+    """Undo git's C-style quoting of a path such as ``"b/tab\\there"``."""
+    if len(name) < 2 or name[0] != '"' or name[-1] != '"':
+        return name
+    out = bytearray()
+    i, end = 1, len(name) - 1
+    while i < end:
+        ch = name[i]
+        if ch == "\\" and i + 1 < end:
+            nxt = name[i + 1]
+            if nxt in "01234567":
+                # Octal escapes are the bytes of a UTF-8 encoded name.
+                out.append(int(name[i + 1:i + 4], 8) & 0xFF)
+                i += 4
+            else:
+                out.append(_C_ESCAPES.get(nxt, ord(nxt)))
+                i += 2
+            continue
+        out += ch.encode("utf-8")
+        i += 1
+    return out.decode("utf-8", errors="replace")
+
+
+def _header_path(value: str, prefix: str) -> Optional[str]:
+    """Path in a ``---``/``+++`` header, or None for ``/dev/null``.
+
+    Git ends the header with a tab when the name contains a space, and quotes
+    names with special characters.
+    """
+    if value.endswith("\t"):
+        value = value[:-1]
+    value = _unquote(value)
+    return value[len(prefix):] if value.startswith(prefix) else None
+
+
+def _diff_git_filename(line: str) -> str:
+    # "diff --git a/<old> b/<new>"; the header lines that follow are more
+    # reliable, this is only a fallback for mode-only changes.
+    rest = line[len("diff --git "):]
+    if rest.endswith('"'):
+        idx = rest.rfind(' "b/')
+        if idx != -1:
+            return _unquote(rest[idx + 1:])[2:]
+    idx = rest.rfind(" b/")
+    return rest[idx + 3:] if idx != -1 else rest
+
+
+def _numstat(line: str):
+    parts = line.split("\t", 2)
+    if len(parts) != 3:
+        return None
+    added, deleted, _ = parts
+    if added == "-" and deleted == "-":
+        return None, None  # binary
+    if not (added.isdigit() and deleted.isdigit()):
+        return None
+    return int(added), int(deleted)
+
+
+class _CommitBuilder:
+    def __init__(self, header: str, repo_name: str):
+        sha, date, author, parents, message = header.split(_FIELD_SEP, 4)
+        self.sha = sha
+        self.date = date
+        self.author = author
+        self.parents = len(parents.split())
+        self.message_lines = [message]
+        self.message_done = False
+        self.repo_name = repo_name
+        self.numstats: List[tuple] = []
+        self.files: List[_FileDiff] = []
+
+    def build(self) -> CommitRecord:
+        files = []
+        for i, f in enumerate(self.files):
+            additions = deletions = None
+            if i < len(self.numstats) and self.numstats[i][0] is not None:
+                additions, deletions = self.numstats[i]
+            patch = "\n".join(f.lines) if f.lines else None
+            files.append(FileChange(f.filename, f.status, additions, deletions, patch))
+        return CommitRecord(
+            self.sha,
+            "\n".join(self.message_lines),
+            files,
+            repo=self.repo_name,
+            date=self.date,
+            author=self.author,
+            parents=self.parents,
+        )
+
+
+def parse_log(lines, repo_name: str, patch_max_chars: int = DEFAULT_PATCH_MAX_CHARS) -> Iterator[CommitRecord]:
+    """Parse ``git log --numstat -p --format=LOG_FORMAT`` output line by line."""
+    current: Optional[_CommitBuilder] = None
+    file_diff: Optional[_FileDiff] = None
+
+    for raw in lines:
+        line = raw.rstrip("\n")
+        if line.startswith(_COMMIT_START) and (current is None or current.message_done):
+            if current is not None:
+                yield current.build()
+            current = _CommitBuilder(line[1:], repo_name)
+            file_diff = None
+            if current.message_lines[0].endswith(_MESSAGE_END):
+                current.message_lines[0] = current.message_lines[0][:-1].rstrip("\n")
+                current.message_done = True
+            continue
+        if current is None:
+            continue
+        if not current.message_done:
+            if line.endswith(_MESSAGE_END):
+                current.message_done = True
+                tail = line[:-1]
+                if tail:
+                    current.message_lines.append(tail)
+                while current.message_lines and not current.message_lines[-1]:
+                    current.message_lines.pop()
+            else:
+                current.message_lines.append(line)
+            continue
+
+        if line.startswith("diff --git "):
+            file_diff = _FileDiff(_diff_git_filename(line))
+            current.files.append(file_diff)
+            continue
+        if file_diff is None:
+            stat = _numstat(line) if line else None
+            if stat is not None:
+                current.numstats.append(stat)
+            continue
+        if file_diff.in_hunks:
+            if line.startswith(("@@", " ", "+", "-", "\\")):
+                file_diff.add_patch_line(line, patch_max_chars)
+            continue
+        if line.startswith("@@"):
+            file_diff.in_hunks = True
+            file_diff.add_patch_line(line, patch_max_chars)
+        elif line.startswith("new file mode"):
+            file_diff.status = "added"
+        elif line.startswith("deleted file mode"):
+            file_diff.status = "removed"
+        elif line.startswith("rename to "):
+            file_diff.status = "renamed"
+            file_diff.filename = _unquote(line[len("rename to "):])
+        elif line.startswith("+++ "):
+            file_diff.filename = _header_path(line[4:], "b/") or file_diff.filename
+        elif line.startswith("--- ") and file_diff.status == "removed":
+            file_diff.filename = _header_path(line[4:], "a/") or file_diff.filename
+
+    if current is not None:
+        yield current.build()
+
+
+def iter_log_commits(
+    repo,
+    revs: List[str],
+    repo_name: str,
+    patch_max_chars: int = DEFAULT_PATCH_MAX_CHARS,
+    **log_kwargs,
+) -> Iterator[CommitRecord]:
+    """Yield a :class:`CommitRecord` (with date, author and parents) for each commit in ``revs``.
+
+    ``log_kwargs`` are passed to ``git log`` (for example ``reverse``,
+    ``since`` and ``max_count``). Merge commits are diffed against their
+    first parent, as GitHub does.
+    """
+    proc = repo.git(c="core.quotepath=off").log(
+        *revs,
+        "--",
+        format=LOG_FORMAT,
+        numstat=True,
+        patch=True,
+        no_color=True,
+        no_ext_diff=True,
+        diff_merges="first-parent",
+        as_process=True,
+        **log_kwargs,
+    )
+    lines = (raw.decode("utf-8", errors="replace") for raw in proc.stdout)
+    finished = False
+    try:
+        yield from parse_log(lines, repo_name, patch_max_chars)
+        finished = True
+    finally:
+        proc.stdout.close()
+        try:
+            proc.wait()
+        except GitCommandError:
+            # A consumer that stops early makes git exit on SIGPIPE.
+            if finished:
+                raise
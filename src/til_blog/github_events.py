@@ -0,0 +1,103 @@
+"""Discover changed repositories from the GitHub events feed.
+
+The org (or user) events feed lists recent ``PushEvent``s, so instead of
+listing commits for every repository the poller can ask the feed which
+repositories were pushed since the last event it saw. The feed only keeps
+about 300 events; when the stored cursor has scrolled out of that window the
+caller must fall back to a full sweep.
+
+The public ``/orgs/{org}/events`` feed leaves out pushes to private repos, so
+the token owner's authenticated view of the org
+(``/users/{me}/events/orgs/{org}``) is read instead, or their own
+``/users/{me}/events`` when the owner is that user. If the token's login
+cannot be determined, the feed is treated as not reaching the cursor, which
+makes the caller sweep.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+GITHUB_API = "https://api.github.com"
+PER_PAGE = 100
+MAX_PAGES = 3  # GitHub serves at most 300 events
+
+
+def _login(session, headers) -> Optional[str]:
+    r = session.get(f"{GITHUB_API}/user", headers=headers)
+    if r.status_code != 200:
+        return None
+    return (r.json() or {}).get("login")
+
+
+def _feed_urls(session, headers, owner: str) -> List[str]:
+    """Feeds that include private pushes, or [] when the token's user is unknown."""
+    login = _login(session, headers)
+    if not login:
+        print("Events feed: could not identify the token's user; private pushes would be missed.")
+        return []
+    if login.lower() == owner.lower():
+        return [f"{GITHUB_API}/users/{login}/events"]
+    # The org feed 404s when the owner is a user; another user's feed only
+    # has public events, and only their public repos are listed anyway.
+    return [f"{GITHUB_API}/users/{login}/events/orgs/{owner}", f"{GITHUB_API}/users/{owner}/events"]
+
+
+def _read_feed(session, token: str, owner: str, cursor: Optional[int]):
+    """Yield events newest first until ``cursor`` or the end of the feed.
+
+    Returns via StopIteration value True when the cursor was reached.
+    """
+    headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
+    urls = _feed_urls(session, headers, owner)
+    if not urls:
+        return False
+    for url in urls:
+        r = session.get(url, headers=headers, params={"per_page": PER_PAGE, "page": 1})
+        if r.status_code == 404:
+            continue
+        r.raise_for_status()
+        for page in range(1, MAX_PAGES + 1):
+            if page > 1:
+                r = session.get(url, headers=headers, params={"per_page": PER_PAGE, "page": page})
+                if r.status_code == 422:  # past the pagination limit
+                    break
+                r.raise_for_status()
+            events = r.json() or []
+            if not events:
+                break
+            for event in events:
+                if cursor is not None and int(event["id"]) <= cursor:
+                    return True
+                yield event
+        return False
+    raise SystemExit(f"Unable to read the events feed for '{owner}'.")
+
+
+def changed_repos(session, token: str, owner: str, cursor: Optional[str]) -> Tuple[List[str], Optional[str], bool]:
+    """Return ``(repos pushed since cursor, newest event id, cursor reached)``.
+
+    Repos are ordered by their latest push, oldest first. When the third value
+    is False the feed did not reach back to ``cursor`` and the repo list may
+    be incomplete.
+    """
+    cursor_id = int(cursor) if cursor else None
+    feed = _read_feed(session, token, owner, cursor_id)
+    newest: Optional[str] = None
+    pushed: List[str] = []
+    reached = False
+    while True:
+        try:
+            event = next(feed)
+        except StopIteration as stop:
+            reached = bool(stop.value)
+            break
+        if newest is None:
+            newest = event["id"]
+        if event.get("type") != "PushEvent":
+            continue
+        name = (event.get("repo") or {}).get("name")
+        if name and name not in pushed:
+            pushed.append(name)
+    pushed.reverse()
+    return pushed, newest or cursor, reached
@@ -3,23 +3,85 @@
 Poll GitHub for recent commits and generate a daily TIL post.
 
 Usage: python -m til_blog.github_poller --config config.yml
+       [--resume] [--record CASSETTE | --replay CASSETTE [--replay-speed X]]
 Environment:
  - GH_PAT or GITHUB_TOKEN: GitHub PAT with necessary scopes
+ - GH_PAT_2, GH_PAT_3, ...: optional extra tokens to rotate through
  - OPENAI_API_KEY: OpenAI API key
 """
 
 import argparse
+import asyncio
+import itertools
 import os
 import yaml
-import json
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
+from urllib.parse import parse_qs, urlparse
 
-from til_blog.summarizer import Summarizer
-from til_blog.post_generator import PostGenerator
+from til_blog import cassette, commit_store, github_events, github_graphql, mirror, rate_limit, run_journal, state_store
+from til_blog.commit_record import CommitRecord, FileChange
+from til_blog.http_cache import DEFAULT_MAX_BYTES, CachedSession, ResponseCache
+from til_blog.metrics import get_metrics
+from til_blog.pipeline import Pipeline
 
 GITHUB_API = "https://api.github.com"
 
+# Upper bound on in-flight GitHub requests across all repos, and per repo.
+DEFAULT_CONCURRENCY = 8
+DEFAULT_REPO_CONCURRENCY = 4
+# State key holding the events feed cursor; repo keys always contain a "/".
+EVENTS_STATE_KEY = "_events"
+
+# Fields kept from the org/user repository listing.
+REPO_METADATA_FIELDS = ("full_name", "pushed_at", "archived", "fork")
+
+# Number of commit-list pages requested ahead while streaming a repo.
+DEFAULT_PAGE_PREFETCH = 2
+# Repos fetched ahead of the pipeline consuming their commits.
+DEFAULT_REPO_WINDOW = 16
+
+_session = None
+_commit_store = None
+
+
+def get_session():
+    """Return the shared HTTP session, creating an uncached one on first use."""
+    global _session
+    if _session is None:
+        _session = CachedSession()
+    return _session
+
+
+def configure_session(config, tokens=None):
+    """Build the shared session from config, enabling the on-disk cache if set.
+
+    When ``tokens`` is given, requests are paced and rotated across that pool.
+    """
+    global _session
+    if _session is not None and _session.cassette is not None:
+        _session.cassette.close()
+    cache = None
+    cache_dir = config.get("http_cache_dir")
+    if cache_dir:
+        max_mb = config.get("http_cache_max_mb")
+        max_bytes = int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES
+        cache = ResponseCache(cache_dir, max_bytes=max_bytes)
+    pool_size = max(int(config.get("github_concurrency", DEFAULT_CONCURRENCY)), 10)
+    limiter = rate_limit.from_config(config, tokens) if tokens else None
+    _session = CachedSession(cache=cache, pool_size=pool_size, limiter=limiter, cassette=cassette.from_config(config))
+    return _session
+
+
+def configure_commit_store(config):
+    """Enable the SHA-keyed commit store if ``commit_store_dir`` is configured."""
+    global _commit_store
+    _commit_store = commit_store.from_config(config)
+    return _commit_store
+
 
 def load_config(path):
     with open(path) as f:
@@ -27,15 +89,11 @@ def load_config(path):
 
 
 def load_state(path):
-    if os.path.exists(path):
-        with open(path) as f:
-            return json.load(f)
-    return {}
+    return state_store.load_json_state(path)
 
 
 def save_state(path, state):
-    with open(path, "w") as f:
-        json.dump(state, f, indent=2)
+    state_store.save_state(path, state)
 
 
 def _paginate_repos(url, headers, repo_type):
@@ -46,19 +104,24 @@ def _paginate_repos(url, headers, repo_type):
         params = {"per_page": 100, "page": page}
         if repo_type:
             params["type"] = repo_type
-        r = requests.get(url, headers=headers, params=params)
+        r = get_session().get(url, headers=headers, params=params)
         r.raise_for_status()
         data = r.json()
         if not data:
             break
         for repo in data:
-            repos.append(repo["full_name"])
+            repos.append({key: repo.get(key) for key in REPO_METADATA_FIELDS})
         page += 1
     return repos
 
 
 def get_repos_from_org(org, token):
-    """Return a list of repo full_names for an organization or user.
+    """Return a list of repo full_names for an organization or user."""
+    return [repo["full_name"] for repo in list_org_repos(org, token)]
+
+
+def list_org_repos(org, token):
+    """Return repo metadata dicts (see ``REPO_METADATA_FIELDS``) for an organization or user.
 
     Historically we only supported organisations. GitHub returns a 404 when the
     authenticated user cannot access the organisation (e.g. missing SSO) or when
@@ -130,99 +193,531 @@ def get_repos_from_org(org, token):
     raise SystemExit("Unable to list repositories from GitHub.")
 
 
-def list_commits(owner_repo, token, since=None):
+def _page_number(url):
+    if not url:
+        return None
+    values = parse_qs(urlparse(url).query).get("page")
+    return int(values[0]) if values else None
+
+
+def _fetch_page(url, headers, params):
+    r = get_session().get(url, headers=headers, params=params)
+    r.raise_for_status()
+    return r.json()
+
+
+def list_commits(owner_repo, token, since=None, max_commits=None, prefetch=DEFAULT_PAGE_PREFETCH):
+    """Yield every commit of ``owner_repo`` since ``since``, oldest first.
+
+    GitHub lists commits newest first, so after the first page the remaining
+    pages are read from the last one backwards, with up to ``prefetch`` pages
+    requested ahead. Those pages are pinned with ``sha`` to the newest commit
+    seen on page 1 so that a push during traversal cannot shift page
+    boundaries. (An ``until`` date pin would drop page-1 commits whose
+    committer date is later than the newest commit's, as after a rebase.) ``max_commits`` caps how many (oldest) commits are yielded;
+    the rest are picked up on the next run.
+    """
     owner, repo = owner_repo.split("/")
     headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
+    url = f"{GITHUB_API}/repos/{owner}/{repo}/commits"
     params = {"per_page": 100}
     if since:
         params["since"] = since
-    r = requests.get(f"{GITHUB_API}/repos/{owner}/{repo}/commits", headers=headers, params=params)
+    r = get_session().get(url, headers=headers, params=params)
     if r.status_code == 404:
         print(f"Repo not found or no access: {owner_repo}")
-        return []
+        return
     r.raise_for_status()
-    commits = r.json()
-    commits.reverse()  # chronological order
-    return commits
+    first_page = r.json()
+    links = getattr(r, "links", None) or {}
+
+    def older_pages():
+        last = _page_number(links.get("last", {}).get("url"))
+        if last and first_page:
+            pinned = dict(params, sha=first_page[0]["sha"])
+            with ThreadPoolExecutor(max_workers=max(1, prefetch)) as executor:
+                pending = deque()
+                for page in range(last, 1, -1):
+                    pending.append(executor.submit(_fetch_page, url, headers, dict(pinned, page=page)))
+                    if len(pending) >= prefetch:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+        elif links.get("next"):
+            # No page count advertised: walk rel=next and replay in reverse.
+            pages = []
+            next_url = links["next"]["url"]
+            while next_url:
+                nr = get_session().get(next_url, headers=headers)
+                nr.raise_for_status()
+                pages.append(nr.json())
+                next_url = (getattr(nr, "links", None) or {}).get("next", {}).get("url")
+            yield from reversed(pages)
+
+    seen = set()
+    count = 0
+    for page in itertools.chain(older_pages(), [first_page]):
+        for commit in reversed(page):
+            sha = commit.get("sha")
+            if sha in seen:
+                continue
+            seen.add(sha)
+            if max_commits is not None and count >= max_commits:
+                return
+            count += 1
+            yield commit
 
 
 def get_commit_detail(owner_repo, sha, token):
+    """Return a commit's detail, served from the commit store when possible."""
+    if _commit_store is not None:
+        stored = _commit_store.get(sha)
+        if stored is not None:
+            return stored
     owner, repo = owner_repo.split("/")
     headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
-    r = requests.get(f"{GITHUB_API}/repos/{owner}/{repo}/commits/{sha}", headers=headers)
+    r = get_session().get(f"{GITHUB_API}/repos/{owner}/{repo}/commits/{sha}", headers=headers)
     r.raise_for_status()
-    return r.json()
-
-
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--config", default="config.yml")
-    args = parser.parse_args()
-
-    config = load_config(args.config)
-    token = os.getenv("GH_PAT") or os.getenv("GITHUB_TOKEN")
-    if not token:
-        raise SystemExit("GH_PAT or GITHUB_TOKEN must be set as env var")
+    detail = r.json()
+    if _commit_store is not None:
+        _commit_store.put(
+            sha,
+            {
+                "sha": sha,
+                "message": detail.get("commit", {}).get("message", ""),
+                "files": commit_store.slim_files(detail.get("files", [])),
+            },
+        )
+    return detail
+
+
+def _slim_commit(owner_repo, commit, detail):
+    """Reduce a listed commit plus its detail payload to a :class:`CommitRecord`."""
+    # GitHub sends no patch for binary or very large files; status and line
+    # counts are all that describe them.
+    files = [
+        FileChange(f.get("filename"), f.get("status"), f.get("additions"), f.get("deletions"), f.get("patch"))
+        for f in detail.get("files", [])
+    ]
+    # Author and parent count feed the noise filter (bot and merge commits).
+    author = commit.get("commit", {}).get("author") or {}
+    return CommitRecord(
+        commit.get("sha"),
+        commit.get("commit", {}).get("message", ""),
+        files,
+        repo=owner_repo,
+        author=f"{author['name']} <{author.get('email') or ''}>" if author.get("name") else None,
+        parents=len(commit["parents"]) if "parents" in commit else None,
+    )
+
+
+def _since_for(repo, state, config):
+    last_date = state.get(repo, {}).get("last_date")
+    # If there's no saved last_date, use since_days if configured to avoid huge backfill
+    if not last_date and config.get("since_days"):
+        since_dt = datetime.utcnow() - timedelta(days=int(config.get("since_days")))
+        last_date = since_dt.isoformat() + "Z"
+    return last_date
+
+
+class _FetchEngine:
+    """Run blocking GitHub calls on a thread pool under global and per-repo limits.
+
+    Listing and detail fetches for different repos are interleaved freely; the
+    per-repo semaphore only keeps a single busy repo from hogging every slot.
+    """
 
-    # Determine repos to poll
-    repos = []
-    if config.get("github_repos"):
-        repos = config["github_repos"]
-    elif config.get("github_org"):
-        repos = get_repos_from_org(config["github_org"], token)
-    else:
-        raise SystemExit("Please set 'github_repos' or 'github_org' in config.yml")
-
-    state_file = config.get("state_file", "state.json")
-    state = load_state(state_file)
-
-    all_commits = []
-
-    for r in repos:
-        last_date = state.get(r, {}).get("last_date")
-        # If there's no saved last_date, use since_days if configured to avoid huge backfill
-        if not last_date and config.get("since_days"):
-            since_dt = datetime.utcnow() - timedelta(days=int(config.get("since_days")))
-            last_date = since_dt.isoformat() + "Z"
+    def __init__(
+        self,
+        token,
+        concurrency=DEFAULT_CONCURRENCY,
+        repo_concurrency=DEFAULT_REPO_CONCURRENCY,
+        max_commits=None,
+        mirror=None,
+        seen=None,
+    ):
+        self.token = token
+        self.max_commits = max_commits
+        self.mirror = mirror
+        # Optional ``seen(sha)`` check; commits already in a post are skipped
+        # before their details are fetched.
+        self.seen = seen
+        self.concurrency = max(1, int(concurrency))
+        self.repo_concurrency = max(1, int(repo_concurrency))
+        self._executor = None
+        self._global = None
+
+    async def _call(self, repo_limit, func, *args, **kwargs):
+        async with repo_limit:
+            async with self._global:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def _list(self, owner_repo, since):
+        kwargs = {"since": since}
+        if self.max_commits is not None:
+            kwargs["max_commits"] = self.max_commits
+        with get_metrics().timer("github.list"):
+            return list(list_commits(owner_repo, self.token, **kwargs))
+
+    def _detail(self, owner_repo, sha):
+        with get_metrics().timer("github.detail"):
+            return get_commit_detail(owner_repo, sha, self.token)
+
+    def _mirror(self, owner_repo, since):
+        with get_metrics().timer("github.mirror"):
+            return self.mirror.fetch_commits(owner_repo, since, self.max_commits)
+
+    async def fetch_repo(self, owner_repo, since, listed=None):
+        """Return (commit dicts in chronological order, latest committer date, complete).
+
+        ``complete`` is False when ``max_commits`` cut the listing short. None
+        is returned when the repo could not be listed at all.
+
+        ``listed`` holds commits (or the listing error) already obtained from
+        another backend; otherwise the REST listing is used.
+        """
+        repo_limit = asyncio.Semaphore(self.repo_concurrency)
+        if self.mirror is not None:
+            try:
+                commits, latest_date = await self._call(repo_limit, self._mirror, owner_repo, since)
+            except Exception as e:
+                print(f"Error fetching mirror for {owner_repo}: {e}")
+                return None
+            complete = self.max_commits is None or len(commits) < self.max_commits
+            if self.seen is not None:
+                commits = [c for c in commits if not self.seen(c["sha"])]
+            return commits, latest_date, complete
         try:
-            commits = list_commits(r, token, since=last_date)
+            if listed is None:
+                commits = await self._call(repo_limit, self._list, owner_repo, since)
+            elif isinstance(listed, Exception):
+                raise listed
+            else:
+                commits = listed
         except Exception as e:
-            print(f"Error listing commits for {r}: {e}")
-            continue
+            print(f"Error listing commits for {owner_repo}: {e}")
+            return None
         if not commits:
-            continue
+            return [], None, True
+        complete = self.max_commits is None or len(commits) < self.max_commits
+        if self.seen is not None:
+            # ``since`` is inclusive, so the last run's newest commit is
+            # usually listed again.
+            commits = [c for c in commits if not self.seen(c.get("sha"))]
+            if not commits:
+                return [], None, complete
+
+        details = await asyncio.gather(
+            *(self._call(repo_limit, self._detail, owner_repo, c.get("sha")) for c in commits),
+            return_exceptions=True,
+        )
+
+        results = []
         latest_date = None
-        for c in commits:
-            sha = c.get("sha")
-            try:
-                detail = get_commit_detail(r, sha, token)
-            except Exception as e:
-                print(f"Failed to get detail for {r}@{sha}: {e}")
+        for c, detail in zip(commits, details):
+            if isinstance(detail, Exception):
+                print(f"Failed to get detail for {owner_repo}@{c.get('sha')}: {detail}")
                 continue
-            files = detail.get("files", [])
-            files_slim = []
-            for f in files:
-                files_slim.append({"filename": f.get("filename"), "patch": f.get("patch")})
-            commit_dict = {"sha": sha, "message": c.get("commit", {}).get("message", ""), "files": files_slim, "repo": r}
-            all_commits.append(commit_dict)
+            results.append(_slim_commit(owner_repo, c, detail))
             latest_date = c.get("commit", {}).get("committer", {}).get("date") or latest_date
-        # update state for this repo to latest_date
-        if latest_date:
-            state.setdefault(r, {})["last_date"] = latest_date
+        return results, latest_date, complete
+
+    async def iter_all(self, repo_since, listings=None, window=None):
+        """Yield ``(repo, fetch_repo result)`` in input order.
+
+        At most ``window`` repos are in flight or finished-but-unconsumed at
+        once; the next repo starts only when the consumer takes a result, so a
+        slow consumer holds back fetching instead of buffering every repo.
+        """
+        listings = listings or {}
+        self._global = asyncio.Semaphore(self.concurrency)
+        todo = iter(repo_since)
+        pending = deque()
+
+        def start(item):
+            r, since = item
+            pending.append((r, asyncio.ensure_future(self.fetch_repo(r, since, listings.get(r)))))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            self._executor = executor
+            try:
+                for item in itertools.islice(todo, window or len(repo_since)):
+                    start(item)
+                while pending:
+                    r, task = pending.popleft()
+                    result = await task
+                    for item in itertools.islice(todo, 1):
+                        start(item)
+                    yield r, result
+            finally:
+                for _, task in pending:
+                    task.cancel()
+
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+def select_active_repos(repo_meta, state, config):
+    """Return names of repos from an org listing that may have new commits.
+
+    A repo is idle when its ``pushed_at`` is no newer than the ``pushed_at``
+    recorded after its last complete poll, its stored ``last_date``, or (for
+    repos without state) the ``since_days`` window.
+    """
+    active = []
+    for repo in repo_meta:
+        name = repo["full_name"]
+        if repo.get("fork") and config.get("skip_forks"):
+            continue
+        pushed_at = _parse_timestamp(repo.get("pushed_at"))
+        repo_state = state.get(name, {})
+        marks = [
+            _parse_timestamp(repo_state.get("pushed_at")),
+            _parse_timestamp(repo_state.get("last_date")),
+            _parse_timestamp(_since_for(name, state, config)),
+        ]
+        marks = [m for m in marks if m is not None]
+        if pushed_at is not None and marks and pushed_at <= max(marks):
+            continue
+        active.append(name)
+    return active
 
-    if not all_commits:
-        print("No new commits found.")
-        save_state(state_file, state)
-        return
 
-    summarizer = Summarizer(os.getenv("OPENAI_API_KEY"))
-    summary = summarizer.summarize(all_commits)
+def discover_from_events(owner, token, state):
+    """Return ``(repos pushed since the stored cursor, newest event id)``.
+
+    The repo list is None when the feed no longer reaches back to the cursor
+    (or there is no cursor yet), meaning a full sweep is required.
+    """
+    events_state = state.get(EVENTS_STATE_KEY, {})
+    cursor = events_state.get("last_event_id")
+    repos, newest, reached = github_events.changed_repos(get_session(), token, owner, cursor)
+    if not reached:
+        reason = "no event cursor yet" if not cursor else "event cursor fell out of the feed window"
+        print(f"Events feed: {reason}; running a full sweep.")
+        return None, newest
+    print(f"Events feed: {len(repos)} repositories pushed since event {cursor}.")
+    # Repos that failed last time are no longer in the feed window; retry them.
+    retry = [r for r in events_state.get("retry", []) if r not in repos]
+    return retry + repos, newest
+
+
+def fetch_new_commits(repos, token, state, config, pushed_at=None, failed=None):
+    """Fetch new commits for ``repos`` and advance ``state`` in place.
+
+    Returns commits grouped by repo in the order of ``repos`` and, within each
+    repo, in chronological order. ``pushed_at`` maps repos to their listing
+    timestamp, recorded once a repo has been polled completely. Repos that
+    could not be listed are appended to ``failed`` if given.
+    """
+    return list(iter_new_commits(repos, token, state, config, pushed_at=pushed_at, failed=failed))
+
+
+def iter_new_commits(repos, token, state, config, pushed_at=None, failed=None, checkpoint=None):
+    """Generator form of :func:`fetch_new_commits`.
+
+    Repos are fetched concurrently but at most ``github_repo_window`` ahead
+    of the consumer, and each repo's state is advanced as its commits are
+    yielded. ``checkpoint(repo, commits, state_entry)`` is called for every
+    repo that was fetched successfully, before its commits are yielded.
+    """
+    engine = _FetchEngine(
+        token,
+        concurrency=config.get("github_concurrency", DEFAULT_CONCURRENCY),
+        repo_concurrency=config.get("github_repo_concurrency", DEFAULT_REPO_CONCURRENCY),
+        max_commits=int(config["max_commits_per_repo"]) if config.get("max_commits_per_repo") else None,
+        mirror=mirror.from_config(config, token) if config.get("github_backend") == "mirror" else None,
+        seen=state.seen if isinstance(state, state_store.StateStore) else None,
+    )
+    repo_since = [(r, _since_for(r, state, config)) for r in repos]
+    listings = None
+    if config.get("github_backend") == "graphql":
+        listings = github_graphql.fetch_histories(
+            get_session(),
+            token,
+            repo_since,
+            batch_size=int(config.get("graphql_batch_size", github_graphql.DEFAULT_BATCH_SIZE)),
+            max_commits=engine.max_commits,
+        )
+    window = int(config.get("github_repo_window", DEFAULT_REPO_WINDOW))
+
+    # Drive the async generator one repo at a time so fetching pauses while
+    # the caller works through the previous repo's commits.
+    loop = asyncio.new_event_loop()
+    results = engine.iter_all(repo_since, listings, window)
+    try:
+        while True:
+            try:
+                r, result = loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                break
+            if result is None:
+                get_metrics().inc("repos_failed_total", source="github")
+                if failed is not None:
+                    failed.append(r)
+                continue
+            commits, latest_date, complete = result
+            get_metrics().inc("commits_fetched_total", len(commits), source="github")
+            # Reassign rather than mutate so a StateStore sees the update.
+            repo_state = dict(state.get(r) or {})
+            # update state for this repo to latest_date
+            if latest_date:
+                repo_state["last_date"] = latest_date
+            if complete and pushed_at and pushed_at.get(r):
+                repo_state["pushed_at"] = pushed_at[r]
+            if repo_state:
+                state[r] = repo_state
+            if checkpoint is not None:
+                checkpoint(r, commits, repo_state or None)
+            yield from commits
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
+
+
+class GitHubSource:
+    """New commits from ``github_repos`` or the repositories of ``github_org``.
+
+    Each repo is checkpointed to a run journal as soon as it is fetched. With
+    ``resume``, an unfinished run's journal is picked up: its repos are not
+    fetched again and their commits come from the journal.
+    """
+
+    def __init__(self, config, tokens, resume=False):
+        self.config = config
+        self.token = tokens[0]
+        self.session = configure_session(config, tokens)
+        self.store = configure_commit_store(config)
+        self.state_file = config.get("state_file", "state.json")
+        self.state = state_store.open_state(config)
+        self.journal = run_journal.RunJournal(
+            os.path.expanduser(str(config.get("run_journal", run_journal.DEFAULT_PATH)))
+        )
+        self.resume = resume
+        self.failed = []
+        self.cursor = None
+
+    def _select_repos(self):
+        """Return ``(repos, pushed_at)`` and remember the events cursor, if any."""
+        config = self.config
+        if config.get("github_repos"):
+            return config["github_repos"], None
+        if not config.get("github_org"):
+            raise SystemExit("Please set 'github_repos' or 'github_org' in config.yml")
+        org = config["github_org"]
+        if config.get("github_discovery") == "events":
+            repos, self.cursor = discover_from_events(org, self.token, self.state)
+            if repos is not None:
+                return repos, None
+        repo_meta = list_org_repos(org, self.token)
+        pushed_at = {m["full_name"]: m.get("pushed_at") for m in repo_meta}
+        repos = select_active_repos(repo_meta, self.state, config)
+        print(f"Polling {len(repos)} of {len(repo_meta)} repositories; the rest have no pushes since the last run.")
+        return repos, pushed_at
+
+    def __iter__(self):
+        header, done = self.journal.load() if self.resume else (None, {})
+        if header is None:
+            if self.resume:
+                print("No unfinished run to resume; starting a new one.")
+            repos, pushed_at = self._select_repos()
+            self.journal.start({"repos": repos, "pushed_at": pushed_at, "cursor": self.cursor})
+        else:
+            repos, pushed_at, self.cursor = header["repos"], header.get("pushed_at"), header.get("cursor")
+            self.journal.reopen()
+            print(f"Resuming run: {len(done)} of {len(repos)} repositories already fetched.")
+        return self._commits(repos, pushed_at, done)
+
+    def _commits(self, repos, pushed_at, done):
+        for repo in repos:
+            entry = done.get(repo)
+            if entry is None:
+                continue
+            if entry.get("state") is not None:
+                self.state[repo] = entry["state"]
+            for commit in entry["commits"]:
+                yield CommitRecord.from_mapping(commit)
+        remaining = [r for r in repos if r not in done]
+        yield from iter_new_commits(
+            remaining,
+            self.token,
+            self.state,
+            self.config,
+            pushed_at=pushed_at,
+            failed=self.failed,
+            checkpoint=self.journal.checkpoint,
+        )
 
-    generator = PostGenerator()
-    output_dir = config.get("output_dir", "site/content/posts")
-    generator.generate_post(summary, output_dir)
+    def finish(self):
+        if self.cursor:
+            self.state[EVENTS_STATE_KEY] = {"last_event_id": self.cursor, "retry": self.failed}
+
+        metrics = get_metrics()
+        session = self.session
+        if session.cache is not None:
+            stats = session.cache.stats()
+            print(f"HTTP cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
+            metrics.set("http_cache_hits", stats["hits"])
+            metrics.set("http_cache_misses", stats["misses"])
+        limits = session.limiter.stats()
+        print(f"Rate limit: {limits['retries']} retries, {limits['waited']}s waited, remaining {limits['remaining']}")
+        metrics.set("github_rate_limit_retries", limits["retries"])
+        metrics.set("github_rate_limit_waited_seconds", limits["waited"])
+        for token, remaining in limits["remaining"].items():
+            metrics.set("github_rate_limit_remaining", remaining, token=token)
+        if self.store is not None:
+            stats = self.store.stats()
+            print(f"Commit store: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+            metrics.set("commit_store_cache_hits", stats["hits"])
+            metrics.set("commit_store_cache_misses", stats["misses"])
+        if session.cassette is not None:
+            stats = session.cassette.stats()
+            print(
+                f"Cassette ({stats['mode']}): {stats['recorded']} recorded, {stats['replayed']} replayed, "
+                f"{stats['misses']} missing"
+            )
+            metrics.set("cassette_responses", stats["recorded"] + stats["replayed"], mode=stats["mode"])
+            metrics.set("cassette_misses", stats["misses"])
+
+    def save(self):
+        save_state(self.state_file, self.state)
+        self.journal.discard()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config.yml")
+    parser.add_argument(
+        "--resume", action="store_true", help="Finish an interrupted run without refetching its completed repos."
+    )
+    cassette_args = parser.add_mutually_exclusive_group()
+    cassette_args.add_argument("--record", metavar="CASSETTE", help="Record every GitHub response to CASSETTE.")
+    cassette_args.add_argument(
+        "--replay", metavar="CASSETTE", help="Answer GitHub requests from CASSETTE instead of the network."
+    )
+    parser.add_argument(
+        "--replay-speed", type=float, help="Scale recorded response times (1 = original, 0 = no delay)."
+    )
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.record or args.replay:
+        config["github_cassette"] = args.record or args.replay
+        config["github_cassette_mode"] = "record" if args.record else "replay"
+    if args.replay_speed is not None:
+        config["github_cassette_speed"] = args.replay_speed
+    tokens = rate_limit.tokens_from_env()
+    if not tokens and config.get("github_cassette") and config.get("github_cassette_mode", "replay") == "replay":
+        tokens = ["replay"]  # recorded responses do not depend on the token
+    if not tokens:
+        raise SystemExit("GH_PAT or GITHUB_TOKEN must be set as env var")
 
-    save_state(state_file, state)
+    source = GitHubSource(config, tokens, resume=args.resume)
+    Pipeline(config, output_dir="site/content/posts").run(source)
     print("Done.")
 
 
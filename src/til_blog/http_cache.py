@@ -0,0 +1,257 @@
+"""Pooled HTTP session with an on-disk conditional-request cache.
+
+GitHub answers a request carrying ``If-None-Match``/``If-Modified-Since`` with
+``304 Not Modified`` when nothing changed, and those responses do not count
+against the primary rate limit. :class:`CachedSession` remembers the validators
+and body of every cacheable ``GET`` and replays the stored body on a 304.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from til_blog.metrics import get_metrics
+from til_blog.rate_limit import RateLimiter, token_from_headers
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_POOL_SIZE = 10
+
+# The stored body is already decoded, so transport headers no longer apply.
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class ResponseCache:
+    """Size-bounded LRU store of response bodies and validators.
+
+    Each entry is a small JSON file named after the request key. Recency is
+    tracked with the file mtime, so the index can always be rebuilt from the
+    directory even if a previous run was killed part-way through. With
+    ``ttl`` (seconds) set, entries older than that are treated as missing.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES, ttl: Optional[float] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            st = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((st.st_mtime, name[:-5], st.st_size))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._total += size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key not in self._sizes:
+                return None
+            try:
+                with open(self._path(key)) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self._discard(key)
+                return None
+            if self.ttl is not None and time.time() - entry.get("stored_at", 0) > self.ttl:
+                self._discard(key)
+                return None
+            self._sizes.move_to_end(key)
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+            return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        if self.ttl is not None:
+            entry = {**entry, "stored_at": time.time()}
+        data = json.dumps(entry)
+        with self._lock:
+            tmp = self._path(key) + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+            self._total -= self._sizes.pop(key, 0)
+            self._sizes[key] = len(data)
+            self._total += len(data)
+            self._evict()
+
+    def _discard(self, key: str):
+        self._total -= self._sizes.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._sizes) > 1:
+            oldest = next(iter(self._sizes))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._sizes),
+            "bytes": self._total,
+        }
+
+
+def _request_key(url: str, params: Optional[dict], headers: Optional[dict]) -> str:
+    # Responses differ per credential (private repos), so the token is part of
+    # the key; hashing keeps it out of the cache directory.
+    headers = headers or {}
+    material = json.dumps(
+        [url, sorted((params or {}).items()), headers.get("Authorization"), headers.get("Accept")],
+        default=str,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _response_from_entry(entry: Dict[str, Any], url: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = entry.get("status", 200)
+    response._content = entry["body"].encode("utf-8")
+    response.encoding = "utf-8"
+    response.headers = CaseInsensitiveDict(entry.get("headers") or {})
+    response.url = entry.get("url") or url
+    response.reason = "OK"
+    response.from_cache = True
+    return response
+
+
+class CachedSession:
+    """``requests.Session`` wrapper that revalidates cached GETs.
+
+    With a :class:`~til_blog.rate_limit.RateLimiter` attached, every request is
+    paced, may be sent with a different token from the pool, and is retried
+    when GitHub reports it was throttled.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        limiter: Optional[RateLimiter] = None,
+        cassette=None,
+    ):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.cache = cache
+        self.limiter = limiter
+        # A til_blog.cassette.Cassette that records every response, or
+        # answers every request, in place of the network.
+        self.cassette = cassette
+
+    def _request(self, method: str, url: str, headers: Optional[dict], **kwargs):
+        """Send one request, counting it by method and status in the run metrics."""
+        metrics = get_metrics()
+        cassette = self.cassette
+        with metrics.timer("http"):
+            if cassette is not None and cassette.replaying:
+                r = cassette.replay(method, url, kwargs.get("params"), kwargs.get("json"))
+            else:
+                started = cassette.start() if cassette is not None else None
+                r = getattr(self.session, method)(url, headers=headers, **kwargs)
+                if cassette is not None:
+                    cassette.record(method, url, kwargs.get("params"), kwargs.get("json"), r, started)
+        metrics.inc("http_requests_total", method=method.upper(), status=getattr(r, "status_code", 0))
+        metrics.inc("http_response_bytes_total", len(getattr(r, "content", None) or b""))
+        return r
+
+    def _send(self, method: str, url: str, headers: Optional[dict], **kwargs):
+        if self.limiter is None:
+            return self._request(method, url, headers, **kwargs)
+        preferred = token_from_headers(headers)
+        attempt = 0
+        while True:
+            token = self.limiter.acquire(preferred)
+            send_headers = dict(headers or {})
+            if token and token != preferred:
+                send_headers["Authorization"] = f"token {token}"
+            r = self._request(method, url, send_headers, **kwargs)
+            delay = self.limiter.observe(token, r, attempt)
+            if delay is None:
+                return r
+            attempt += 1
+            if delay > 0:
+                self.limiter.waited += delay
+                self.limiter.sleep(delay)
+
+    def get(self, url: str, headers: Optional[dict] = None, params: Optional[dict] = None) -> requests.Response:
+        if self.cache is None:
+            return self._send("get", url, headers, params=params)
+
+        key = _request_key(url, params, headers)
+        entry = self.cache.get(key)
+        send_headers = dict(headers or {})
+        if entry:
+            if entry.get("etag"):
+                send_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                send_headers["If-Modified-Since"] = entry["last_modified"]
+
+        r = self._send("get", url, send_headers, params=params)
+
+        if r.status_code == 304 and entry:
+            self.cache.hits += 1
+            return _response_from_entry(entry, url)
+
+        self.cache.misses += 1
+        resp_headers = getattr(r, "headers", None) or {}
+        etag = resp_headers.get("ETag")
+        last_modified = resp_headers.get("Last-Modified")
+        if r.status_code == 200 and (etag or last_modified):
+            self.cache.put(
+                key,
+                {
+                    "url": getattr(r, "url", url),
+                    "status": 200,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "headers": {k: v for k, v in resp_headers.items() if k.lower() not in _DROP_HEADERS},
+                    "body": r.text,
+                },
+            )
+        return r
+
+    def post(self, url: str, headers: Optional[dict] = None, json: Any = None) -> requests.Response:
+        """Send an uncached POST (used for GraphQL) through the rate limiter."""
+        return self._send("post", url, headers, json=json)
+
+    def close(self):
+        self.session.close()
+        if self.cassette is not None:
+            self.cassette.close()
@@ -1,11 +1,8 @@
 #!/usr/bin/env python3
 import argparse
 import yaml
-import os
 
-from til_blog.repo_tracker import RepoTracker
-from til_blog.summarizer import Summarizer
-from til_blog.post_generator import PostGenerator
+from til_blog.pipeline import LocalSource, Pipeline
 
 
 def main():
@@ -17,20 +14,9 @@ def main():
     with open(args.config, 'r') as f:
         config = yaml.safe_load(f)
 
-    # Initialize components
-    tracker = RepoTracker(config)
-    commits = tracker.get_new_commits()
-
-    summarizer = Summarizer(os.getenv('OPENAI_API_KEY'))
-    summary = summarizer.summarize(commits)
-
-    generator = PostGenerator()
-    generator.generate_post(summary, config.get('output_dir', 'til_posts'))
-
-    # Save state
-    tracker.save_state(config.get('state_file', 'state.json'))
-
-    print("TIL posts generated.")
+    # Run local repos through the shared pipeline
+    if Pipeline(config, output_dir='til_posts').run(LocalSource(config)):
+        print("TIL posts generated.")
 
 if __name__ == "__main__":
     main()
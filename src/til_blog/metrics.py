@@ -0,0 +1,188 @@
+"""Run metrics: stage timers, counters and gauges.
+
+Every part of a run records into one process-wide :class:`Metrics` registry
+(:func:`get_metrics`). Stages add wall time with ``with metrics.timer(name)``.
+HTTP and OpenAI calls increment labelled counters. Finishing sources copy
+their cache and rate-limit stats into gauges. At the end of a run,
+:func:`export` writes the registry:
+
+* as a JSON run report (``metrics_report``);
+* optionally as a Prometheus textfile (``metrics_textfile``), for the node
+  exporter's textfile collector.
+
+Stage timers from concurrent work add up, so a stage can report more seconds
+than the run's wall time. ``duration_seconds`` in the report is wall time.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+PROMETHEUS_PREFIX = "til_blog_"
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, _Labels]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format(name: str, labels: _Labels, prefix: str = "") -> str:
+    if not labels:
+        return prefix + name
+    inner = ",".join(f'{k}="{v}"' for k, v in labels)
+    return f"{prefix}{name}{{{inner}}}"
+
+
+class Metrics:
+    """Thread-safe registry of stage timers, counters and gauges for one run."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = time.time()
+        self._start = clock()
+        self._lock = threading.Lock()
+        self.stages: Dict[str, list] = {}
+        self.counters: Dict[Tuple[str, _Labels], float] = {}
+        self.gauges: Dict[Tuple[str, _Labels], float] = {}
+
+    def add_time(self, stage: str, seconds: float, calls: int = 1):
+        with self._lock:
+            entry = self.stages.setdefault(stage, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Add the wall time of the ``with`` block to ``stage``."""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.add_time(stage, self.clock() - start)
+
+    def timed_iter(self, stage: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Yield from ``iterable``, timing only the time spent producing items."""
+        start = self.clock()
+        iterator = iter(iterable)
+        self.add_time(stage, self.clock() - start, calls=0)
+        while True:
+            start = self.clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(stage, self.clock() - start)
+                return
+            self.add_time(stage, self.clock() - start, calls=0)
+            yield item
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: Optional[float], **labels):
+        if value is None:
+            return
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def cache_hit_rates(self) -> Dict[str, float]:
+        """Hit ratio of every ``<name>_cache_hits`` / ``<name>_cache_misses`` gauge pair."""
+        rates = {}
+        for (name, labels), hits in self.gauges.items():
+            if not name.endswith("_cache_hits") or labels:
+                continue
+            cache = name[: -len("_cache_hits")]
+            misses = self.gauges.get((f"{cache}_cache_misses", ()), 0)
+            if hits + misses:
+                rates[cache] = round(hits / (hits + misses), 4)
+        return rates
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started)),
+                "duration_seconds": round(self.clock() - self._start, 3),
+                "stages": {
+                    stage: {"calls": calls, "seconds": round(seconds, 3)}
+                    for stage, (calls, seconds) in sorted(self.stages.items())
+                },
+                "counters": {_format(n, labels): v for (n, labels), v in sorted(self.counters.items())},
+                "gauges": {_format(n, labels): v for (n, labels), v in sorted(self.gauges.items())},
+                "cache_hit_rates": self.cache_hit_rates(),
+            }
+
+    def prometheus(self) -> str:
+        """Render the registry in the Prometheus text exposition format."""
+        lines = []
+
+        def family(name, kind, samples):
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{_format(name, labels, PROMETHEUS_PREFIX)} {value}")
+
+        with self._lock:
+            family("run_timestamp_seconds", "gauge", [((), int(self.started))])
+            family("run_duration_seconds", "gauge", [((), round(self.clock() - self._start, 3))])
+            stages = sorted(self.stages.items())
+            family("stage_seconds_total", "counter", [((("stage", s),), round(sec, 6)) for s, (_, sec) in stages])
+            family("stage_calls_total", "counter", [((("stage", s),), calls) for s, (calls, _) in stages])
+            for kind, values in (("counter", self.counters), ("gauge", self.gauges)):
+                names: Dict[str, list] = {}
+                for (name, labels), value in sorted(values.items()):
+                    names.setdefault(_metric_name(name), []).append((labels, value))
+                for name, samples in names.items():
+                    family(name, kind, samples)
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _write_atomic(path: str, text: str):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Return the shared registry, creating it on first use."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
+
+
+def reset_metrics() -> Metrics:
+    """Start a fresh registry (one per run)."""
+    global _metrics
+    with _metrics_lock:
+        _metrics = Metrics()
+        return _metrics
+
+
+def export(config, metrics: Optional[Metrics] = None):
+    """Write the run report and Prometheus textfile named in config, if any."""
+    metrics = metrics or get_metrics()
+    if config.get("metrics_report"):
+        path = os.path.expanduser(str(config["metrics_report"]))
+        _write_atomic(path, json.dumps(metrics.report(), indent=2) + "\n")
+        print(f"Run report: {path}")
+    if config.get("metrics_textfile"):
+        _write_atomic(os.path.expanduser(str(config["metrics_textfile"])), metrics.prometheus())
@@ -0,0 +1,133 @@
+"""Bare-mirror backend for the GitHub poller.
+
+Instead of one REST call per commit, each polled repository is kept as a
+bare clone under ``mirror_dir`` and brought up to date with a single
+``git fetch``. New commits and their full (untruncated) patches are then read
+locally with the same GitPython helpers ``RepoTracker`` uses.
+"""
+
+from __future__ import annotations
+
+import base64
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from git import Repo
+
+from til_blog.git_log import DEFAULT_PATCH_MAX_CHARS, iter_log_commits
+
+GITHUB_URL = "https://github.com"
+
+
+def _iso_utc(value: str) -> str:
+    return datetime.fromisoformat(value).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class MirrorBackend:
+    """Maintain bare mirrors and read new commits from them."""
+
+    def __init__(
+        self,
+        root: str,
+        token: Optional[str] = None,
+        base_url: str = GITHUB_URL,
+        shallow: bool = True,
+        clone_filter: Optional[str] = None,
+        patch_max_chars: int = DEFAULT_PATCH_MAX_CHARS,
+    ):
+        self.root = root
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.shallow = shallow
+        self.clone_filter = clone_filter
+        self.patch_max_chars = patch_max_chars
+        os.makedirs(root, exist_ok=True)
+
+    def _env(self) -> Dict[str, str]:
+        # Pass the token as an HTTP header for this process only (as
+        # actions/checkout does) so it is never written into the mirror config.
+        if not self.token:
+            return {}
+        basic = base64.b64encode(f"x-access-token:{self.token}".encode()).decode()
+        return {
+            "GIT_CONFIG_COUNT": "1",
+            "GIT_CONFIG_KEY_0": f"http.{self.base_url}/.extraheader",
+            "GIT_CONFIG_VALUE_0": f"AUTHORIZATION: basic {basic}",
+            "GIT_TERMINAL_PROMPT": "0",
+        }
+
+    def path_for(self, owner_repo: str) -> str:
+        return os.path.join(self.root, f"{owner_repo}.git")
+
+    def sync(self, owner_repo: str, since: Optional[str] = None) -> Repo:
+        """Clone ``owner_repo`` on first use, otherwise fetch new objects."""
+        path = self.path_for(owner_repo)
+        options = {}
+        if self.shallow and since:
+            options["shallow_since"] = since
+        if self.clone_filter:
+            options["filter"] = self.clone_filter
+        if not os.path.isdir(path):
+            url = f"{self.base_url}/{owner_repo}.git"
+            return Repo.clone_from(url, path, bare=True, env=self._env(), **options)
+        repo = Repo(path)
+        options.pop("filter", None)  # recorded in the mirror config at clone time
+        if not self._is_shallow(repo):
+            options.pop("shallow_since", None)
+        with repo.git.custom_environment(**self._env()):
+            repo.git.fetch("origin", "+refs/heads/*:refs/heads/*", prune=True, **options)
+        return repo
+
+    @staticmethod
+    def _shallow_roots(repo: Repo) -> set:
+        path = os.path.join(repo.git_dir, "shallow")
+        if not os.path.exists(path):
+            return set()
+        with open(path) as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def _is_shallow(self, repo: Repo) -> bool:
+        return bool(self._shallow_roots(repo))
+
+    def _deepen_window(self, repo: Repo, shas: List[str]):
+        """Fetch one more generation if a commit in the window lost its parent to the shallow cut."""
+        if self._shallow_roots(repo).intersection(shas):
+            with repo.git.custom_environment(**self._env()):
+                repo.git.fetch("origin", "+refs/heads/*:refs/heads/*", deepen=1)
+
+    def fetch_commits(
+        self, owner_repo: str, since: Optional[str] = None, max_commits: Optional[int] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Return (commit records in chronological order, latest committer date)."""
+        repo = self.sync(owner_repo, since)
+        kwargs = {"reverse": True}
+        if since:
+            kwargs["since"] = since
+        commits = []
+        latest_date = None
+        # With mirror_filter, local reads fetch missing blobs from the remote
+        # and need the token as much as the fetch does.
+        with repo.git.custom_environment(**self._env()):
+            # Like the REST listing, a cap keeps the oldest commits so the rest
+            # are picked up next run.
+            window = repo.git.rev_list("HEAD", **kwargs).split()[:max_commits]
+            if not window:
+                return [], None
+            self._deepen_window(repo, window)
+            for commit in iter_log_commits(repo, ["HEAD"], owner_repo, self.patch_max_chars, **kwargs):
+                commits.append(commit.replace(date=None))
+                latest_date = _iso_utc(commit["date"])
+                if len(commits) == len(window):
+                    break
+        return commits, latest_date
+
+
+def from_config(config, token: Optional[str]) -> MirrorBackend:
+    return MirrorBackend(
+        os.path.expanduser(str(config.get("mirror_dir", ".cache/mirrors"))),
+        token=token,
+        shallow=bool(config.get("mirror_shallow", True)),
+        clone_filter=config.get("mirror_filter"),
+        patch_max_chars=int(config.get("patch_max_chars") or DEFAULT_PATCH_MAX_CHARS),
+    )
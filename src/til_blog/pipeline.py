@@ -0,0 +1,129 @@
+"""The source → filter → compact → summarise → render pipeline.
+
+Both entry points (``til_blog.main`` for local repositories and
+``til_blog.github_poller`` for GitHub) build a source and hand it to
+:class:`Pipeline`. Sources are iterables of commit dicts that also provide
+``finish()`` (called once iteration is done, e.g. to print stats),
+``save()`` (persist their cursors once the post is written) and optionally
+a ``state`` attribute.
+
+Stages are chained generators, so a source only produces the next repo's
+commits when the previous ones have been filtered and compacted. Patches are
+compacted and trimmed to what a prompt can use as they arrive, so the commits
+held for summarising stay small however large the day's diffs are.
+
+Each run starts a fresh metrics registry. The run report is written at the
+end, also when the run fails (see :mod:`til_blog.metrics`).
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Iterable, Iterator, List
+
+from til_blog import commit_filter, metrics
+from til_blog.diff_compact import compact_commit
+from til_blog.post_generator import PostGenerator
+from til_blog.repo_tracker import RepoTracker
+from til_blog.state_store import StateStore
+from til_blog.summarizer import PATCH_CHAR_LIMIT, Summarizer
+
+
+class LocalSource:
+    """New commits from the local repositories in ``config["repos"]``."""
+
+    def __init__(self, config):
+        self.tracker = RepoTracker(config)
+        self.state_file = config.get("state_file", "state.json")
+
+    @property
+    def state(self):
+        return self.tracker.state
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.tracker.iter_new_commits()
+
+    def finish(self):
+        pass
+
+    def save(self):
+        self.tracker.save_state(self.state_file)
+
+
+class Pipeline:
+    """Filter, compact, summarise and render the commits of one source."""
+
+    def __init__(self, config, output_dir=None, summarizer=None, generator=None):
+        self.config = config
+        self.output_dir = config.get("output_dir", output_dir)
+        self.noise = commit_filter.from_config(config)
+        self.summarizer = summarizer or Summarizer(os.getenv("OPENAI_API_KEY"), config)
+        self.generator = generator or PostGenerator()
+        self.already_seen = 0
+
+    def stages(self, commits: Iterable[Dict[str, Any]], state=None) -> Iterator[Dict[str, Any]]:
+        """Filter and compact ``commits`` lazily, trimming patches at ingest.
+
+        With a :class:`StateStore` as ``state``, commits already in an earlier
+        post are dropped and the rest are recorded in its seen index (saved
+        together with the cursors).
+        """
+        if isinstance(state, StateStore):
+            commits = self._unseen(commits, state)
+        for commit in self.noise.filter(commits):
+            yield compact_commit(commit, max_chars=PATCH_CHAR_LIMIT)
+
+    def _unseen(self, commits, store: StateStore):
+        for commit in commits:
+            if store.seen(commit["sha"]):
+                self.already_seen += 1
+                continue
+            store.record([commit])
+            yield commit
+
+    def collect(self, source) -> List[Dict[str, Any]]:
+        run = metrics.get_metrics()
+        with run.timer("collect"):
+            commits = list(self.stages(run.timed_iter("source", source), getattr(source, "state", None)))
+        source.finish()
+        if self.already_seen:
+            print(f"Skipped {self.already_seen} commits already in earlier posts.")
+        print(self.noise.report())
+        stats = self.noise.stats()
+        run.set("commits_already_seen", self.already_seen)
+        run.set("commits_kept", stats["kept"])
+        for reason, count in stats["reasons"].items():
+            run.set("commits_dropped", count, reason=reason)
+        return commits
+
+    def render(self, commits: List[Dict[str, Any]]):
+        run = metrics.get_metrics()
+        if self.config.get("summary_stream"):
+            self.generator.generate_post_stream(self.summarizer.stream(commits), self.output_dir)
+        else:
+            with run.timer("summarize"):
+                summary = self.summarizer.summarize(commits)
+            self.generator.generate_post(summary, self.output_dir)
+        cache = getattr(self.summarizer, "cache", None)
+        if cache is not None:
+            run.set("summary_cache_hits", cache.hits)
+            run.set("summary_cache_misses", cache.misses)
+
+    def run(self, source) -> bool:
+        """Write a post for ``source``'s new commits and save its state.
+
+        Returns False, without writing a post, when no commit survives the
+        filter.
+        """
+        metrics.reset_metrics()
+        try:
+            commits = self.collect(source)
+            if not commits:
+                print("No new commits found.")
+                source.save()
+                return False
+            self.render(commits)
+            source.save()
+            return True
+        finally:
+            metrics.export(self.config)
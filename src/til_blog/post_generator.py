@@ -2,6 +2,8 @@ import os
 import datetime
 from jinja2 import Template
 
+from til_blog.metrics import get_metrics
+
 DEFAULT_TEMPLATE = '''---
 title: "{{ date }} - Today I Learned"
 date: {{ date }}
@@ -10,6 +12,9 @@ date: {{ date }}
 {{ summary }}
 '''
 
+# Stands in for the summary so the template can be split around it.
+_SUMMARY_MARK = "\x00summary\x00"
+
 class PostGenerator:
     def __init__(self, template_str=None):
         self.template_str = template_str or DEFAULT_TEMPLATE
@@ -21,6 +26,40 @@ class PostGenerator:
         content = tmpl.render(date=date, summary=summary)
         filename = f"{date}.md"
         path = os.path.join(output_dir, filename)
-        with open(path, 'w') as f:
-            f.write(content)
+        with get_metrics().timer("post.write"):
+            with open(path, 'w') as f:
+                f.write(content)
+        get_metrics().set("post_bytes", len(content.encode("utf-8")))
+        print(f"Generated post: {path}")
+
+    def generate_post_stream(self, chunks, output_dir):
+        """Write a post whose summary arrives in pieces.
+
+        The front matter and each piece are flushed to a hidden
+        ``.<date>.md.partial`` file as they arrive, so a preview can follow
+        it; the post only replaces ``<date>.md`` once complete. If ``chunks``
+        raises, the partial file is removed and the error propagates.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        date = datetime.date.today().isoformat()
+        head, tail = Template(self.template_str).render(date=date, summary=_SUMMARY_MARK).split(_SUMMARY_MARK, 1)
+        path = os.path.join(output_dir, f"{date}.md")
+        partial = os.path.join(output_dir, f".{date}.md.partial")
+        metrics = get_metrics()
+        try:
+            with metrics.timer("post.stream"), open(partial, 'w') as f:
+                f.write(head)
+                f.flush()
+                for chunk in chunks:
+                    f.write(chunk)
+                    f.flush()
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(partial, path)
+            metrics.set("post_bytes", os.path.getsize(path))
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
         print(f"Generated post: {path}")
@@ -0,0 +1,222 @@
+"""Rate-limit aware scheduling of GitHub API requests.
+
+GitHub enforces a primary hourly quota per token (reported through
+``X-RateLimit-Remaining``/``X-RateLimit-Reset``) and undocumented secondary
+limits that answer with 403/429 and usually a ``Retry-After`` header.
+:class:`RateLimiter` paces requests with a per-token token bucket, rotates
+across a pool of tokens, and tells the caller how long to back off when a
+response says it has been throttled.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_RATE = 10.0  # requests per second per token
+DEFAULT_BURST = 20
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF = 60.0  # GitHub asks for at least a minute on secondary limits
+DEFAULT_MAX_WAIT = 900.0
+DEFAULT_LIMIT = 5000
+# Requests stay on their own token until its quota drops below this.
+DEFAULT_LOW_WATER = 100
+
+
+def tokens_from_env(environ=None) -> List[str]:
+    """Return the token pool: GH_PAT, GH_PAT_2, GH_PAT_3, ...
+
+    ``GITHUB_TOKEN`` is used only when no ``GH_PAT*`` is set: an Actions token
+    can read just the workflow's own repository, so rotating onto it would
+    turn private org repos into 404s.
+    """
+    environ = os.environ if environ is None else environ
+    tokens = []
+    if environ.get("GH_PAT"):
+        tokens.append(environ["GH_PAT"])
+    n = 2
+    while environ.get(f"GH_PAT_{n}"):
+        tokens.append(environ[f"GH_PAT_{n}"])
+        n += 1
+    if not tokens and environ.get("GITHUB_TOKEN"):
+        tokens.append(environ["GITHUB_TOKEN"])
+    # Keep first occurrence order while dropping duplicates.
+    return list(dict.fromkeys(tokens))
+
+
+def token_from_headers(headers: Optional[dict]) -> Optional[str]:
+    value = (headers or {}).get("Authorization") or ""
+    parts = value.split(None, 1)
+    if len(parts) == 2 and parts[0].lower() in ("token", "bearer"):
+        return parts[1]
+    return None
+
+
+class _TokenState:
+    def __init__(self, rate: float, burst: int, now: float):
+        self.remaining: Optional[int] = None
+        self.limit: Optional[int] = None
+        self.reset: Optional[float] = None
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def available(self, now: float) -> bool:
+        if self.remaining is None or self.remaining > 0:
+            return True
+        return self.reset is not None and now >= self.reset
+
+    def headroom(self) -> int:
+        return DEFAULT_LIMIT if self.remaining is None else self.remaining
+
+
+class RateLimiter:
+    """Token bucket and quota tracker shared by all worker threads.
+
+    Every pooled token must be able to read the same repositories: once a
+    token runs low, its requests move to whichever token has most headroom.
+    """
+
+    def __init__(
+        self,
+        tokens: List[str],
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        low_water: int = DEFAULT_LOW_WATER,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        self.rate = float(rate)
+        self.burst = int(burst)
+        self.max_retries = int(max_retries)
+        self.backoff = float(backoff)
+        self.max_wait = float(max_wait)
+        self.low_water = int(low_water)
+        self.clock = clock
+        self.sleep = sleep
+        self.retries = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+        now = clock()
+        self._pool = list(tokens)
+        self._states: Dict[Optional[str], _TokenState] = {t: _TokenState(self.rate, self.burst, now) for t in self._pool}
+
+    def _state(self, token: Optional[str]) -> _TokenState:
+        if token not in self._states:
+            self._states[token] = _TokenState(self.rate, self.burst, self.clock())
+        return self._states[token]
+
+    def _pick(self, preferred: Optional[str], now: float) -> Optional[str]:
+        if preferred is None or preferred not in self._pool:
+            return preferred
+        # Stay on the caller's token while it has quota to spare; tokens that
+        # have not answered yet only look fresh, so they are not preferred.
+        state = self._states[preferred]
+        if state.available(now) and state.headroom() >= self.low_water:
+            return preferred
+        usable = [t for t in self._pool if self._states[t].available(now)]
+        if not usable:
+            return None
+        return max(usable, key=lambda t: self._states[t].headroom())
+
+    def _take(self, state: _TokenState, now: float) -> float:
+        """Take one bucket token, returning 0 or the seconds until one is free."""
+        state.tokens = min(state.burst, state.tokens + (now - state.updated) * state.rate)
+        state.updated = now
+        if state.tokens >= 1:
+            state.tokens -= 1
+            return 0.0
+        return (1 - state.tokens) / state.rate
+
+    def _until_reset(self, now: float) -> float:
+        resets = [self._states[t].reset for t in self._pool if self._states[t].reset]
+        return (min(resets) - now) if resets else 0.0
+
+    def acquire(self, preferred: Optional[str]) -> Optional[str]:
+        """Block until a request may be sent and return the token to send it with.
+
+        Unauthenticated requests (``preferred`` is None) and tokens outside the
+        pool are paced but never rotated.
+        """
+        while True:
+            with self._lock:
+                now = self.clock()
+                token = self._pick(preferred, now)
+                delay = 0.0
+                if token is None and preferred is not None:
+                    # Every pooled token is exhausted; wait for the first reset
+                    # unless it is too far away, in which case let the request
+                    # fail through the normal error path.
+                    delay = self._until_reset(now)
+                    if delay <= 0 or delay > self.max_wait:
+                        token, delay = preferred, 0.0
+                if delay == 0.0:
+                    delay = self._take(self._state(token), now)
+                    if delay == 0.0:
+                        return token
+            self.waited += delay
+            self.sleep(delay)
+
+    def observe(self, token: Optional[str], response, attempt: int) -> Optional[float]:
+        """Record quota headers and return a retry delay, or None to accept ``response``."""
+        headers = getattr(response, "headers", None) or {}
+        status = getattr(response, "status_code", 200)
+        now = self.clock()
+        with self._lock:
+            state = self._state(token)
+            # GraphQL has its own point budget; only the REST ("core") quota
+            # drives token selection.
+            if headers.get("X-RateLimit-Resource", "core") == "core":
+                if headers.get("X-RateLimit-Remaining") is not None:
+                    state.remaining = int(headers["X-RateLimit-Remaining"])
+                if headers.get("X-RateLimit-Limit") is not None:
+                    state.limit = int(headers["X-RateLimit-Limit"])
+                if headers.get("X-RateLimit-Reset") is not None:
+                    state.reset = float(headers["X-RateLimit-Reset"])
+
+            if status not in (403, 429) or attempt >= self.max_retries:
+                return None
+
+            retry_after = headers.get("Retry-After")
+            if retry_after is not None:
+                delay = float(retry_after)
+            elif state.remaining == 0:
+                # Primary quota exhausted: rotate immediately if another token
+                # has headroom, otherwise wait for this one to reset.
+                if any(self._states[t].available(now) for t in self._pool if t != token):
+                    delay = 0.0
+                else:
+                    delay = max((state.reset or now) - now, 0.0)
+                    if delay > self.max_wait:
+                        return None
+            elif status == 429 or "rate limit" in (getattr(response, "text", "") or "").lower():
+                delay = self.backoff * (2 ** attempt)
+            else:
+                return None
+            self.retries += 1
+        # Jitter spreads retries from concurrent workers.
+        return min(delay * (1 + random.random() * 0.25), self.max_wait)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            headroom = {
+                f"token{i + 1}": self._states[t].remaining for i, t in enumerate(self._pool)
+            }
+        return {"retries": self.retries, "waited": round(self.waited, 3), "remaining": headroom}
+
+
+def from_config(config, tokens: List[str]) -> RateLimiter:
+    return RateLimiter(
+        tokens,
+        rate=float(config.get("github_rate_per_sec", DEFAULT_RATE)),
+        burst=int(config.get("github_rate_burst", DEFAULT_BURST)),
+        max_retries=int(config.get("github_max_retries", DEFAULT_MAX_RETRIES)),
+        max_wait=float(config.get("github_max_rate_wait", DEFAULT_MAX_WAIT)),
+    )
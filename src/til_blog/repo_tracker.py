@@ -1,26 +1,130 @@
 import os
-import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
 
 from git import Repo
 from git.exc import GitError, NoSuchPathError, InvalidGitRepositoryError
 
+from til_blog import commit_store, state_store
+from til_blog.git_log import DEFAULT_PATCH_MAX_CHARS, iter_log_commits
+from til_blog.metrics import get_metrics
+
+
+DEFAULT_BRANCH = "HEAD"
+# Newest commits taken when there is no usable cursor and neither since_days
+# nor max_scan_commits bounds the walk.
+DEFAULT_UNBOUNDED_SCAN_COMMITS = 100
+
+
+def _has_commit(repo, sha) -> bool:
+    try:
+        repo.git.rev_parse("--verify", "--quiet", f"{sha}^{{commit}}")
+    except GitError:
+        return False
+    return True
+
+
+def open_repo(path):
+    """Return ``(Repo, None)`` or ``(None, message)`` when the repo cannot be opened."""
+    try:
+        return Repo(path), None
+    except (NoSuchPathError, InvalidGitRepositoryError):
+        return None, f"Invalid or missing git repository: {path}"
+    except GitError as exc:
+        return None, f"Failed to open repository {path}: {exc}"
+
+
+def scan_repository(
+    repo, repo_name, branches, last, since=None, max_commits=None, patch_max_chars=DEFAULT_PATCH_MAX_CHARS
+):
+    """Return (new commit records oldest first, new cursor) for one repository.
+
+    Only ``tips ^cursors`` is walked, so the cost is proportional to the
+    number of new commits. When no stored cursor is usable (first run, or the
+    commit was garbage-collected after a history rewrite) the walk is bounded
+    by ``since`` instead. Without ``since`` or ``max_commits`` it takes only
+    the newest ``DEFAULT_UNBOUNDED_SCAN_COMMITS``, so a first run with
+    neither set no longer reads the whole history. ``max_commits`` keeps only
+    the newest commits of a larger range. Files, numstat and truncated
+    patches for every commit come from one streamed ``git log -p``.
+    """
+    tips = {}
+    for branch in branches:
+        try:
+            tips[branch] = repo.commit(branch).hexsha
+        except (GitError, ValueError) as exc:
+            print(f"Skipping unknown branch {branch} in {repo_name}: {exc}")
+    if not tips:
+        return [], None
+
+    cursors = list(last.values()) if isinstance(last, dict) else ([last] if last else [])
+    known = [sha for sha in cursors if _has_commit(repo, sha)]
+    lost = len(known) < len(cursors)
+
+    kwargs = {"reverse": True}
+    if max_commits:
+        kwargs["max_count"] = int(max_commits)
+    if not known or lost:
+        if since:
+            kwargs["since"] = since
+        elif not max_commits:
+            kwargs["max_count"] = DEFAULT_UNBOUNDED_SCAN_COMMITS
+    if lost:
+        bounds = []
+        if "since" in kwargs:
+            bounds.append(f"commits since {since}")
+        if "max_count" in kwargs:
+            bounds.append(f"the newest {kwargs['max_count']} commits")
+        print(
+            f"Stored commit for {repo_name} is no longer in the repository; "
+            f"scanning {' and '.join(bounds)}."
+        )
+    revs = list(dict.fromkeys(tips.values())) + [f"^{sha}" for sha in known]
+    commits = list(iter_log_commits(repo, revs, repo_name, patch_max_chars, **kwargs))
+
+    cursor = tips if branches != [DEFAULT_BRANCH] else tips[DEFAULT_BRANCH]
+    return commits, cursor
+
+
+def _scan_worker(job):
+    """Scan one repo in a worker process; commit records pickle with their patch text.
+
+    The scan time is returned rather than recorded, since a worker process
+    has its own metrics registry.
+    """
+    path, repo_name, branches, last, since, max_commits, patch_max_chars = job
+    start = time.perf_counter()
+    repo, error = open_repo(path)
+    if repo is None:
+        return {"error": error}
+    commits, cursor = scan_repository(repo, repo_name, branches, last, since, max_commits, patch_max_chars)
+    return {"commits": commits, "cursor": cursor, "seconds": time.perf_counter() - start}
+
+
 class RepoTracker:
     def __init__(self, config):
         self.repos = config.get('repos', [])
+        self.since_days = config.get('since_days')
+        self.max_commits = config.get('max_scan_commits')
+        self.patch_max_chars = int(config.get('patch_max_chars') or DEFAULT_PATCH_MAX_CHARS)
+        self.workers = int(config.get('scan_workers') or 1)
+        self.scan_executor = config.get('scan_executor', 'process')
         self.state_file = config.get('state_file', 'state.json')
-        self.state = self._load_state()
-
-    def _load_state(self):
-        if os.path.exists(self.state_file):
-            with open(self.state_file, 'r') as f:
-                return json.load(f)
-        return {}
+        self.state = state_store.open_state(config)
+        self.commit_store = commit_store.from_config(config)
 
     def save_state(self, path=None):
-        path = path or self.state_file
-        with open(path, 'w') as f:
-            json.dump(self.state, f, indent=2)
+        state_store.save_state(path or self.state_file, self.state)
+
+    def _store_commits(self, commits):
+        """Record commit payloads in the shared commit store, skipping known SHAs."""
+        for commit in commits:
+            self.commit_store.put(
+                commit["sha"],
+                {"sha": commit["sha"], "message": commit["message"], "files": commit_store.slim_files(commit["files"])},
+            )
 
     def discover_repos(self):
         # For now, use configured list
@@ -45,8 +149,20 @@ class RepoTracker:
         repo_name = name or os.path.basename(normalized_path.rstrip(os.sep)) or normalized_path
         return normalized_path, repo_name
 
-    def get_new_commits(self):
-        new_commits = []
+    def _entry_branches(self, entry):
+        if isinstance(entry, dict) and entry.get("branches"):
+            return [str(b) for b in entry["branches"]]
+        return [DEFAULT_BRANCH]
+
+    def _since(self) -> Optional[str]:
+        if not self.since_days:
+            return None
+        since_dt = datetime.now(timezone.utc) - timedelta(days=int(self.since_days))
+        return since_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def _scan_jobs(self):
+        since = self._since()
+        jobs = []
         for entry in self.discover_repos():
             resolved = self._resolve_repo_entry(entry)
             if not resolved:
@@ -58,23 +174,69 @@ class RepoTracker:
                 print(f"Repository path not found: {path}")
                 continue
 
-            last = self.state.get(repo_name)
-            try:
-                repo = Repo(path)
-            except (NoSuchPathError, InvalidGitRepositoryError):
-                print(f"Invalid or missing git repository: {path}")
-                continue
-            except GitError as exc:
-                print(f"Failed to open repository {path}: {exc}")
-                continue
-            commits = list(repo.iter_commits())
-            commits_to_process = []
-            for commit in commits:
-                if commit.hexsha == last:
-                    break
-                commits_to_process.append(commit)
+            jobs.append(
+                (
+                    path,
+                    repo_name,
+                    self._entry_branches(entry),
+                    self.state.get(repo_name),
+                    since,
+                    self.max_commits,
+                    self.patch_max_chars,
+                )
+            )
+        return jobs
+
+    def get_new_commits(self):
+        """Return new commits from every configured repo and advance the state.
+
+        Commits are ``CommitRecord`` mappings in configured repo order. With
+        ``scan_workers`` above 1, repos are scanned concurrently.
+        """
+        return list(self.iter_new_commits())
+
+    def iter_new_commits(self):
+        """Yield new commits repo by repo, advancing the state as each repo is read.
+
+        Only one repo's commits are held at a time unless repos are scanned
+        concurrently.
+        """
+        jobs = self._scan_jobs()
+        if self.workers > 1 and len(jobs) > 1:
+            yield from self._scan_parallel(jobs)
+            return
+
+        metrics = get_metrics()
+        for path, repo_name, branches, last, since, max_commits, patch_max_chars in jobs:
+            with metrics.timer("git.scan"):
+                repo, error = open_repo(path)
+                if repo is None:
+                    print(error)
+                    continue
+                commits_to_process, cursor = scan_repository(
+                    repo, repo_name, branches, last, since, max_commits, patch_max_chars
+                )
+            metrics.inc("commits_fetched_total", len(commits_to_process), source="git")
             if commits_to_process:
-                # latest first; reverse to chronological
-                new_commits.extend(reversed(commits_to_process))
-                self.state[repo_name] = commits[0].hexsha
-        return new_commits
+                if self.commit_store is not None:
+                    self._store_commits(commits_to_process)
+                self.state[repo_name] = cursor
+                yield from commits_to_process
+
+    def _scan_parallel(self, jobs):
+        pool_cls = ThreadPoolExecutor if self.scan_executor == "thread" else ProcessPoolExecutor
+        metrics = get_metrics()
+        with pool_cls(max_workers=min(self.workers, len(jobs))) as pool:
+            # Results arrive in job order as the workers finish them.
+            for job, result in zip(jobs, pool.map(_scan_worker, jobs)):
+                repo_name = job[1]
+                if "error" in result:
+                    print(result["error"])
+                    continue
+                metrics.add_time("git.scan", result["seconds"])
+                metrics.inc("commits_fetched_total", len(result["commits"]), source="git")
+                if result["commits"]:
+                    if self.commit_store is not None:
+                        self._store_commits(result["commits"])
+                    self.state[repo_name] = result["cursor"]
+                    yield from result["commits"]
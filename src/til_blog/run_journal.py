@@ -0,0 +1,79 @@
+"""Checkpoint journal for resumable poll runs.
+
+The poller writes one JSON line per repository as soon as that repository's
+commits are fetched: the commits themselves (with patches) and the state
+entry the repo will get. A header line records the run's repository list so
+that ``github_poller --resume`` can finish the same run. It skips the repos
+already in the journal, reuses their fetched commits and fetches only the
+rest. The journal is deleted once the run's post and state have been saved.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+DEFAULT_PATH = ".cache/run_journal.jsonl"
+
+
+class RunJournal:
+    """Append-only JSON-lines record of the repos a run has finished fetching."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._file = None
+
+    def load(self) -> Tuple[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """Return ``(header, {repo: entry})`` of an unfinished run, or ``(None, {})``."""
+        if not os.path.exists(self.path):
+            return None, {}
+        header = None
+        done: Dict[str, Dict[str, Any]] = {}
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # the run died while writing this line
+                if header is None:
+                    header = entry
+                else:
+                    done[entry["repo"]] = entry
+        return header, done
+
+    def _write(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def start(self, header: Dict[str, Any]):
+        """Begin a new journal, replacing any previous one."""
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.close()
+        self._file = open(self.path, "w")
+        self._write(header)
+
+    def reopen(self):
+        """Continue appending to the journal of the run being resumed."""
+        self.close()
+        self._file = open(self.path, "a")
+
+    def checkpoint(self, repo: str, commits: Iterable[Any], repo_state: Any):
+        """Record that ``repo`` is fetched, with its commits and new state entry."""
+        if self._file is None:
+            return
+        payload = [c.to_dict() if hasattr(c, "to_dict") else dict(c) for c in commits]
+        self._write({"repo": repo, "state": repo_state, "commits": payload})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """Remove the journal once the run has been saved."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
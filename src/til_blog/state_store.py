@@ -0,0 +1,158 @@
+"""Run state: per-repo cursors and the SHAs already turned into posts.
+
+By default state lives in ``state_file`` (JSON), rewritten in full at the
+end of a run. With ``state_db`` set it lives in a SQLite database in WAL
+mode instead:
+
+* ``cursors`` holds one row per repo (the same JSON values the dict form
+  keeps), so an update touches only that repo's row;
+* ``commits`` is the seen-SHA index plus a per-repo log of the commits that
+  went into posts, which lets sources drop commits they have already
+  handled, such as the boundary commit an inclusive ``since`` lists again.
+
+Changes made during a run stay in one open transaction until :meth:`save`
+commits it, so a crash leaves the previous state intact. The first time the
+database is opened, an existing ``state_file`` is imported.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from collections.abc import MutableMapping
+from typing import Any, Iterable, Iterator, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursors (
+    repo TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS commits (
+    sha TEXT PRIMARY KEY,
+    repo TEXT NOT NULL,
+    date TEXT,
+    subject TEXT,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS commits_by_repo ON commits (repo, date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def load_json_state(path: str) -> dict:
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_json_state(path: str, state) -> None:
+    """Write ``state`` to ``path`` atomically (temp file + rename)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(dict(state), f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class StateStore(MutableMapping):
+    """SQLite-backed state that reads and writes like the JSON state dict."""
+
+    def __init__(self, path: str, legacy_json: Optional[str] = None):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        if legacy_json:
+            self._migrate(legacy_json)
+
+    def _migrate(self, legacy_json: str):
+        done = self._conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from'").fetchone()
+        if done or not os.path.exists(legacy_json):
+            return
+        for repo, value in load_json_state(legacy_json).items():
+            self[repo] = value
+        self._conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from', ?)", (legacy_json,))
+        self._conn.commit()
+        print(f"Imported state from {legacy_json} into {self.path}.")
+
+    # Mapping interface over the cursors table.
+
+    def __getitem__(self, repo: str) -> Any:
+        row = self._conn.execute("SELECT value FROM cursors WHERE repo = ?", (repo,)).fetchone()
+        if row is None:
+            raise KeyError(repo)
+        return json.loads(row[0])
+
+    def __setitem__(self, repo: str, value: Any):
+        self._conn.execute(
+            "INSERT INTO cursors (repo, value) VALUES (?, ?) ON CONFLICT(repo) DO UPDATE SET value = excluded.value",
+            (repo, json.dumps(value)),
+        )
+
+    def __delitem__(self, repo: str):
+        if self._conn.execute("DELETE FROM cursors WHERE repo = ?", (repo,)).rowcount == 0:
+            raise KeyError(repo)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([row[0] for row in self._conn.execute("SELECT repo FROM cursors ORDER BY rowid")])
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM cursors").fetchone()[0]
+
+    # Seen-SHA index.
+
+    def seen(self, sha: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM commits WHERE sha = ?", (sha,)).fetchone() is not None
+
+    def record(self, commits: Iterable[Any]):
+        """Add commits to the seen index and their repo's log."""
+        now = time.time()
+        rows = []
+        for c in commits:
+            message = (c.get("message") or "").strip()
+            rows.append((c.get("sha"), c.get("repo") or "", c.get("date"), message.split("\n", 1)[0], now))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO commits (sha, repo, date, subject, seen_at) VALUES (?, ?, ?, ?, ?)", rows
+        )
+
+    def repo_commits(self, repo: str) -> list:
+        """Return ``(sha, date, subject)`` rows recorded for ``repo``, oldest first."""
+        return self._conn.execute(
+            "SELECT sha, date, subject FROM commits WHERE repo = ? ORDER BY date, seen_at", (repo,)
+        ).fetchall()
+
+    def save(self):
+        """Commit this run's changes."""
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def open_state(config):
+    """Return the run state: a :class:`StateStore` if ``state_db`` is set, else the JSON dict."""
+    json_path = config.get("state_file", "state.json")
+    if config.get("state_db"):
+        return StateStore(os.path.expanduser(str(config["state_db"])), legacy_json=json_path)
+    return load_json_state(json_path)
+
+
+def save_state(path: str, state) -> None:
+    """Persist ``state``: commit the database transaction, or rewrite the JSON file."""
+    if isinstance(state, StateStore):
+        state.save()
+    else:
+        save_json_state(path, state)
@@ -2,19 +2,211 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
+import random
+import time
 
 from collections import defaultdict
-from typing import Any, Dict, Iterable, List
-
-from openai import OpenAI
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List
+
+import openai
+from openai import AsyncOpenAI, OpenAI
+
+from til_blog.commit_record import CommitRecord
+from til_blog.diff_compact import COLLAPSED_KINDS, compact_commit, describe_collapsed
+from til_blog.http_cache import ResponseCache
+from til_blog.metrics import get_metrics
+
+
+DEFAULT_MODEL = "gpt-5-mini"
+DEFAULT_TOKEN_BUDGET = 12000
+DEFAULT_CONCURRENCY = 4
+MAX_OUTPUT_TOKENS = 400
+TEMPERATURE = 0.3
+DEFAULT_CACHE_TTL_HOURS = 72
+DEFAULT_CACHE_MAX_MB = 50
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 1.0  # seconds, doubled per attempt
+DEFAULT_DEADLINE = 120.0  # seconds for the whole async run
+
+# Rough size heuristics: ~4 characters per token for English and code.
+CHARS_PER_TOKEN = 4
+PATCH_CHAR_LIMIT = 1200
+MIN_PATCH_CHARS = 200
+MESSAGE_CHAR_LIMIT = 2000
+FILE_OVERHEAD_CHARS = 28
+
+INSTRUCTIONS = (
+    "You are a helpful assistant. Summarize the following code commits into a concise 'Today I Learned' (TIL) "
+    "entry. For each commit, include the repo, commit message, and a brief summary of changed files. Keep the "
+    "final output short and suitable as a Markdown blog post."
+)
+CHUNK_INSTRUCTIONS = (
+    "You are a helpful assistant. The following code commits are part {index} of {total} of one day's work. "
+    "Write concise Markdown notes covering each commit's repo, message and what changed; they will be merged "
+    "into a single 'Today I Learned' (TIL) post."
+)
+STREAM_INTERRUPTED_NOTE = "_The summary was cut short because the model's response was interrupted._"
+REPO_INSTRUCTIONS = (
+    "You are a helpful assistant. Summarize the following code commits to the {repo} repository into a short "
+    "Markdown section of a 'Today I Learned' (TIL) post. Cover the notable changes and what was learned; do not "
+    "add a top-level heading."
+)
+REDUCE_INSTRUCTIONS = (
+    "You are a helpful assistant. Merge the following partial notes about one day's code commits into a single "
+    "concise 'Today I Learned' (TIL) entry. Keep every repo and notable change, remove repetition, and keep the "
+    "final output short and suitable as a Markdown blog post."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for prompt budgeting."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _commit_header(commit: Dict[str, Any]) -> str:
+    msg = (commit.get("message") or "").strip()
+    if len(msg) > MESSAGE_CHAR_LIMIT:
+        msg = msg[:MESSAGE_CHAR_LIMIT] + "\n...[truncated]"
+    return f"Repo: {commit.get('repo') or ''}\nCommit: {commit.get('sha') or ''}\nMessage: {msg}"
+
+
+def _allocate(lengths: List[int], budget: int, caps: List[int], weights: List[float]) -> List[int]:
+    """Share ``budget`` characters across patches of ``lengths`` (weighted max-min fair).
+
+    Each patch may take up to ``caps[i]``; the budget is split in proportion
+    to ``weights``, and whatever short patches do not need flows to the
+    longer ones, so the interesting large diffs get the leftover room.
+    """
+    alloc = [0] * len(lengths)
+    wanted = [min(length, cap) for length, cap in zip(lengths, caps)]
+    order = sorted(range(len(lengths)), key=lambda i: wanted[i] / weights[i] if weights[i] > 0 else 0)
+    remaining = max(budget, 0)
+    weight_left = sum(weights)
+    for i in order:
+        if weights[i] <= 0:
+            continue
+        share = int(remaining * weights[i] / weight_left)
+        alloc[i] = min(wanted[i], share)
+        remaining -= alloc[i]
+        weight_left -= weights[i]
+    return alloc
+
+
+def _snippet(patch: str, limit: int) -> str:
+    if len(patch) <= limit:
+        return patch
+    # Prefer ending on a whole diff line.
+    cut = patch.rfind("\n", 0, limit)
+    return patch[: cut if cut > 0 else limit] + "\n...[truncated]"
+
+
+def pack_prompt(instructions: str, commits: List[Dict[str, Any]], token_budget: int) -> str:
+    """Build a prompt that fits ``token_budget``.
+
+    Commit messages always go in first; patches share whatever budget is
+    left, each capped at ``PATCH_CHAR_LIMIT`` characters scaled by the file's
+    relevance ``weight`` (set by :mod:`til_blog.diff_compact`, default 1).
+    """
+    headers = [_commit_header(c) for c in commits]
+    files_per_commit = [c.get("files") or [] for c in commits]
+
+    fixed = instructions + "".join(headers)
+    # File bullets, fences and the truncation marker cost a little on top of
+    # the patch text itself.
+    overhead = sum(len(str(f.get("filename"))) + FILE_OVERHEAD_CHARS for files in files_per_commit for f in files)
+    patch_budget = (token_budget - estimate_tokens(fixed)) * CHARS_PER_TOKEN - overhead - 4 * len(commits)
+
+    all_files = [f for files in files_per_commit for f in files]
+    weights = [float(f.get("weight", 1.0)) for f in all_files]
+    alloc = iter(
+        _allocate(
+            [len(f.get("patch") or "") for f in all_files],
+            patch_budget,
+            [int(PATCH_CHAR_LIMIT * w) for w in weights],
+            weights,
+        )
+    )
+
+    sections: List[str] = [instructions]
+    for header, files in zip(headers, files_per_commit):
+        sections.append(header)
+        if not files:
+            continue
+        file_lines = []
+        for f in files:
+            fn = f.get("filename")
+            patch = f.get("patch") or ""
+            limit = next(alloc)
+            if f.get("kind") in COLLAPSED_KINDS:
+                file_lines.append(f"- {fn}: {describe_collapsed(f)}")
+            elif patch and limit > 0:
+                # Truncate long patches to avoid token overuse
+                snippet = _snippet(patch, limit)
+                # Use tildes for fenced code block to avoid embedding backticks in source
+                file_lines.append(f"- {fn}:\n~~~\n{snippet}\n~~~")
+            elif patch:
+                file_lines.append(f"- {fn}: (patch omitted for length)")
+            else:
+                file_lines.append(f"- {fn}: (no patch available)")
+        sections.append("\n".join(file_lines))
+
+    return "\n\n".join(sections)
+
+
+def _commit_cost(commit: Dict[str, Any]) -> int:
+    """Minimum tokens a commit needs in a prompt: message plus small patch excerpts."""
+    chars = len(_commit_header(commit))
+    for f in commit.get("files") or []:
+        patch_chars = min(len(f.get("patch") or ""), int(MIN_PATCH_CHARS * f.get("weight", 1.0)))
+        chars += len(str(f.get("filename"))) + FILE_OVERHEAD_CHARS + patch_chars
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def chunk_commits(commits: List[Dict[str, Any]], token_budget: int) -> List[List[Dict[str, Any]]]:
+    """Split commits, in order, into groups that each fit ``token_budget``."""
+    room = token_budget - estimate_tokens(CHUNK_INSTRUCTIONS) - 16
+    chunks: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    used = 0
+    for commit in commits:
+        cost = _commit_cost(commit)
+        if current and used + cost > room:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(commit)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
 
 
 class Summarizer:
     """Summarize commit history, falling back when OpenAI is unavailable."""
 
-    def __init__(self, api_key: str | None):
+    def __init__(self, api_key: str | None, config: Dict[str, Any] | None = None):
+        config = config or {}
         self._api_key = api_key or ""
+        self.model = config.get("summary_model", DEFAULT_MODEL)
+        self.token_budget = int(config.get("summary_token_budget", DEFAULT_TOKEN_BUDGET))
+        self.concurrency = int(config.get("summary_concurrency", DEFAULT_CONCURRENCY))
+        self.cache = None
+        if config.get("summary_cache_dir"):
+            self.cache = ResponseCache(
+                os.path.expanduser(str(config["summary_cache_dir"])),
+                max_bytes=int(config.get("summary_cache_max_mb", DEFAULT_CACHE_MAX_MB)) * 1024 * 1024,
+                ttl=float(config.get("summary_cache_ttl_hours", DEFAULT_CACHE_TTL_HOURS)) * 3600,
+            )
+        # "async" summarises each repo concurrently instead of one request per day.
+        self.mode = config.get("summary_mode", "single")
+        self.max_retries = int(config.get("summary_max_retries", DEFAULT_MAX_RETRIES))
+        self.retry_backoff = float(config.get("summary_retry_backoff", DEFAULT_RETRY_BACKOFF))
+        self.deadline = float(config.get("summary_deadline", DEFAULT_DEADLINE))
         self.client = None
         if self._is_valid_api_key(self._api_key):
             self.client = OpenAI(api_key=self._api_key)
@@ -34,13 +226,79 @@ class Summarizer:
 
         return True
 
+    def _cache_key(self, prompt: str) -> str:
+        # Whitespace differences at line ends do not change the request.
+        normalised = "\n".join(line.rstrip() for line in prompt.strip().splitlines())
+        material = json.dumps([self.model, MAX_OUTPUT_TOKENS, TEMPERATURE, normalised])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _cached(self, prompt: str):
+        """Return ``(cache key, cached text)``; both None when caching is off."""
+        if self.cache is None:
+            return None, None
+        key = self._cache_key(prompt)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache.hits += 1
+            return key, entry["text"]
+        self.cache.misses += 1
+        return key, None
+
+    def _remember(self, key, text: str):
+        if key is not None and text:
+            self.cache.put(key, {"text": text})
+
+    @staticmethod
+    def _count_request(prompt: str, mode: str):
+        metrics = get_metrics()
+        metrics.inc("openai_requests_total", mode=mode)
+        metrics.inc("openai_prompt_chars_total", len(prompt))
+        metrics.inc("openai_prompt_tokens_estimated_total", estimate_tokens(prompt))
+
+    @staticmethod
+    def _count_usage(usage):
+        """Add the token counts the API reported, when it reported any."""
+        for field in ("input_tokens", "output_tokens"):
+            value = getattr(usage, field, None)
+            if isinstance(value, int):
+                get_metrics().inc(f"openai_{field}_total", value)
+
+    def _complete(self, prompt: str) -> str:
+        """Run one Responses API request, answering repeats from the cache."""
+        key, text = self._cached(prompt)
+        if text is not None:
+            return text
+
+        self._count_request(prompt, "sync")
+        try:
+            with get_metrics().timer("openai.request"):
+                # Use the model requested by the user (gpt-5-mini)
+                response = self.client.responses.create(
+                    model=self.model,
+                    input=prompt,
+                    max_output_tokens=MAX_OUTPUT_TOKENS,
+                    temperature=TEMPERATURE,
+                )
+        except Exception:
+            get_metrics().inc("openai_errors_total", mode="sync")
+            raise
+        self._count_usage(getattr(response, "usage", None))
+        text = self._extract_text(response)
+        self._remember(key, text)
+        return text
+
     def summarize(self, commits: List[dict]) -> str:
-        """Summarize commits with OpenAI, or fall back to a basic digest."""
+        """Summarize commits with OpenAI, or fall back to a basic digest.
+
+        Commits that fit the prompt token budget are summarised in one
+        request; otherwise they are split into chunks that are summarised
+        concurrently and then merged (map-reduce).
+        """
 
         if not commits:
             return ""
 
-        normalized_commits = [self._normalise_commit(c) for c in commits]
+        normalized_commits = [compact_commit(self._normalise_commit(c)) for c in commits]
 
         if not self.client:
             return self._fallback_summary(
@@ -48,40 +306,17 @@ class Summarizer:
                 "Summarization skipped because no OpenAI API key was configured.",
             )
 
-        prompt_sections: List[str] = [
-            "You are a helpful assistant. Summarize the following code commits into a concise 'Today I Learned' (TIL) entry. For each commit, include the repo, commit message, and a brief summary of changed files. Keep the final output short and suitable as a Markdown blog post.",
-        ]
-
-        for c in normalized_commits:
-            repo = c.get("repo") or ""
-            sha = c.get("sha") or ""
-            msg = (c.get("message") or "").strip()
-            prompt_sections.append(f"Repo: {repo}\nCommit: {sha}\nMessage: {msg}")
-            files = c.get("files") or []
-            if files:
-                file_lines = []
-                for f in files:
-                    fn = f.get("filename")
-                    patch = f.get("patch") or ""
-                    if patch:
-                        # Truncate long patches to avoid token overuse
-                        snippet = patch if len(patch) <= 1200 else patch[:1200] + "\n...[truncated]"
-                        # Use tildes for fenced code block to avoid embedding backticks in source
-                        file_lines.append(f"- {fn}:\n~~~\n{snippet}\n~~~")
-                    else:
-                        file_lines.append(f"- {fn}: (no patch available)")
-                prompt_sections.append("\n".join(file_lines))
-
-        prompt = "\n\n".join(prompt_sections)
-
-        # Use the model requested by the user (gpt-5-mini)
+        if self.mode == "async":
+            return asyncio.run(self.summarize_async(normalized_commits))
+
+        chunks = chunk_commits(normalized_commits, self.token_budget)
+        if len(chunks) > 1:
+            return self._map_reduce(chunks)
+
+        prompt = pack_prompt(INSTRUCTIONS, normalized_commits, self.token_budget)
+
         try:
-            response = self.client.responses.create(
-                model="gpt-5-mini",
-                input=prompt,
-                max_output_tokens=400,
-                temperature=0.3,
-            )
+            return self._complete(prompt)
         except Exception as exc:  # pragma: no cover - print path exercised in action
             print(
                 f"Warning: OpenAI summarization failed ({exc}). Falling back to commit message summary.",
@@ -91,7 +326,223 @@ class Summarizer:
                 "Summarization failed; listing commit messages instead.",
             )
 
-        return self._extract_text(response)
+    def _summarize_chunk(self, index: int, total: int, chunk: List[Dict[str, Any]]) -> str | None:
+        instructions = CHUNK_INSTRUCTIONS.format(index=index + 1, total=total)
+        try:
+            return self._complete(pack_prompt(instructions, chunk, self.token_budget))
+        except Exception as exc:
+            print(f"Warning: OpenAI summarization failed for part {index + 1} of {total} ({exc}).")
+            return None
+
+    def _map(self, chunks: List[List[Dict[str, Any]]]) -> List[str] | None:
+        """Summarise chunks concurrently; None when every chunk failed."""
+        total = len(chunks)
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+            partials = list(pool.map(lambda item: self._summarize_chunk(item[0], total, item[1]), enumerate(chunks)))
+
+        if not any(partials):
+            return None
+
+        notes = []
+        for chunk, partial in zip(chunks, partials):
+            if partial:
+                notes.append(partial)
+            else:
+                notes.append(self._fallback_summary(chunk, "Summarization failed for these commits."))
+        return notes
+
+    def _merge_prompt(self, notes: List[str]) -> str:
+        # Partial notes are bounded by MAX_OUTPUT_TOKENS each, so the merge
+        # prompt only needs trimming when there are very many chunks.
+        room = (self.token_budget - estimate_tokens(REDUCE_INSTRUCTIONS)) * CHARS_PER_TOKEN // len(notes)
+        return "\n\n".join([REDUCE_INSTRUCTIONS] + [f"Part {i + 1}:\n{note[:room]}" for i, note in enumerate(notes)])
+
+    def _map_reduce(self, chunks: List[List[Dict[str, Any]]]) -> str:
+        notes = self._map(chunks)
+        if notes is None:
+            return self._fallback_summary(
+                [c for chunk in chunks for c in chunk],
+                "Summarization failed; listing commit messages instead.",
+            )
+        try:
+            return self._complete(self._merge_prompt(notes))
+        except Exception as exc:
+            print(f"Warning: OpenAI merge step failed ({exc}). Joining partial summaries instead.")
+            return "\n\n".join(notes)
+
+    def stream(self, commits: List[dict]) -> Iterator[str]:
+        """Yield the summary in pieces as the Responses API streams it.
+
+        Single-prompt days stream the whole answer; map-reduce days summarise
+        their chunks as usual and stream the merge. If the stream fails or
+        outlives ``summary_deadline`` after some text has arrived, that text
+        is kept and a note is appended; if nothing arrived, the usual
+        fallback summary is yielded instead. The async mode does not stream
+        and yields its result in one piece.
+        """
+        if not commits:
+            return
+
+        normalized_commits = [compact_commit(self._normalise_commit(c)) for c in commits]
+        if not self.client or self.mode == "async":
+            yield self.summarize(commits)
+            return
+
+        chunks = chunk_commits(normalized_commits, self.token_budget)
+        if len(chunks) > 1:
+            notes = self._map(chunks)
+            if notes is None:
+                yield self._fallback_summary(
+                    normalized_commits, "Summarization failed; listing commit messages instead."
+                )
+                return
+            yield from self._stream_completion(self._merge_prompt(notes), "\n\n".join(notes))
+            return
+
+        fallback = self._fallback_summary(normalized_commits, "Summarization failed; listing commit messages instead.")
+        yield from self._stream_completion(pack_prompt(INSTRUCTIONS, normalized_commits, self.token_budget), fallback)
+
+    def _stream_completion(self, prompt: str, fallback: str) -> Iterator[str]:
+        key, text = self._cached(prompt)
+        if text is not None:
+            yield text
+            return
+
+        parts: List[str] = []
+        events = None
+        self._count_request(prompt, "stream")
+        started = time.monotonic()
+        try:
+            events = self.client.responses.create(
+                model=self.model,
+                input=prompt,
+                max_output_tokens=MAX_OUTPUT_TOKENS,
+                temperature=TEMPERATURE,
+                stream=True,
+                timeout=self.deadline,
+            )
+            deadline = time.monotonic() + self.deadline
+            for event in events:
+                kind = getattr(event, "type", "")
+                if kind == "response.output_text.delta":
+                    parts.append(event.delta)
+                    yield event.delta
+                elif kind == "response.completed":
+                    self._count_usage(getattr(getattr(event, "response", None), "usage", None))
+                elif kind in ("response.failed", "error"):
+                    raise RuntimeError(f"stream reported {kind}")
+                if time.monotonic() > deadline:
+                    raise TimeoutError("summary stream deadline exceeded")
+        except Exception as exc:
+            get_metrics().inc("openai_errors_total", mode="stream")
+            if not parts:
+                print(f"Warning: OpenAI streaming failed ({exc}). Falling back to commit message summary.")
+                yield fallback
+            else:
+                print(f"Warning: OpenAI stream interrupted ({exc}). Keeping the partial summary.")
+                yield "\n\n" + STREAM_INTERRUPTED_NOTE
+            return
+        finally:
+            get_metrics().add_time("openai.stream", time.monotonic() - started)
+            close = getattr(events, "close", None)
+            if close is not None:
+                close()
+        self._remember(key, "".join(parts).strip())
+
+    @staticmethod
+    def _is_transient(exc: Exception) -> bool:
+        if isinstance(exc, (openai.APIConnectionError, openai.RateLimitError, asyncio.TimeoutError)):
+            return True
+        if isinstance(exc, openai.APIStatusError):
+            return exc.status_code in (408, 409) or exc.status_code >= 500
+        return False
+
+    async def _complete_async(self, client, prompt: str, deadline: float) -> str:
+        """Async ``_complete`` with jittered exponential backoff bounded by ``deadline``."""
+        key, text = self._cached(prompt)
+        if text is not None:
+            return text
+
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError("summary deadline exceeded")
+            self._count_request(prompt, "async")
+            try:
+                with get_metrics().timer("openai.request"):
+                    response = await asyncio.wait_for(
+                        client.responses.create(
+                            model=self.model,
+                            input=prompt,
+                            max_output_tokens=MAX_OUTPUT_TOKENS,
+                            temperature=TEMPERATURE,
+                        ),
+                        timeout=remaining,
+                    )
+            except Exception as exc:
+                get_metrics().inc("openai_errors_total", mode="async")
+                if attempt >= self.max_retries or not self._is_transient(exc):
+                    raise
+                # Full jitter keeps concurrent repos from retrying in lockstep.
+                delay = random.uniform(0, self.retry_backoff * (2 ** attempt))
+                if time.monotonic() + delay >= deadline:
+                    raise
+                attempt += 1
+                get_metrics().inc("openai_retries_total")
+                await asyncio.sleep(delay)
+                continue
+            self._count_usage(getattr(response, "usage", None))
+            text = self._extract_text(response)
+            self._remember(key, text)
+            return text
+
+    async def _summarize_repo(self, client, limit, repo: str, commits: List[Dict[str, Any]], deadline: float) -> str:
+        instructions = REPO_INSTRUCTIONS.format(repo=repo)
+        notes = []
+        for chunk in chunk_commits(commits, self.token_budget):
+            try:
+                prompt = pack_prompt(instructions, chunk, self.token_budget)
+                async with limit:
+                    notes.append(await self._complete_async(client, prompt, deadline))
+            except Exception as exc:
+                print(f"Warning: OpenAI summarization failed for {repo} ({exc!r}). Listing its commits instead.")
+                notes.append(self._fallback_section(chunk))
+        return "\n\n".join(notes)
+
+    async def summarize_async(self, commits: List[Dict[str, Any]]) -> str:
+        """Summarise each repo's commits concurrently and join the sections.
+
+        At most ``summary_concurrency`` requests are in flight. Transient
+        errors are retried until ``summary_deadline`` seconds have passed;
+        a repo that still fails is listed by commit message while the other
+        repos keep their summaries.
+        """
+        grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for commit in commits:
+            grouped[commit.get("repo") or "unknown-repo"].append(commit)
+
+        # Retries are handled here, with jitter and a shared deadline.
+        client = AsyncOpenAI(api_key=self._api_key, max_retries=0)
+        limit = asyncio.Semaphore(max(1, self.concurrency))
+        deadline = time.monotonic() + self.deadline
+        try:
+            sections = await asyncio.gather(
+                *(self._summarize_repo(client, limit, repo, repo_commits, deadline) for repo, repo_commits in grouped.items())
+            )
+        finally:
+            await client.close()
+        return "\n\n".join(f"#### {repo}\n\n{section}" for repo, section in zip(grouped, sections))
+
+    @staticmethod
+    def _fallback_section(commits: Iterable[Dict[str, Any]]) -> str:
+        """Markdown bullets of each commit's short SHA and subject line."""
+        lines = []
+        for commit in commits:
+            message = (commit.get("message") or "").strip()
+            first_line = message.splitlines()[0] if message else "(no commit message)"
+            lines.append(f"- {(commit.get('sha') or '')[:7]} {first_line}".strip())
+        return "\n".join(lines)
 
     @staticmethod
     def _extract_text(response) -> str:
@@ -124,35 +575,28 @@ class Summarizer:
     def _fallback_summary(commits: Iterable[Dict[str, Any]], reason: str) -> str:
         """Return a simple Markdown list of commits when AI summarisation is unavailable."""
 
-        grouped: Dict[str, List[str]] = defaultdict(list)
+        grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         for commit in commits:
-            repo = commit.get("repo") or "unknown-repo"
-            sha = (commit.get("sha") or "")[:7]
-            message = (commit.get("message") or "").strip()
-            first_line = message.splitlines()[0] if message else "(no commit message)"
-            bullet = f"- {sha} {first_line}".strip()
-            grouped[repo].append(bullet)
+            grouped[commit.get("repo") or "unknown-repo"].append(commit)
 
         lines: List[str] = ["### Today's commits", "", reason, ""]
 
-        for repo, entries in grouped.items():
+        for repo, repo_commits in grouped.items():
             lines.append(f"#### {repo}")
-            lines.extend(entries)
+            lines.append(Summarizer._fallback_section(repo_commits))
             lines.append("")
 
         return "\n".join(lines).rstrip()
 
     @staticmethod
-    def _normalise_commit(commit: Any) -> Dict[str, Any]:
-        """Coerce commit objects from different sources into a dict form."""
+    def _normalise_commit(commit: Any) -> CommitRecord:
+        """Coerce commit objects from different sources into a ``CommitRecord``.
+
+        Records are passed through as they are, without copying.
+        """
 
-        if isinstance(commit, dict):
-            return {
-                "repo": commit.get("repo"),
-                "sha": commit.get("sha"),
-                "message": commit.get("message"),
-                "files": commit.get("files") or [],
-            }
+        if isinstance(commit, Mapping):
+            return CommitRecord.from_mapping(commit)
 
         sha = getattr(commit, "hexsha", "")
         message = getattr(commit, "message", "")
@@ -165,4 +609,4 @@ class Summarizer:
                 if repo_path:
                     repo_name = os.path.basename(repo_path.rstrip(os.sep)) or repo_path
 
-        return {"repo": repo_name, "sha": sha, "message": message, "files": []}
+        return CommitRecord(sha, message, repo=repo_name)
@@ -0,0 +1,88 @@
+import sqlite3
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from til_blog.cassette import Cassette, CassetteMiss
+from til_blog.http_cache import CachedSession
+
+
+def _response(status, body, headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r._content = body.encode()
+    r.headers = CaseInsensitiveDict(headers or {})
+    return r
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_record_then_replay_in_order(monkeypatch, tmp_path):
+    path = str(tmp_path / "gh.db")
+    clock = Clock()
+    replies = iter(
+        [
+            _response(429, '{"message": "slow down"}', {"Retry-After": "1"}),
+            _response(
+                200,
+                '[{"sha": "a"}]',
+                {"X-RateLimit-Remaining": "41", "Link": '<https://api.github.com/x?page=2>; rel="last"'},
+            ),
+        ]
+    )
+
+    def fake_get(self, url, headers=None, params=None):
+        clock.now += 0.5
+        return next(replies)
+
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+    recorder = CachedSession(cassette=Cassette(path, mode="record", clock=clock))
+    auth = {"Authorization": "token secret"}
+    assert recorder.get("https://api.github.com/x", headers=auth, params={"page": 1}).status_code == 429
+    assert recorder.get("https://api.github.com/x", headers=auth, params={"page": 1}).status_code == 200
+    recorder.close()
+
+    raw = sqlite3.connect(path).execute("SELECT url, headers, elapsed FROM responses ORDER BY id").fetchall()
+    assert raw[0][0] == "https://api.github.com/x?page=1"
+    assert all("secret" not in headers for _, headers, _ in raw)
+    assert [elapsed for _, _, elapsed in raw] == [0.5, 0.5]
+
+    monkeypatch.setattr(requests.Session, "get", lambda *a, **kw: pytest.fail("replay must not hit the network"))
+    slept = []
+    replayer = CachedSession(cassette=Cassette(path, speed=0.5, sleep=slept.append))
+    first = replayer.get("https://api.github.com/x", headers={"Authorization": "token other"}, params={"page": 1})
+    second = replayer.get("https://api.github.com/x", params={"page": 1})
+    again = replayer.get("https://api.github.com/x", params={"page": 1})
+
+    assert (first.status_code, first.headers["Retry-After"]) == (429, "1")
+    assert second.json() == [{"sha": "a"}]
+    assert second.headers["X-RateLimit-Remaining"] == "41"
+    assert second.links["last"]["url"] == "https://api.github.com/x?page=2"
+    assert again.status_code == 200  # the last recorded response is reused
+    assert slept == [0.25, 0.25, 0.25]
+
+    with pytest.raises(CassetteMiss):
+        replayer.get("https://api.github.com/y")
+    assert replayer.cassette.stats() == {"mode": "replay", "recorded": 0, "replayed": 3, "misses": 1}
+
+
+def test_posts_are_keyed_by_body(monkeypatch, tmp_path):
+    path = str(tmp_path / "gh.db")
+    monkeypatch.setattr(
+        requests.Session, "post", lambda self, url, headers=None, json=None: _response(200, f'{{"q": "{json["query"]}"}}')
+    )
+    recorder = CachedSession(cassette=Cassette(path, mode="record"))
+    recorder.post("https://api.github.com/graphql", json={"query": "a"})
+    recorder.post("https://api.github.com/graphql", json={"query": "b"})
+    recorder.close()
+
+    replayer = CachedSession(cassette=Cassette(path, speed=0))
+    assert replayer.post("https://api.github.com/graphql", json={"query": "b"}).json() == {"q": "b"}
+    assert replayer.post("https://api.github.com/graphql", json={"query": "a"}).json() == {"q": "a"}
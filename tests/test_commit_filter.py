@@ -0,0 +1,58 @@
+from til_blog.commit_filter import CommitFilter, from_config, patch_fingerprint
+
+
+def _commit(sha, message, author="Ada <ada@example.com>", parents=1, patch="@@ -1 +1 @@\n-a\n+b"):
+    return {
+        "sha": sha,
+        "message": message,
+        "author": author,
+        "parents": parents,
+        "repo": "o/r",
+        "files": [{"filename": "f.py", "patch": patch}],
+    }
+
+
+def test_drops_bots_merges_and_excluded_messages():
+    commits = [
+        _commit("a1", "Add parser"),
+        _commit("a2", "chore: daily TIL posts [skip ci]", author="ctxzz-ai <ctxzz-ai@users.noreply.github.com>"),
+        _commit("a3", "Merge branch 'main'", parents=2, patch="@@ -5 +5 @@\n-x\n+y"),
+        _commit("a4", "Bump requests", author="dependabot[bot] <support@github.com>", patch="+1"),
+        _commit("a5", "Fix parser edge case", patch="@@ -9 +9 @@\n-c\n+d"),
+    ]
+    noise = CommitFilter()
+
+    kept = noise.apply(commits)
+
+    assert [c["sha"] for c in kept] == ["a1", "a5"]
+    stats = noise.stats()
+    assert stats["dropped"] == 3
+    assert stats["reasons"] == {"message": 1, "merge": 1, "bot": 1}
+    assert stats["bytes_dropped"] == sum(len(c["message"]) + len(c["files"][0]["patch"]) for c in commits[1:4])
+
+
+def test_merge_detected_from_message_without_parent_info():
+    commit = _commit("m1", "Merge pull request #12 from o/feature")
+    del commit["parents"]
+    assert CommitFilter().reason(commit) == "merge"
+
+
+def test_dedupes_shas_and_cherry_picks():
+    original = _commit("abc1234def", "Fix bug", patch="@@ -10,2 +10,2 @@\n-a\n+b")
+    duplicate = dict(original)
+    picked = _commit("fff0000", "Fix bug\n\n(cherry picked from commit abc1234def)", patch="+other")
+    shifted = _commit("eee0000", "Fix bug on release", patch="@@ -40,2 +40,2 @@\n-a\n+b")
+
+    kept = CommitFilter().apply([original, duplicate, picked, shifted])
+
+    assert kept == [original]
+    assert patch_fingerprint(original) == patch_fingerprint(shifted)
+
+
+def test_config_rules_replace_defaults():
+    noise = from_config({"commit_filter": {"exclude_messages": [], "exclude_authors": ["^Ada "], "skip_merges": False}})
+
+    kept = noise.apply([_commit("a1", "[skip ci] wip"), _commit("a2", "x", parents=2, author="Bob <b@x>")])
+
+    assert [c["sha"] for c in kept] == ["a2"]
+    assert noise.stats()["reasons"] == {"author": 1}
@@ -0,0 +1,40 @@
+import pickle
+
+from til_blog import commit_record
+from til_blog.commit_record import CommitRecord, FileChange, PatchSpool
+
+
+def test_long_patches_are_spooled_and_read_back(monkeypatch):
+    spool = PatchSpool()
+    monkeypatch.setattr(commit_record, "_spool", spool)
+    long_patch = "+" + "é" * 500
+
+    f = FileChange("a.py", patch=long_patch)
+    short = FileChange("b.py", patch="+x")
+
+    assert f.patch == long_patch
+    assert short.patch == "+x"
+    assert spool.size == len(long_patch.encode("utf-8"))
+    # The shared spooled body is reused, not written again.
+    assert f.replace(kind="code").patch == long_patch
+    assert spool.size == len(long_patch.encode("utf-8"))
+
+
+def test_records_behave_like_read_only_dicts():
+    record = CommitRecord("s1", "msg", [{"filename": "a.py", "patch": "+x"}], repo="o/r")
+
+    assert record == {"sha": "s1", "message": "msg", "files": [{"filename": "a.py", "patch": "+x"}], "repo": "o/r"}
+    assert record.get("author") is None and "author" not in record
+    assert record["files"][0]["status"] is None
+    assert record["files"][0].get("weight", 1.0) == 1.0
+    assert record.get("unknown", "x") == "x"
+    assert not hasattr(record, "__dict__")
+
+
+def test_records_pickle_with_patch_text():
+    record = CommitRecord("s1", "msg", [FileChange("a.py", patch="+" + "x" * 1000)], repo="o/r", parents=1)
+
+    copy = pickle.loads(pickle.dumps(record))
+
+    assert copy == record
+    assert copy.files[0].patch == "+" + "x" * 1000
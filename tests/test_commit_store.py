@@ -0,0 +1,75 @@
+import requests
+
+from til_blog import github_poller
+from til_blog.commit_store import CommitStore
+from til_blog.repo_tracker import RepoTracker
+from test_repo_tracker import init_test_repo
+
+
+def test_put_get_roundtrip_is_sharded(tmp_path):
+    store = CommitStore(str(tmp_path))
+    store.put("abcdef1234", {"sha": "abcdef1234", "files": [{"filename": "a.py", "patch": "+x"}]})
+
+    assert (tmp_path / "ab" / "cdef1234").exists()
+    assert CommitStore(str(tmp_path)).get("abcdef1234")["files"][0]["patch"] == "+x"
+    assert store.get("missing") is None
+    assert store.stats()["misses"] == 1
+
+
+def test_store_evicts_over_budget(tmp_path):
+    store = CommitStore(str(tmp_path), max_bytes=60)
+    store.put("aa11", {"message": "one"})
+    store.put("bb22", {"message": "two"})
+    store.put("cc33", {"message": "three"})
+
+    assert "aa11" not in store
+    assert "cc33" in store
+    assert store.stats()["evictions"] >= 1
+
+
+def test_get_commit_detail_uses_store(tmp_path, monkeypatch):
+    calls = []
+
+    class Resp:
+        status_code = 200
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"commit": {"message": "m"}, "files": [{"filename": "f", "patch": "+1", "sha": "blob"}]}
+
+    monkeypatch.setattr(requests.Session, "get", lambda self, url, **kw: calls.append(url) or Resp())
+    monkeypatch.setattr(github_poller, "_commit_store", CommitStore(str(tmp_path)))
+
+    first = github_poller.get_commit_detail("o/r", "deadbeef", "tok")
+    second = github_poller.get_commit_detail("o/r", "deadbeef", "tok")
+
+    assert len(calls) == 1
+    assert first["files"][0]["patch"] == "+1"
+    assert second["files"] == [{"filename": "f", "patch": "+1"}]
+
+
+def test_repo_tracker_feeds_store(tmp_path):
+    repo_dir = init_test_repo(tmp_path)
+    config = {
+        "repos": [str(repo_dir)],
+        "state_file": str(tmp_path / "state.json"),
+        "commit_store_dir": str(tmp_path / "store"),
+    }
+    tracker = RepoTracker(config)
+    commits = tracker.get_new_commits()
+
+    store = CommitStore(str(tmp_path / "store"))
+    first = store.get(commits[0]["sha"])
+    second = store.get(commits[1]["sha"])
+    assert first["files"] == [
+        {
+            "filename": "file.txt",
+            "status": "added",
+            "additions": 1,
+            "deletions": 0,
+            "patch": "@@ -0,0 +1 @@\n+Hello\n\\ No newline at end of file",
+        }
+    ]
+    assert second["files"][0]["status"] == "modified"
@@ -0,0 +1,57 @@
+from til_blog.diff_compact import classify_file, compact_commit, compact_patch
+
+
+def test_classify_file_kinds():
+    assert classify_file("web/package-lock.json") == "lockfile"
+    assert classify_file("vendor/github.com/x/y.go") == "vendored"
+    assert classify_file("assets/logo.PNG") == "binary"
+    assert classify_file("static/app.min.js") == "generated"
+    assert classify_file("api/service_pb2.py") == "generated"
+    assert classify_file("gen.go", "+// Code generated by protoc. DO NOT EDIT.\n+package x") == "generated"
+    assert classify_file("static/bundle.js", "+" + "a;" * 400) == "generated"
+    assert classify_file("tests/test_parser.py") == "test"
+    assert classify_file("src/parser.spec.ts") == "test"
+    assert classify_file("README.md") == "docs"
+    assert classify_file("config.yml") == "config"
+    assert classify_file("src/parser.py", "+" + "x" * 800) == "code"
+
+
+def test_compact_patch_strips_context_and_whitespace_hunks():
+    patch = "\n".join(
+        [
+            "@@ -1,4 +1,4 @@ def parse(text):",
+            " context",
+            "-    return None",
+            "+    return tokens",
+            " more context",
+            "\\ No newline at end of file",
+            "@@ -20,2 +20,2 @@ def other():",
+            "-x = 1",
+            "+x  =  1 ",
+            "@@ -40,3 +40,3 @@",
+            " only context",
+        ]
+    )
+
+    assert compact_patch(patch) == "@@ def parse(text):\n-    return None\n+    return tokens"
+
+
+def test_compact_commit_collapses_noise_and_weights_files():
+    commit = {
+        "sha": "s",
+        "message": "m",
+        "files": [
+            {"filename": "poetry.lock", "patch": "@@ -1 +1 @@\n-a\n+b\n+c"},
+            {"filename": "src/app.py", "patch": "@@ -1 +1 @@\n ctx\n+new"},
+            {"filename": "docs/guide.md", "patch": "@@ -1 +1 @@\n+words"},
+        ],
+    }
+
+    lock, code, docs = compact_commit(commit)["files"]
+
+    assert (lock["kind"], lock["patch"], lock["additions"], lock["deletions"]) == ("lockfile", None, 2, 1)
+    assert lock["weight"] == 0
+    assert code["patch"] == "@@\n+new"
+    assert docs["weight"] < code["weight"] == 1.0
+    # The input is left untouched.
+    assert commit["files"][1]["patch"] == "@@ -1 +1 @@\n ctx\n+new"
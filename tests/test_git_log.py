@@ -0,0 +1,124 @@
+from git import Repo
+
+from til_blog.git_log import iter_log_commits, parse_log
+
+
+SAMPLE = """\x1eaaa\x1f2024-01-01T00:00:00+00:00\x1fAda <ada@example.com>\x1f\x1fAdd things
+
+Longer body
+\x1d
+
+2\t0\tnew.txt
+-\t-\timage.png
+0\t0\told.txt => renamed.txt
+
+diff --git a/new.txt b/new.txt
+new file mode 100644
+index 0000000..b77b4eb
+--- /dev/null
++++ b/new.txt
+@@ -0,0 +1,2 @@
++x
++y
+diff --git a/image.png b/image.png
+new file mode 100644
+index 0000000..1111111
+Binary files /dev/null and b/image.png differ
+diff --git a/old.txt b/renamed.txt
+similarity index 100%
+rename from old.txt
+rename to renamed.txt
+\x1ebbb\x1f2024-01-02T00:00:00+00:00\x1fAda <ada@example.com>\x1faaa\x1fRemove
+\x1d
+
+0\t3\tgone.txt
+
+diff --git a/gone.txt b/gone.txt
+deleted file mode 100644
+index 1111111..0000000
+--- a/gone.txt
++++ /dev/null
+@@ -1,3 +0,0 @@
+-a
+-b
+-c
+"""
+
+
+def test_parse_log_extracts_files_numstat_and_patches():
+    commits = list(parse_log(SAMPLE.split("\n"), "repo", patch_max_chars=20))
+
+    assert [c["sha"] for c in commits] == ["aaa", "bbb"]
+    assert commits[0]["message"] == "Add things\n\nLonger body"
+    assert commits[0]["files"] == [
+        {"filename": "new.txt", "status": "added", "additions": 2, "deletions": 0, "patch": "@@ -0,0 +1,2 @@\n+x\n...[truncated]"},
+        {"filename": "image.png", "status": "added"},
+        {"filename": "renamed.txt", "status": "renamed", "additions": 0, "deletions": 0},
+    ]
+    assert commits[0]["author"] == "Ada <ada@example.com>"
+    assert (commits[0]["parents"], commits[1]["parents"]) == (0, 1)
+    assert commits[1]["message"] == "Remove"
+    assert commits[1]["files"][0]["filename"] == "gone.txt"
+    assert commits[1]["files"][0]["status"] == "removed"
+    assert commits[1]["files"][0]["deletions"] == 3
+
+
+def test_iter_log_commits_stops_early(tmp_path):
+    repo = Repo.init(str(tmp_path))
+    f = tmp_path / "f.txt"
+    for i in range(3):
+        f.write_text(f"{i}\n")
+        repo.index.add([str(f)])
+        repo.index.commit(f"c{i}")
+
+    commits = iter_log_commits(repo, ["HEAD"], "r", reverse=True)
+    first = next(commits)
+    commits.close()
+
+    assert first["message"] == "c0"
+    assert first["files"][0]["patch"] == "@@ -0,0 +1 @@\n+0"
+
+
+SPACED = """\x1eccc\x1f2024-01-03T00:00:00+00:00\x1fAda <ada@example.com>\x1f\x1fOdd names
+\x1d
+
+1\t0\tnew file.txt
+0\t1\t"tab\\there.txt"
+
+diff --git a/new file.txt b/new file.txt
+new file mode 100644
+index 0000000..587be6b
+--- /dev/null
++++ b/new file.txt\t
+@@ -0,0 +1 @@
++x
+diff --git "a/tab\\there.txt" "b/tab\\there.txt"
+deleted file mode 100644
+index 587be6b..0000000
+--- "a/tab\\there.txt"
++++ /dev/null
+@@ -1 +0,0 @@
+-x
+"""
+
+
+def test_parse_log_handles_spaces_and_quoted_names():
+    commit = next(parse_log(SPACED.split("\n"), "repo"))
+
+    assert [(f["filename"], f["status"]) for f in commit["files"]] == [
+        ("new file.txt", "added"),
+        ("tab\there.txt", "removed"),
+    ]
+
+
+def test_iter_log_commits_reads_unusual_names(tmp_path):
+    repo = Repo.init(str(tmp_path))
+    names = ["with space.txt", 'quote".txt', "café.txt"]
+    for name in names:
+        (tmp_path / name).write_text("x\n")
+    repo.index.add([str(tmp_path / name) for name in names])
+    repo.index.commit("add")
+
+    commit = next(iter_log_commits(repo, ["HEAD"], "r"))
+
+    assert sorted(f["filename"] for f in commit["files"]) == sorted(names)
@@ -0,0 +1,82 @@
+import requests
+
+from til_blog import github_events, github_poller
+from til_blog.http_cache import CachedSession
+
+
+class Resp:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self._data = data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(response=self)
+
+    def json(self):
+        return self._data
+
+
+def _event(event_id, repo, kind="PushEvent"):
+    return {"id": str(event_id), "type": kind, "repo": {"name": repo}}
+
+
+def _feed(pages, org_missing=False, login="me"):
+    calls = []
+
+    def fake_get(self, url, headers=None, params=None):
+        calls.append(url)
+        if url.endswith("/user"):
+            return Resp({"login": login}) if login else Resp({"message": "Bad credentials"}, status_code=401)
+        if org_missing and "/orgs/" in url:
+            return Resp({"message": "Not Found"}, status_code=404)
+        return Resp(pages.get(params["page"], []))
+
+    return fake_get, calls
+
+
+def test_changed_repos_stops_at_cursor(monkeypatch):
+    pages = {1: [_event(105, "o/b"), _event(104, "o/a", "WatchEvent"), _event(103, "o/a"), _event(102, "o/b"),
+                 _event(100, "o/c")]}
+    fake_get, calls = _feed(pages)
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+
+    repos, newest, reached = github_events.changed_repos(CachedSession(), "tok", "o", "101")
+
+    assert repos == ["o/a", "o/b"]
+    assert newest == "105"
+    assert reached is True
+    # The authenticated org feed includes pushes to private repos.
+    assert calls[1].endswith("/users/me/events/orgs/o")
+    assert not any(url.endswith("/orgs/o/events") for url in calls)
+
+
+def test_unknown_login_forces_a_sweep(monkeypatch):
+    fake_get, calls = _feed({1: [_event(105, "o/b")]}, login=None)
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+
+    repos, newest, reached = github_events.changed_repos(CachedSession(), "tok", "o", "101")
+
+    assert (repos, newest, reached) == ([], "101", False)
+    assert len(calls) == 1
+
+
+def test_changed_repos_reports_window_exceeded(monkeypatch):
+    fake_get, calls = _feed({1: [_event(300, "o/a")]}, org_missing=True)
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+
+    repos, newest, reached = github_events.changed_repos(CachedSession(), "tok", "me", "10")
+
+    assert reached is False
+    assert newest == "300"
+    assert set(calls[1:]) == {"https://api.github.com/users/me/events"}
+
+
+def test_discover_from_events_retries_failed_repos(monkeypatch):
+    monkeypatch.setattr(github_events, "changed_repos", lambda *args: (["o/a"], "200", True))
+    state = {github_poller.EVENTS_STATE_KEY: {"last_event_id": "150", "retry": ["o/z"]}}
+
+    repos, cursor = github_poller.discover_from_events("o", "tok", state)
+
+    assert repos == ["o/z", "o/a"]
+    assert cursor == "200"
@@ -0,0 +1,134 @@
+import requests
+
+from til_blog import github_graphql, github_poller
+from til_blog.http_cache import CachedSession
+
+
+class Resp:
+    status_code = 200
+
+    def __init__(self, body):
+        self._body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._body
+
+
+def _history(nodes, has_next=False, cursor=None):
+    return {
+        "defaultBranchRef": {
+            "target": {"history": {"pageInfo": {"hasNextPage": has_next, "endCursor": cursor}, "nodes": nodes}}
+        }
+    }
+
+
+def _node(oid):
+    return {"oid": oid, "message": f"msg {oid}", "committedDate": f"2024-01-0{oid[-1]}T00:00:00Z"}
+
+
+def test_build_query_aliases_each_repo():
+    query = github_graphql.build_query(2)
+    assert "r0: repository(owner: $o0, name: $n0)" in query
+    assert "r1: repository(owner: $o1, name: $n1)" in query
+    assert "history(first: 100, since: $s1, after: $c1)" in query
+
+
+def test_fetch_histories_batches_and_follows_cursors(monkeypatch):
+    posts = []
+
+    def fake_post(self, url, headers=None, json=None):
+        posts.append(json["variables"])
+        v = json["variables"]
+        data = {}
+        for i in range(len(v) // 4):
+            name, cursor = v[f"n{i}"], v[f"c{i}"]
+            if name == "a" and cursor is None:
+                data[f"r{i}"] = _history([_node("a3"), _node("a2")], has_next=True, cursor="next")
+            elif name == "a":
+                data[f"r{i}"] = _history([_node("a1")])
+            elif name == "b":
+                data[f"r{i}"] = _history([_node("b1")])
+            else:
+                data[f"r{i}"] = None
+        return Resp({"data": data})
+
+    monkeypatch.setattr(requests.Session, "post", fake_post)
+
+    results = github_graphql.fetch_histories(
+        CachedSession(), "tok", [("o/a", "2024-01-01T00:00:00Z"), ("o/b", None), ("o/gone", None)], batch_size=2
+    )
+
+    assert [c["sha"] for c in results["o/a"]] == ["a1", "a2", "a3"]
+    assert results["o/a"][0]["commit"]["committer"]["date"] == "2024-01-01T00:00:00Z"
+    assert [c["sha"] for c in results["o/b"]] == ["b1"]
+    assert results["o/gone"] == []
+    # The follow-up page for o/a rides along with the second batch.
+    assert len(posts) == 2
+
+
+def test_fetch_histories_leaves_capped_repos_to_rest(monkeypatch, capsys):
+    posts = []
+
+    def fake_post(self, url, headers=None, json=None):
+        posts.append(json["variables"])
+        v = json["variables"]
+        data = {}
+        for i in range(len(v) // 4):
+            if v[f"n{i}"] == "a":
+                data[f"r{i}"] = _history([_node("a3"), _node("a2")], has_next=True, cursor="next")
+            else:
+                data[f"r{i}"] = _history([_node("b2"), _node("b1")])
+        return Resp({"data": data})
+
+    monkeypatch.setattr(requests.Session, "post", fake_post)
+
+    results = github_graphql.fetch_histories(CachedSession(), "tok", [("o/a", None), ("o/b", None)], max_commits=1)
+
+    # Like the REST listing, the cap keeps the oldest commits.
+    assert [c["sha"] for c in results["o/b"]] == ["b1"]
+    # o/a has older pages; paging stops and REST lists it from the oldest end.
+    assert "o/a" not in results
+    assert len(posts) == 1
+    assert "listing the oldest over REST" in capsys.readouterr().out
+
+
+def test_graphql_backend_lists_capped_repos_over_rest(monkeypatch):
+    monkeypatch.setattr(github_graphql, "fetch_histories", lambda *args, **kwargs: {})
+    listed = []
+
+    def list_commits(owner_repo, token, since=None, max_commits=None):
+        listed.append((owner_repo, max_commits))
+        return [{"sha": "a1", "commit": {"message": "one", "committer": {"date": "d1"}}}]
+
+    monkeypatch.setattr(github_poller, "list_commits", list_commits)
+    monkeypatch.setattr(github_poller, "get_commit_detail", lambda r, sha, token: {"files": []})
+
+    state = {}
+    config = {"github_backend": "graphql", "max_commits_per_repo": 1}
+    commits = github_poller.fetch_new_commits(["o/a"], "tok", state, config)
+
+    assert [c["sha"] for c in commits] == ["a1"]
+    assert listed == [("o/a", 1)]
+    assert state == {"o/a": {"last_date": "d1"}}
+
+
+def test_graphql_backend_feeds_rest_details(monkeypatch):
+    def fake_histories(session, token, repo_since, batch_size, max_commits):
+        return {"o/a": [{"sha": "a1", "commit": {"message": "one", "committer": {"date": "d1"}}}],
+                "o/b": RuntimeError("batch failed")}
+
+    def fail_list(*args, **kwargs):  # pragma: no cover - must not be called
+        raise AssertionError("REST listing should be skipped")
+
+    monkeypatch.setattr(github_graphql, "fetch_histories", fake_histories)
+    monkeypatch.setattr(github_poller, "list_commits", fail_list)
+    monkeypatch.setattr(github_poller, "get_commit_detail", lambda r, sha, token: {"files": []})
+
+    state = {}
+    commits = github_poller.fetch_new_commits(["o/a", "o/b"], "tok", state, {"github_backend": "graphql"})
+
+    assert [c["sha"] for c in commits] == ["a1"]
+    assert state == {"o/a": {"last_date": "d1"}}
@@ -29,7 +29,7 @@ def test_get_repos_falls_back_to_user(monkeypatch):
             return DummyResponse(data=[{"full_name": "ctxzz-ai/repo1"}])
         return DummyResponse(data=[])
 
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(requests.Session, "get", lambda self, url, **kw: fake_get(url, **kw))
 
     repos = get_repos_from_org("ctxzz-ai", token="abc123")
 
@@ -43,9 +43,201 @@ def test_get_repos_user_not_found(monkeypatch):
     def fake_get(url, headers=None, params=None):
         return DummyResponse(status_code=404, data={"message": "Not Found"})
 
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(requests.Session, "get", lambda self, url, **kw: fake_get(url, **kw))
 
     with pytest.raises(SystemExit) as exc:
         get_repos_from_org("missing-user", token=None)
 
     assert "Unable to find" in str(exc.value)
+
+
+def test_fetch_new_commits_keeps_order_and_skips_failures(monkeypatch):
+    from til_blog import github_poller
+
+    listed = {
+        "o/a": [{"sha": "a1", "commit": {"message": "a one", "committer": {"date": "2024-01-01T00:00:00Z"}}},
+                {"sha": "a2", "commit": {"message": "a two", "committer": {"date": "2024-01-02T00:00:00Z"}}}],
+        "o/b": [{"sha": "b1", "commit": {"message": "b one", "committer": {"date": "2024-01-03T00:00:00Z"}}}],
+    }
+
+    def fake_list(owner_repo, token, since=None, **kwargs):
+        if owner_repo == "o/broken":
+            raise RuntimeError("boom")
+        return listed[owner_repo]
+
+    def fake_detail(owner_repo, sha, token):
+        if sha == "a2":
+            raise RuntimeError("detail failed")
+        return {
+            "files": [
+                {"filename": f"{sha}.txt", "patch": "+x", "status": "added", "additions": 1, "deletions": 0},
+                {"filename": "big.lock", "status": "modified", "additions": 900, "deletions": 850, "blob_url": "u"},
+            ]
+        }
+
+    monkeypatch.setattr(github_poller, "list_commits", fake_list)
+    monkeypatch.setattr(github_poller, "get_commit_detail", fake_detail)
+
+    state = {}
+    commits = github_poller.fetch_new_commits(
+        ["o/a", "o/broken", "o/b"], "tok", state, {"github_concurrency": 2, "github_repo_concurrency": 1}
+    )
+
+    assert [c["sha"] for c in commits] == ["a1", "b1"]
+    assert commits[0] == {
+        "sha": "a1",
+        "message": "a one",
+        "files": [
+            {"filename": "a1.txt", "status": "added", "additions": 1, "deletions": 0, "patch": "+x"},
+            # No patch (as for binary or oversized files), but the counts survive.
+            {"filename": "big.lock", "status": "modified", "additions": 900, "deletions": 850},
+        ],
+        "repo": "o/a",
+    }
+    assert state == {"o/a": {"last_date": "2024-01-01T00:00:00Z"}, "o/b": {"last_date": "2024-01-03T00:00:00Z"}}
+
+
+def _commit(sha):
+    return {"sha": sha, "commit": {"message": sha, "committer": {"date": f"2024-01-01T00:00:{sha[1:]}Z"}}}
+
+
+class PagedResponse(DummyResponse):
+    def __init__(self, data, links=None):
+        super().__init__(data=data)
+        self.links = links or {}
+
+
+def _paged_get(calls):
+    # Three pages of two commits each, newest first as GitHub returns them.
+    pages = {1: ["c06", "c05"], 2: ["c04", "c03"], 3: ["c02", "c01"]}
+    last = {"last": {"url": "https://api.github.com/repos/o/r/commits?per_page=100&page=3"}}
+
+    def fake_get(self, url, headers=None, params=None):
+        params = params or {}
+        calls.append(params)
+        page = params.get("page", 1)
+        return PagedResponse([_commit(s) for s in pages[page]], last if page == 1 else None)
+
+    return fake_get
+
+
+def test_list_commits_streams_all_pages_oldest_first(monkeypatch):
+    from til_blog import github_poller
+
+    calls = []
+    monkeypatch.setattr(requests.Session, "get", _paged_get(calls))
+
+    commits = list(github_poller.list_commits("o/r", "tok", since="2024-01-01T00:00:00Z"))
+
+    assert [c["sha"] for c in commits] == ["c01", "c02", "c03", "c04", "c05", "c06"]
+    assert [c.get("page") for c in calls] == [None, 3, 2]
+    # Follow-up pages are pinned to the newest commit from the first page.
+    assert all(c["sha"] == "c06" and "until" not in c for c in calls[1:])
+
+
+def test_list_commits_caps_commits_per_repo(monkeypatch):
+    from til_blog import github_poller
+
+    calls = []
+    monkeypatch.setattr(requests.Session, "get", _paged_get(calls))
+
+    commits = list(github_poller.list_commits("o/r", "tok", max_commits=3, prefetch=1))
+
+    assert [c["sha"] for c in commits] == ["c01", "c02", "c03"]
+    assert [c.get("page") for c in calls] == [None, 3, 2]
+
+
+def test_select_active_repos_skips_idle(monkeypatch):
+    from til_blog import github_poller
+
+    meta = [
+        {"full_name": "o/idle", "pushed_at": "2024-01-05T00:00:00Z", "fork": False},
+        {"full_name": "o/busy", "pushed_at": "2024-02-01T00:00:00Z", "fork": False},
+        {"full_name": "o/new", "pushed_at": "2024-01-01T00:00:00Z", "fork": False},
+        {"full_name": "o/fork", "pushed_at": "2024-03-01T00:00:00Z", "fork": True},
+    ]
+    state = {
+        "o/idle": {"last_date": "2024-01-04T00:00:00Z", "pushed_at": "2024-01-05T00:00:00Z"},
+        "o/busy": {"last_date": "2024-01-04T00:00:00Z", "pushed_at": "2024-01-05T00:00:00Z"},
+    }
+
+    assert github_poller.select_active_repos(meta, state, {}) == ["o/busy", "o/new", "o/fork"]
+    assert github_poller.select_active_repos(meta, state, {"skip_forks": True}) == ["o/busy", "o/new"]
+
+
+def test_pushed_at_recorded_only_for_complete_polls(monkeypatch):
+    from til_blog import github_poller
+
+    def fake_list(owner_repo, token, since=None, **kwargs):
+        if owner_repo == "o/err":
+            raise RuntimeError("boom")
+        return [{"sha": "s1", "commit": {"message": "m", "committer": {"date": "d1"}}}]
+
+    monkeypatch.setattr(github_poller, "list_commits", fake_list)
+    monkeypatch.setattr(github_poller, "get_commit_detail", lambda r, sha, token: {"files": []})
+
+    state = {}
+    github_poller.fetch_new_commits(
+        ["o/ok", "o/err"], "tok", state, {}, pushed_at={"o/ok": "p1", "o/err": "p2"}
+    )
+    assert state == {"o/ok": {"last_date": "d1", "pushed_at": "p1"}}
+
+    state = {}
+    github_poller.fetch_new_commits(["o/capped"], "tok", state, {"max_commits_per_repo": 1}, pushed_at={"o/capped": "p3"})
+    assert state == {"o/capped": {"last_date": "d1"}}
+
+
+def test_iter_new_commits_fetches_at_most_window_repos_ahead(monkeypatch):
+    from til_blog import github_poller
+
+    listed = []
+
+    def fake_list(owner_repo, token, since=None, **kwargs):
+        listed.append(owner_repo)
+        return [{"sha": owner_repo[-1], "commit": {"message": "m", "committer": {"date": "2024-01-01T00:00:00Z"}}}]
+
+    monkeypatch.setattr(github_poller, "list_commits", fake_list)
+    monkeypatch.setattr(github_poller, "get_commit_detail", lambda owner_repo, sha, token: {"files": []})
+
+    state = {}
+    commits = github_poller.iter_new_commits(["o/a", "o/b", "o/c", "o/d"], "tok", state, {"github_repo_window": 2})
+
+    assert next(commits)["sha"] == "a"
+    # Only the window (the repo just yielded and one more) has been fetched.
+    assert sorted(listed) == ["o/a", "o/b"]
+    assert list(state) == ["o/a"]
+    assert [c["sha"] for c in commits] == ["b", "c", "d"]
+    assert sorted(listed) == ["o/a", "o/b", "o/c", "o/d"]
+
+
+def test_resume_skips_repos_in_the_run_journal(monkeypatch, tmp_path):
+    from til_blog import github_poller
+
+    listed = []
+
+    def fake_list(owner_repo, token, since=None, **kwargs):
+        listed.append(owner_repo)
+        if owner_repo == "o/b" and len(listed) == 2:
+            raise RuntimeError("boom")
+        return [{"sha": owner_repo[-1], "commit": {"message": "m", "committer": {"date": "d1"}}}]
+
+    monkeypatch.setattr(github_poller, "list_commits", fake_list)
+    monkeypatch.setattr(github_poller, "get_commit_detail", lambda owner_repo, sha, token: {"files": []})
+
+    config = {
+        "github_repos": ["o/a", "o/b"],
+        "state_file": str(tmp_path / "state.json"),
+        "run_journal": str(tmp_path / "run.jsonl"),
+        "github_repo_window": 1,
+    }
+    first = github_poller.GitHubSource(config, ["tok"])
+    assert [c["sha"] for c in first] == ["a"]
+    first.journal.close()  # the run stops before its post is written
+
+    second = github_poller.GitHubSource(config, ["tok"], resume=True)
+    assert [c["sha"] for c in second] == ["a", "b"]
+    assert listed == ["o/a", "o/b", "o/b"]
+    assert second.state == {"o/a": {"last_date": "d1"}, "o/b": {"last_date": "d1"}}
+
+    second.save()
+    assert not (tmp_path / "run.jsonl").exists()
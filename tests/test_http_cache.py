@@ -0,0 +1,53 @@
+import requests
+
+from til_blog.http_cache import CachedSession, ResponseCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.url = "https://api.github.com/x"
+
+
+def test_conditional_request_served_from_cache(tmp_path, monkeypatch):
+    sent = []
+
+    def fake_get(self, url, headers=None, params=None):
+        sent.append(dict(headers or {}))
+        if headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, '[{"sha": "abc"}]', {"ETag": '"v1"', "Content-Length": "16"})
+
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+
+    cache = ResponseCache(str(tmp_path / "cache"))
+    session = CachedSession(cache=cache)
+    first = session.get("https://api.github.com/x", headers={"Authorization": "token t"})
+    second = session.get("https://api.github.com/x", headers={"Authorization": "token t"})
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json() == [{"sha": "abc"}]
+    assert "Content-Length" not in second.headers
+    assert "If-None-Match" not in sent[0]
+    assert sent[1]["If-None-Match"] == '"v1"'
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    # A fresh cache instance picks the entry up from disk.
+    assert ResponseCache(str(tmp_path / "cache")).stats()["entries"] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=160)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"body": "x" * 60})
+        if key == "b":
+            cache.get("a")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
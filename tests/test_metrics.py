@@ -0,0 +1,95 @@
+import json
+
+import requests
+
+from til_blog import metrics
+from til_blog.http_cache import CachedSession
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_timers_counters_and_report():
+    clock = FakeClock()
+    m = metrics.Metrics(clock=clock)
+
+    with m.timer("fetch"):
+        clock.now += 2.0
+    m.add_time("fetch", 1.0)
+    m.inc("http_requests_total", method="GET", status=200)
+    m.inc("http_requests_total", method="GET", status=200)
+    m.inc("http_response_bytes_total", 512)
+    m.set("summary_cache_hits", 3)
+    m.set("summary_cache_misses", 1)
+    m.set("ignored", None)
+
+    report = m.report()
+    assert report["stages"] == {"fetch": {"calls": 2, "seconds": 3.0}}
+    assert report["counters"] == {
+        'http_requests_total{method="GET",status="200"}': 2,
+        "http_response_bytes_total": 512,
+    }
+    assert "ignored" not in report["gauges"]
+    assert report["cache_hit_rates"] == {"summary": 0.75}
+
+
+def test_timed_iter_excludes_consumer_time():
+    clock = FakeClock()
+    m = metrics.Metrics(clock=clock)
+
+    def produce():
+        for i in range(2):
+            clock.now += 1.0
+            yield i
+
+    for _ in m.timed_iter("source", produce()):
+        clock.now += 10.0  # downstream work
+
+    assert m.report()["stages"]["source"] == {"calls": 1, "seconds": 2.0}
+
+
+def test_prometheus_textfile_and_export(tmp_path):
+    m = metrics.Metrics()
+    m.add_time("git.scan", 0.5)
+    m.inc("commits_fetched_total", 4, source="git")
+    m.set("github_rate_limit_remaining", 4999, token="token1")
+
+    text = m.prometheus()
+    assert '# TYPE til_blog_commits_fetched_total counter' in text
+    assert 'til_blog_commits_fetched_total{source="git"} 4' in text
+    assert 'til_blog_stage_seconds_total{stage="git.scan"} 0.5' in text
+    assert 'til_blog_github_rate_limit_remaining{token="token1"} 4999' in text
+
+    config = {"metrics_report": str(tmp_path / "report.json"), "metrics_textfile": str(tmp_path / "til.prom")}
+    metrics.export(config, m)
+    assert json.loads((tmp_path / "report.json").read_text())["counters"] == {
+        'commits_fetched_total{source="git"}': 4
+    }
+    assert 'til_blog_commits_fetched_total{source="git"} 4' in (tmp_path / "til.prom").read_text()
+
+
+def test_session_counts_requests_by_status(monkeypatch):
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+            self.content = b"x" * 10
+            self.headers = {}
+
+    statuses = iter([200, 404])
+    monkeypatch.setattr(requests.Session, "get", lambda self, url, **kw: Response(next(statuses)))
+    run = metrics.reset_metrics()
+
+    session = CachedSession()
+    session.get("https://api.github.com/a")
+    session.get("https://api.github.com/b")
+
+    report = run.report()
+    assert report["counters"]['http_requests_total{method="GET",status="200"}'] == 1
+    assert report["counters"]['http_requests_total{method="GET",status="404"}'] == 1
+    assert report["counters"]["http_response_bytes_total"] == 20
+    assert report["stages"]["http"]["calls"] == 2
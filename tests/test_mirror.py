@@ -0,0 +1,75 @@
+from git import Actor, Repo
+
+from til_blog import github_poller, mirror
+from til_blog.mirror import MirrorBackend
+
+
+def _commit(repo, path, text, message, date):
+    path.write_text(text)
+    repo.index.add([str(path)])
+    author = Actor("a", "a@example.com")
+    return repo.index.commit(message, author=author, committer=author, author_date=date, commit_date=date)
+
+
+def make_origin(tmp_path):
+    origin_dir = tmp_path / "remote" / "o" / "r.git"
+    repo = Repo.init(str(origin_dir))
+    f = origin_dir / "file.txt"
+    _commit(repo, f, "one\n", "first", "2024-01-01T12:00:00 +0000")
+    _commit(repo, f, "two\n", "second", "2024-01-02T12:00:00 +0000")
+    return repo, f
+
+
+def test_mirror_fetches_incrementally(tmp_path):
+    origin, f = make_origin(tmp_path)
+    backend = MirrorBackend(str(tmp_path / "mirrors"), base_url=(tmp_path / "remote").as_uri())
+
+    commits, latest = backend.fetch_commits("o/r", since="2024-01-01T18:00:00Z")
+
+    assert [c["message"] for c in commits] == ["second"]
+    assert commits[0]["repo"] == "o/r"
+    # The shallow cut is deepened so the first new commit diffs against its parent.
+    assert commits[0]["files"] == [
+        {"filename": "file.txt", "status": "modified", "additions": 1, "deletions": 1, "patch": "@@ -1 +1 @@\n-one\n+two"}
+    ]
+    assert latest == "2024-01-02T12:00:00Z"
+
+    _commit(origin, f, "three\n", "third", "2024-01-03T12:00:00 +0000")
+    commits, latest = backend.fetch_commits("o/r", since=latest)
+
+    # since is inclusive, matching the REST listing.
+    assert [c["message"] for c in commits] == ["second", "third"]
+    assert latest == "2024-01-03T12:00:00Z"
+
+
+def test_mirror_backend_in_poller(tmp_path, monkeypatch):
+    make_origin(tmp_path)
+    backend = MirrorBackend(str(tmp_path / "mirrors"), base_url=(tmp_path / "remote").as_uri(), shallow=False)
+    monkeypatch.setattr("til_blog.mirror.from_config", lambda config, token: backend)
+
+    state = {}
+    commits = github_poller.fetch_new_commits(["o/r", "o/missing"], "tok", state, {"github_backend": "mirror"})
+
+    assert [c["message"] for c in commits] == ["first", "second"]
+    assert state == {"o/r": {"last_date": "2024-01-02T12:00:00Z"}}
+
+
+def test_local_reads_carry_the_token(tmp_path, monkeypatch):
+    make_origin(tmp_path)
+    backend = MirrorBackend(str(tmp_path / "mirrors"), token="tok", base_url=(tmp_path / "remote").as_uri())
+    seen = []
+    real_iter = mirror.iter_log_commits
+
+    def iter_log_commits(repo, *args, **kwargs):
+        # A filtered mirror fetches blobs on demand while the log is read.
+        seen.append(repo.git.environment().get("GIT_CONFIG_KEY_0"))
+        yield from real_iter(repo, *args, **kwargs)
+
+    monkeypatch.setattr(mirror, "iter_log_commits", iter_log_commits)
+
+    backend.fetch_commits("o/r")
+    # The second run opens the existing mirror rather than cloning it.
+    commits, _ = backend.fetch_commits("o/r")
+
+    assert [c["message"] for c in commits] == ["first", "second"]
+    assert seen[-1] == f"http.{(tmp_path / 'remote').as_uri()}/.extraheader"
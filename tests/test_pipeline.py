@@ -0,0 +1,89 @@
+import json
+
+from til_blog.pipeline import Pipeline
+from til_blog.summarizer import PATCH_CHAR_LIMIT
+
+
+class FakeSource:
+    def __init__(self, commits):
+        self.commits = commits
+        self.produced = 0
+        self.events = []
+
+    def __iter__(self):
+        for commit in self.commits:
+            self.produced += 1
+            yield commit
+
+    def finish(self):
+        self.events.append("finish")
+
+    def save(self):
+        self.events.append("save")
+
+
+class FakeSummarizer:
+    def __init__(self):
+        self.seen = None
+
+    def summarize(self, commits):
+        self.seen = commits
+        return "Summary"
+
+
+class FakeGenerator:
+    def __init__(self):
+        self.posts = []
+
+    def generate_post(self, summary, output_dir):
+        self.posts.append((summary, output_dir))
+
+
+def _commit(i, message="Work", patch_lines=2000):
+    patch = "@@ -1 +1 @@\n" + "\n".join(f"+line {n}" for n in range(patch_lines))
+    return {"sha": f"s{i}", "message": f"{message} {i}", "repo": "o/r", "files": [{"filename": "a.py", "patch": patch}]}
+
+
+def test_stages_are_lazy_and_trim_patches_at_ingest():
+    source = FakeSource([_commit(i) for i in range(5)])
+    pipeline = Pipeline({}, summarizer=FakeSummarizer(), generator=FakeGenerator())
+
+    stages = pipeline.stages(source)
+    first = next(stages)
+
+    assert source.produced == 1
+    assert len(first["files"][0]["patch"]) <= PATCH_CHAR_LIMIT
+    assert first["files"][0]["patch"].endswith("...[truncated]")
+
+
+def test_run_filters_summarises_and_saves():
+    source = FakeSource([_commit(1), _commit(2, message="chore: daily TIL posts [skip ci]")])
+    summarizer, generator = FakeSummarizer(), FakeGenerator()
+
+    assert Pipeline({"output_dir": "posts"}, summarizer=summarizer, generator=generator).run(source)
+
+    assert [c["sha"] for c in summarizer.seen] == ["s1"]
+    assert generator.posts == [("Summary", "posts")]
+    assert source.events == ["finish", "save"]
+
+
+def test_run_without_commits_writes_no_post():
+    source = FakeSource([])
+    generator = FakeGenerator()
+
+    assert not Pipeline({}, summarizer=FakeSummarizer(), generator=generator).run(source)
+
+    assert generator.posts == []
+    assert source.events == ["finish", "save"]
+
+
+def test_run_writes_metrics_report(tmp_path):
+    source = FakeSource([_commit(1), _commit(2, message="chore: daily TIL posts [skip ci]")])
+    report = tmp_path / "report.json"
+
+    Pipeline({"metrics_report": str(report)}, summarizer=FakeSummarizer(), generator=FakeGenerator()).run(source)
+
+    data = json.loads(report.read_text())
+    assert {"source", "collect", "summarize"} <= set(data["stages"])
+    assert data["gauges"]["commits_kept"] == 1
+    assert data["gauges"]['commits_dropped{reason="message"}'] == 1
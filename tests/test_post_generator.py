@@ -17,3 +17,38 @@ def test_generate_post(tmp_path):
     assert 'title:' in content, "Front matter should contain 'title:'"
     assert 'date:' in content, "Front matter should contain 'date:'"
     assert 'Example summary' in content, "Content should include the summary"
+
+
+def test_generate_post_stream_writes_partial_then_replaces(tmp_path):
+    output_dir = tmp_path / "posts"
+    seen = []
+
+    def chunks():
+        yield "Hello "
+        # The front matter and earlier pieces are already on disk.
+        partial = list(output_dir.glob(".*.partial"))
+        seen.append(partial[0].read_text())
+        yield "world"
+
+    PostGenerator().generate_post_stream(chunks(), str(output_dir))
+
+    assert seen[0].startswith("---") and seen[0].endswith("Hello ")
+    files = list(output_dir.glob("*.md"))
+    assert len(files) == 1
+    # Same content as the non-streaming writer.
+    PostGenerator().generate_post("Hello world", str(tmp_path / "whole"))
+    assert files[0].read_text() == (tmp_path / "whole" / files[0].name).read_text()
+    assert not list(output_dir.glob(".*.partial"))
+
+
+def test_generate_post_stream_leaves_no_file_on_error(tmp_path):
+    import pytest
+
+    def chunks():
+        yield "Hello"
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        PostGenerator().generate_post_stream(chunks(), str(tmp_path))
+
+    assert os.listdir(tmp_path) == []
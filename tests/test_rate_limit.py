@@ -0,0 +1,101 @@
+import requests
+
+from til_blog.http_cache import CachedSession
+from til_blog.rate_limit import RateLimiter, tokens_from_env
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class Resp:
+    def __init__(self, status_code=200, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+def make_limiter(tokens, **kwargs):
+    clock = FakeClock()
+    return RateLimiter(tokens, clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_tokens_from_env_orders_pool():
+    env = {"GH_PAT": "a", "GH_PAT_2": "b", "GH_PAT_3": "c", "GITHUB_TOKEN": "a"}
+    assert tokens_from_env(env) == ["a", "b", "c"]
+
+
+def test_github_token_is_only_a_fallback():
+    assert tokens_from_env({"GH_PAT": "pat", "GITHUB_TOKEN": "gha"}) == ["pat"]
+    assert tokens_from_env({"GITHUB_TOKEN": "gha"}) == ["gha"]
+
+
+def test_stays_on_preferred_token_until_it_runs_low():
+    limiter, _ = make_limiter(["pat", "pat2"])
+    picked = []
+    for remaining in (4999, 4998, 4997):
+        token = limiter.acquire("pat")
+        picked.append(token)
+        limiter.observe(token, Resp(headers={"X-RateLimit-Remaining": str(remaining)}), 0)
+    assert picked == ["pat", "pat", "pat"]
+
+    limiter.observe("pat", Resp(headers={"X-RateLimit-Remaining": "50"}), 0)
+    assert limiter.acquire("pat") == "pat2"
+
+
+def test_token_bucket_paces_requests():
+    limiter, clock = make_limiter(["a"], rate=2, burst=2)
+    for _ in range(4):
+        limiter.acquire("a")
+    assert sum(clock.sleeps) == 1.0
+
+
+def test_rotates_to_token_with_headroom():
+    limiter, _ = make_limiter(["a", "b"])
+    limiter.observe("a", Resp(headers={"X-RateLimit-Remaining": "3"}), 0)
+    limiter.observe("b", Resp(headers={"X-RateLimit-Remaining": "4000"}), 0)
+    assert limiter.acquire("a") == "b"
+
+
+def test_exhausted_token_retries_on_other_token_immediately():
+    limiter, _ = make_limiter(["a", "b"])
+    exhausted = Resp(403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "5000"})
+    assert limiter.observe("a", exhausted, 0) == 0.0
+    assert limiter.acquire("a") == "b"
+
+
+def test_secondary_limit_honours_retry_after():
+    limiter, _ = make_limiter(["a"])
+    delay = limiter.observe("a", Resp(403, {"Retry-After": "30"}), 0)
+    assert 30 <= delay <= 37.5
+    assert limiter.observe("a", Resp(403, {"Retry-After": "30"}), limiter.max_retries) is None
+    assert limiter.observe("a", Resp(404), 0) is None
+
+
+def test_session_retries_throttled_request(monkeypatch):
+    responses = [Resp(429, {"Retry-After": "1"}), Resp(200)]
+    sent = []
+
+    def fake_get(self, url, headers=None, params=None):
+        sent.append(headers.get("Authorization"))
+        return responses.pop(0)
+
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+    limiter, clock = make_limiter(["a"])
+    session = CachedSession(limiter=limiter)
+
+    r = session.get("https://api.github.com/x", headers={"Authorization": "token a"})
+
+    assert r.status_code == 200
+    assert sent == ["token a", "token a"]
+    assert limiter.retries == 1
+    assert clock.sleeps and clock.sleeps[0] >= 1
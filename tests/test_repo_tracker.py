@@ -2,6 +2,7 @@ import os
 import json
 import tempfile
 from git import Repo
+from til_blog import repo_tracker
 from til_blog.repo_tracker import RepoTracker
 
 
@@ -50,7 +51,7 @@ def test_get_new_commits(tmp_path, monkeypatch):
     tracker = RepoTracker(config)
     commits = tracker.get_new_commits()
     # Should get both commits
-    messages = [c.message.strip() for c in commits]
+    messages = [c["message"] for c in commits]
     assert messages == ["Initial commit", "Second commit"]
     # Second call should return none
     commits2 = tracker.get_new_commits()
@@ -67,6 +68,125 @@ def test_repo_entry_dict_with_env(monkeypatch, tmp_path):
     tracker = RepoTracker(config)
 
     commits = tracker.get_new_commits()
-    messages = [c.message.strip() for c in commits]
+    messages = [c["message"] for c in commits]
     assert messages == ["Initial commit", "Second commit"]
     assert tracker.state.get("custom") is not None
+
+
+def _commit(repo, repo_dir, text, message):
+    file_path = repo_dir / "file.txt"
+    file_path.write_text(text)
+    repo.index.add([str(file_path)])
+    return repo.index.commit(message)
+
+
+def test_scan_is_bounded_by_cursor_and_max(tmp_path):
+    repo_dir = init_test_repo(tmp_path)
+    repo = Repo(str(repo_dir))
+    config = {"repos": [str(repo_dir)], "state_file": str(tmp_path / "state.json"), "max_scan_commits": 2}
+    tracker = RepoTracker(config)
+    tracker.get_new_commits()
+
+    for i in range(3):
+        _commit(repo, repo_dir, f"v{i}", f"Change {i}")
+
+    commits = tracker.get_new_commits()
+    # Only the newest two of the three new commits are kept.
+    assert [c["message"] for c in commits] == ["Change 1", "Change 2"]
+    assert tracker.state[repo_dir.name] == repo.head.commit.hexsha
+
+
+def test_unreachable_cursor_falls_back_to_since(tmp_path, capsys):
+    repo_dir = init_test_repo(tmp_path)
+    config = {"repos": [str(repo_dir)], "state_file": str(tmp_path / "state.json"), "since_days": 1}
+    tracker = RepoTracker(config)
+    tracker.state[repo_dir.name] = "0" * 40
+
+    commits = tracker.get_new_commits()
+
+    assert [c["message"] for c in commits] == ["Initial commit", "Second commit"]
+    out = capsys.readouterr().out
+    assert "no longer in the repository" in out
+    assert "scanning commits since" in out
+
+
+def test_unreachable_cursor_without_since_is_bounded(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(repo_tracker, "DEFAULT_UNBOUNDED_SCAN_COMMITS", 1)
+    repo_dir = init_test_repo(tmp_path)
+    config = {"repos": [str(repo_dir)], "state_file": str(tmp_path / "state.json")}
+    tracker = RepoTracker(config)
+    tracker.state[repo_dir.name] = "0" * 40
+
+    commits = tracker.get_new_commits()
+
+    assert [c["message"] for c in commits] == ["Second commit"]
+    assert "scanning the newest 1 commits" in capsys.readouterr().out
+
+
+def test_multiple_branches_tracked_separately(tmp_path):
+    repo_dir = init_test_repo(tmp_path)
+    repo = Repo(str(repo_dir))
+    main_branch = repo.active_branch.name
+    config = {
+        "repos": [{"path": str(repo_dir), "name": "multi", "branches": [main_branch, "feature"]}],
+        "state_file": str(tmp_path / "state.json"),
+    }
+    repo.create_head("feature")
+    tracker = RepoTracker(config)
+    assert len(tracker.get_new_commits()) == 2
+
+    repo.heads.feature.checkout()
+    _commit(repo, repo_dir, "feature work", "Feature commit")
+    getattr(repo.heads, main_branch).checkout()
+    _commit(repo, repo_dir, "main work", "Main commit")
+
+    commits = tracker.get_new_commits()
+
+    assert sorted(c["message"] for c in commits) == ["Feature commit", "Main commit"]
+    assert set(tracker.state["multi"]) == {main_branch, "feature"}
+    assert tracker.get_new_commits() == []
+
+
+def test_parallel_scan_returns_records_in_config_order(tmp_path):
+    repos = []
+    for name in ("one", "two", "three"):
+        base = tmp_path / name
+        base.mkdir()
+        repos.append({"path": str(init_test_repo(base)), "name": name})
+    repos.insert(1, str(tmp_path / "missing"))
+    config = {"repos": repos, "state_file": str(tmp_path / "state.json"), "scan_workers": 3}
+    tracker = RepoTracker(config)
+
+    commits = tracker.get_new_commits()
+
+    assert [(c["repo"], c["message"]) for c in commits] == [
+        (name, msg) for name in ("one", "two", "three") for msg in ("Initial commit", "Second commit")
+    ]
+    assert list(tracker.state) == ["one", "two", "three"]
+    assert tracker.get_new_commits() == []
+
+
+def test_parallel_scan_keeps_spooled_patches_apart(tmp_path):
+    from til_blog.commit_record import SPILL_MIN_CHARS, FileChange
+
+    # The parent's spool exists before the workers fork.
+    FileChange("parent.py", patch="+" + "p" * (SPILL_MIN_CHARS * 2))
+    repos = []
+    for name in ("a", "b", "c", "d"):
+        repo_dir = tmp_path / name
+        repo = Repo.init(str(repo_dir))
+        file_path = repo_dir / "file.txt"
+        for i in range(5):
+            file_path.write_text("\n".join(f"{name} line {i} {n}" for n in range(40)) + "\n")
+            repo.index.add([str(file_path)])
+            repo.index.commit(f"{name} commit {i}")
+        repos.append({"path": str(repo_dir), "name": name})
+    config = {"repos": repos, "state_file": str(tmp_path / "state.json"), "scan_workers": 4}
+
+    commits = RepoTracker(config).get_new_commits()
+
+    assert len(commits) == 20
+    for commit in commits:
+        patch = commit["files"][0]["patch"]
+        assert len(patch) >= SPILL_MIN_CHARS
+        assert f"+{commit['repo']} line {commit['message'][-1]} 0" in patch
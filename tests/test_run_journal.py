@@ -0,0 +1,36 @@
+from til_blog.commit_record import CommitRecord
+from til_blog.run_journal import RunJournal
+
+
+def test_journal_round_trips_checkpoints(tmp_path):
+    journal = RunJournal(str(tmp_path / "run.jsonl"))
+    assert journal.load() == (None, {})
+
+    journal.start({"repos": ["o/a", "o/b"]})
+    patch = "+line\n" * 100
+    commit = CommitRecord("s1", "msg", files=[{"filename": "a.py", "patch": patch}], repo="o/a")
+    journal.checkpoint("o/a", [commit], {"last_date": "d1"})
+    journal.close()
+
+    header, done = journal.load()
+    assert header == {"repos": ["o/a", "o/b"]}
+    assert list(done) == ["o/a"]
+    assert done["o/a"]["state"] == {"last_date": "d1"}
+    restored = CommitRecord.from_mapping(done["o/a"]["commits"][0])
+    assert restored["files"][0]["patch"] == patch
+
+
+def test_journal_ignores_torn_last_line_and_discards(tmp_path):
+    path = tmp_path / "run.jsonl"
+    journal = RunJournal(str(path))
+    journal.start({"repos": ["o/a", "o/b"]})
+    journal.checkpoint("o/a", [], None)
+    journal.close()
+    with open(path, "a") as f:
+        f.write('{"repo": "o/b", "commi')
+
+    header, done = journal.load()
+    assert list(done) == ["o/a"]
+
+    journal.discard()
+    assert not path.exists()
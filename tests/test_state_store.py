@@ -0,0 +1,63 @@
+import json
+
+from til_blog import github_poller
+from til_blog.state_store import StateStore, open_state, save_state
+
+
+def test_migrates_json_state_once(tmp_path, capsys):
+    legacy = tmp_path / "state.json"
+    legacy.write_text(json.dumps({"o/a": {"last_date": "d1"}, "local": "abc"}))
+    config = {"state_file": str(legacy), "state_db": str(tmp_path / "state.db")}
+
+    store = open_state(config)
+
+    assert isinstance(store, StateStore)
+    assert dict(store) == {"o/a": {"last_date": "d1"}, "local": "abc"}
+    assert "Imported state" in capsys.readouterr().out
+    assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    store["o/a"] = {"last_date": "d2"}
+    save_state(str(legacy), store)
+    store.close()
+
+    # The JSON file is not imported again over newer state.
+    reopened = open_state(config)
+    assert reopened["o/a"] == {"last_date": "d2"}
+
+
+def test_unsaved_changes_are_not_persisted(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    store["o/a"] = {"last_date": "d1"}
+    store.record([{"sha": "s1", "repo": "o/a", "message": "Add x\n\nbody", "date": "d1"}])
+    store.save()
+    store["o/a"] = {"last_date": "d2"}
+    store.record([{"sha": "s2", "repo": "o/a", "message": "Add y"}])
+    store.close()  # a crash before save()
+
+    store = StateStore(str(tmp_path / "state.db"))
+    assert store["o/a"] == {"last_date": "d1"}
+    assert store.seen("s1") and not store.seen("s2")
+    assert store.repo_commits("o/a") == [("s1", "d1", "Add x")]
+
+
+def test_poller_skips_boundary_commit_seen_last_run(tmp_path, monkeypatch):
+    listed = [
+        {"sha": "old", "commit": {"message": "old", "committer": {"date": "2024-01-01T00:00:00Z"}}},
+        {"sha": "new", "commit": {"message": "new", "committer": {"date": "2024-01-02T00:00:00Z"}}},
+    ]
+    details = []
+    monkeypatch.setattr(github_poller, "list_commits", lambda owner_repo, token, since=None, **kw: listed)
+
+    def fake_detail(owner_repo, sha, token):
+        details.append(sha)
+        return {"files": []}
+
+    monkeypatch.setattr(github_poller, "get_commit_detail", fake_detail)
+    store = StateStore(str(tmp_path / "state.db"))
+    store["o/r"] = {"last_date": "2024-01-01T00:00:00Z"}
+    store.record([{"sha": "old", "repo": "o/r"}])
+
+    commits = github_poller.fetch_new_commits(["o/r"], "tok", store, {})
+
+    assert [c["sha"] for c in commits] == ["new"]
+    assert details == ["new"]
+    assert store["o/r"] == {"last_date": "2024-01-02T00:00:00Z"}
@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 from til_blog.summarizer import Summarizer
 
 
@@ -44,3 +46,226 @@ def test_summarizer_falls_back_on_openai_failure(monkeypatch):
 
     assert "Summarization failed" in summary
     assert "Fix bug" in summary
+
+
+def _big_commit(i, patch_len=3000):
+    return {
+        "repo": "o/r",
+        "sha": f"sha{i}",
+        "message": f"Commit {i}",
+        "files": [{"filename": f"f{i}.py", "patch": "+" + "x" * patch_len}],
+    }
+
+
+def test_pack_prompt_keeps_messages_and_fits_budget():
+    from til_blog.summarizer import INSTRUCTIONS, estimate_tokens, pack_prompt
+
+    commits = [_big_commit(i) for i in range(5)]
+    commits[0]["files"].append({"filename": "small.py", "patch": "+tiny"})
+
+    prompt = pack_prompt(INSTRUCTIONS, commits, token_budget=1000)
+
+    assert estimate_tokens(prompt) <= 1000
+    for i in range(5):
+        assert f"Message: Commit {i}" in prompt
+    # Short patches are kept whole; long ones share the rest.
+    assert "+tiny\n~~~" in prompt
+    assert prompt.count("...[truncated]") == 5
+
+
+def test_pack_prompt_matches_legacy_format_when_budget_allows():
+    from til_blog.summarizer import INSTRUCTIONS, pack_prompt
+
+    prompt = pack_prompt(INSTRUCTIONS, [_big_commit(1, patch_len=1500)], token_budget=100000)
+
+    assert "- f1.py:\n~~~\n+" + "x" * 1199 + "\n...[truncated]\n~~~" in prompt
+
+
+def test_pack_prompt_accepts_raw_records():
+    from til_blog.commit_record import CommitRecord
+    from til_blog.summarizer import INSTRUCTIONS, pack_prompt
+
+    # Records straight from a source, before compaction sets kind and weight.
+    raw = [CommitRecord(c["sha"], c["message"], c["files"], repo=c["repo"]) for c in (_big_commit(1), _big_commit(2))]
+
+    assert pack_prompt(INSTRUCTIONS, raw, 1000) == pack_prompt(
+        INSTRUCTIONS, [_big_commit(1), _big_commit(2)], 1000
+    )
+
+
+def test_large_day_uses_map_reduce(monkeypatch):
+    prompts = []
+
+    class Client:
+        def __init__(self, api_key):
+            self.responses = self
+
+        def create(self, *, model, input, max_output_tokens, temperature):
+            prompts.append(input)
+            if input.startswith("You are a helpful assistant. Merge"):
+                return SimpleNamespace(output_text="Merged post")
+            return SimpleNamespace(output_text=f"notes {len(prompts)}")
+
+    monkeypatch.setattr("til_blog.summarizer.OpenAI", Client)
+
+    commits = [_big_commit(i) for i in range(10)]
+    summary = Summarizer("sk-test", {"summary_token_budget": 600}).summarize(commits)
+
+    assert summary == "Merged post"
+    map_prompts = [p for p in prompts if "part " in p]
+    assert len(map_prompts) > 1
+    assert len(prompts) == len(map_prompts) + 1
+    merge = prompts[-1]
+    assert merge.count("Part ") == len(map_prompts)
+
+
+def test_identical_prompt_served_from_cache(tmp_path, monkeypatch):
+    calls = []
+
+    class Client:
+        def __init__(self, api_key):
+            self.responses = self
+
+        def create(self, **kwargs):
+            calls.append(kwargs["input"])
+            return SimpleNamespace(output_text="Cached summary")
+
+    monkeypatch.setattr("til_blog.summarizer.OpenAI", Client)
+    config = {"summary_cache_dir": str(tmp_path / "cache")}
+
+    first = Summarizer("sk-test", config).summarize(COMMITS)
+    # A fresh instance (as in a workflow rerun) reads the cache from disk.
+    rerun = Summarizer("sk-test", config)
+    second = rerun.summarize(COMMITS)
+
+    assert first == second == "Cached summary"
+    assert len(calls) == 1
+    assert rerun.cache.hits == 1
+
+
+def test_cache_entries_expire(tmp_path, monkeypatch):
+    from til_blog.http_cache import ResponseCache
+
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    cache.put("k", {"text": "old"})
+    assert cache.get("k")["text"] == "old"
+
+    monkeypatch.setattr("til_blog.http_cache.time.time", lambda: 10**12)
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_pack_prompt_collapses_noise_and_favours_code():
+    from til_blog.diff_compact import compact_commit
+    from til_blog.summarizer import INSTRUCTIONS, pack_prompt
+
+    body = "\n".join(f"+line {n}" for n in range(400))
+    commit = compact_commit(
+        {
+            "repo": "o/r",
+            "sha": "s1",
+            "message": "Update deps and parser",
+            "files": [
+                {"filename": "yarn.lock", "patch": body, "additions": 400, "deletions": 0},
+                {"filename": "src/parser.py", "patch": body},
+                {"filename": "CHANGELOG.md", "patch": body},
+            ],
+        }
+    )
+
+    prompt = pack_prompt(INSTRUCTIONS, [commit], token_budget=100000)
+
+    assert "- yarn.lock: (lockfile, +400 -0; diff omitted)" in prompt
+    code = prompt.split("- src/parser.py:\n~~~\n")[1].split("\n~~~")[0]
+    docs = prompt.split("- CHANGELOG.md:\n~~~\n")[1].split("\n~~~")[0]
+    assert len(docs) < len(code) <= 1200 + len("\n...[truncated]")
+    # Truncation ends on a whole diff line.
+    assert code.endswith("\n...[truncated]") and code.split("\n")[-2].startswith("+line ")
+
+
+def test_async_mode_retries_and_falls_back_per_repo(monkeypatch):
+    import openai
+
+    def api_error(cls, status_code=None):
+        # Skip the constructors, which need real HTTP request/response objects.
+        exc = cls.__new__(cls)
+        exc.status_code = status_code
+        return exc
+
+    attempts = {}
+
+    class AsyncClient:
+        def __init__(self, api_key, max_retries):
+            assert max_retries == 0
+            self.responses = self
+
+        async def create(self, *, model, input, max_output_tokens, temperature):
+            repo = "o/a" if "o/a repository" in input else "o/b"
+            attempts[repo] = attempts.get(repo, 0) + 1
+            if repo == "o/a" and attempts[repo] == 1:
+                raise api_error(openai.APIConnectionError)
+            if repo == "o/b":
+                raise api_error(openai.BadRequestError, 400)
+            return SimpleNamespace(output_text="Learned about A")
+
+        async def close(self):
+            pass
+
+    monkeypatch.setattr("til_blog.summarizer.OpenAI", lambda api_key: object())
+    monkeypatch.setattr("til_blog.summarizer.AsyncOpenAI", AsyncClient)
+    commits = [
+        {"repo": "o/a", "sha": "a1" * 4, "message": "Add A", "files": []},
+        {"repo": "o/b", "sha": "b1" * 4, "message": "Add B", "files": []},
+    ]
+    config = {"summary_mode": "async", "summary_retry_backoff": 0}
+
+    summary = Summarizer("sk-test", config).summarize(commits)
+
+    assert attempts == {"o/a": 2, "o/b": 1}
+    assert summary == "#### o/a\n\nLearned about A\n\n#### o/b\n\n- b1b1b1b Add B"
+
+
+def _stream_client(events, calls):
+    class Client:
+        def __init__(self, api_key):
+            self.responses = self
+
+        def create(self, **kwargs):
+            calls.append(kwargs)
+            assert kwargs["stream"] is True
+            return iter(events)
+
+    return Client
+
+
+def test_stream_yields_deltas_and_caches_result(tmp_path, monkeypatch):
+    delta = lambda text: SimpleNamespace(type="response.output_text.delta", delta=text)
+    events = [SimpleNamespace(type="response.created"), delta("Learned "), delta("things"), SimpleNamespace(type="response.completed")]
+    calls = []
+    monkeypatch.setattr("til_blog.summarizer.OpenAI", _stream_client(events, calls))
+    config = {"summary_cache_dir": str(tmp_path)}
+
+    assert list(Summarizer("sk-test", config).stream(COMMITS)) == ["Learned ", "things"]
+    assert list(Summarizer("sk-test", config).stream(COMMITS)) == ["Learned things"]
+    assert len(calls) == 1
+
+
+def test_stream_salvages_partial_output(monkeypatch):
+    def events():
+        yield SimpleNamespace(type="response.output_text.delta", delta="Partial")
+        raise TimeoutError("read timed out")
+
+    monkeypatch.setattr("til_blog.summarizer.OpenAI", _stream_client(events(), []))
+
+    pieces = list(Summarizer("sk-test").stream(COMMITS))
+
+    assert pieces[0] == "Partial"
+    assert "cut short" in pieces[1]
+
+
+def test_stream_falls_back_when_nothing_arrives(monkeypatch):
+    monkeypatch.setattr(
+        "til_blog.summarizer.OpenAI", _stream_client([SimpleNamespace(type="response.failed")], [])
+    )
+
+    assert "Summarization failed" in "".join(Summarizer("sk-test").stream(COMMITS))